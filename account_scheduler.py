@@ -0,0 +1,139 @@
+import os
+import time
+import heapq
+import random
+import logging
+
+from state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+# Bounds on the time between two checks of the same account (seconds)
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "900"))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", str(12 * 3600)))
+
+# Interval for accounts without enough history yet
+POLL_DEFAULT_INTERVAL = float(os.getenv("POLL_DEFAULT_INTERVAL", "3600"))
+
+# Aim to find about this many new tweets per check
+POLL_TARGET_NEW_TWEETS = float(os.getenv("POLL_TARGET_NEW_TWEETS", "1"))
+
+# Weight of the newest observation in the posting-rate average
+RATE_SMOOTHING = 0.3
+
+# +/- fraction of random spread on every interval so checks don't line up
+POLL_JITTER = 0.1
+
+
+class AccountScheduler:
+    """Decides when each monitored account is checked next.
+
+    Each account's posting rate (tweets per second) is learned from the
+    timestamps of the new tweets found on every visit, as an exponential
+    moving average. The next check is scheduled after the time in which
+    about POLL_TARGET_NEW_TWEETS new tweets are expected, clamped between
+    POLL_MIN_INTERVAL and POLL_MAX_INTERVAL, so busy accounts are polled
+    often and dormant ones back off. Next-check times are kept in a heap
+    and persisted in the state store.
+    """
+
+    def __init__(self, accounts, store=None):
+        self.store = store or get_state_store()
+        saved = self.store.get_schedules()
+        self.state = {}
+        self._heap = []
+        for account in accounts:
+            state = saved.get(account.lower()) or {"rate": None, "last_checked": None,
+                                                    "last_tweet_at": None, "next_check": 0.0}
+            self.state[account] = state
+            heapq.heappush(self._heap, (state["next_check"], account))
+
+    def due(self, now=None):
+        """Pop the accounts whose check is due, in next-check order.
+
+        Each is provisionally rescheduled one interval ahead, so an account
+        whose visit fails is still retried later.
+        """
+        now = now or time.time()
+        accounts = []
+        while self._heap and self._heap[0][0] <= now:
+            next_check, account = heapq.heappop(self._heap)
+            state = self.state.get(account)
+            if state is None or state["next_check"] != next_check:
+                continue  # superseded entry
+            accounts.append(account)
+            self._schedule(account, now + self.interval(account))
+        return accounts
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the next account is due (0 if one already is)"""
+        now = now or time.time()
+        while self._heap:
+            next_check, account = self._heap[0]
+            state = self.state.get(account)
+            if state is not None and state["next_check"] == next_check:
+                return max(0.0, next_check - now)
+            heapq.heappop(self._heap)
+        return POLL_DEFAULT_INTERVAL
+
+    def interval(self, account):
+        """Seconds until the account should be checked again, from its learned rate"""
+        rate = self.state[account]["rate"]
+        if not rate:
+            base = POLL_DEFAULT_INTERVAL
+        else:
+            base = POLL_TARGET_NEW_TWEETS / rate
+        base = min(POLL_MAX_INTERVAL, max(POLL_MIN_INTERVAL, base))
+        return base * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+    def observe(self, account, tweets, now=None):
+        """Update the account's posting rate from a visit and schedule its next check.
+
+        ``tweets`` are the new tweets found (newer than the account's cursor).
+        """
+        if account not in self.state:
+            return
+        now = now or time.time()
+        state = self.state[account]
+        last_tweet_at = state["last_tweet_at"]
+        # Pinned tweets are old and out of order; they say nothing about the current rate
+        times = sorted(tweet.timestamp for tweet in tweets or [] if tweet.timestamp and not tweet.is_pinned)
+        if last_tweet_at:
+            times = [t for t in times if t > last_tweet_at]
+
+        sample = None
+        if times and last_tweet_at:
+            # New tweets arrived since the last one we saw
+            sample = len(times) / max(times[-1] - last_tweet_at, 1.0)
+        elif len(times) >= 2:
+            sample = (len(times) - 1) / max(times[-1] - times[0], 1.0)
+        elif not times and last_tweet_at:
+            # Silence: the rate is at most one tweet per quiet period
+            quiet = now - last_tweet_at
+            if quiet > 0 and (state["rate"] is None or 1.0 / quiet < state["rate"]):
+                sample = 1.0 / quiet
+
+        if sample is not None:
+            rate = state["rate"]
+            state["rate"] = sample if rate is None else (1 - RATE_SMOOTHING) * rate + RATE_SMOOTHING * sample
+        if times:
+            state["last_tweet_at"] = times[-1]
+        state["last_checked"] = now
+
+        interval = self.interval(account)
+        self._schedule(account, now + interval)
+        logger.info(f"Next check of {account} in {interval / 60:.0f} min "
+                    f"({self.tweets_per_day(account):.1f} tweets/day, {len(times)} new)")
+
+    def tweets_per_day(self, account):
+        rate = self.state[account]["rate"]
+        return rate * 86400 if rate else 0.0
+
+    def _schedule(self, account, next_check):
+        state = self.state[account]
+        state["next_check"] = next_check
+        heapq.heappush(self._heap, (next_check, account))
+        try:
+            self.store.set_schedule(account, state["rate"], state["last_checked"], state["last_tweet_at"], next_check)
+        except Exception as e:
+            logger.error(f"Error saving schedule for {account}: {e}")
@@ -0,0 +1,163 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where failure screenshots and their metadata are kept
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(BASE_DIR, "artifacts"))
+
+# Ring buffer bounds: the oldest artifacts are deleted past either limit
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(50 * 1024 * 1024)))
+ARTIFACT_MAX_FILES = int(os.getenv("ARTIFACT_MAX_FILES", "200"))
+
+# JPEG quality of screenshots (1-100)
+ARTIFACT_JPEG_QUALITY = int(os.getenv("ARTIFACT_JPEG_QUALITY", "60"))
+
+# The same failure (name and exception type) is captured at most once per window (seconds)
+ARTIFACT_RATE_LIMIT_SECONDS = float(os.getenv("ARTIFACT_RATE_LIMIT_SECONDS", "600"))
+
+# Screenshot timeout, so a hung page can't stall error handling (ms)
+SCREENSHOT_TIMEOUT_MS = 10000
+
+
+def _stem(name):
+    return os.path.splitext(os.path.basename(name))[0] or "error"
+
+
+class ArtifactStore:
+    """Bounded store of failure screenshots (JPEG) with a JSON metadata sidecar each.
+
+    The browser encodes the JPEG; the files are written in a worker thread,
+    so the event loop only waits on I/O. Identical failures within
+    ARTIFACT_RATE_LIMIT_SECONDS are counted instead of captured, and the
+    oldest artifacts are deleted once the store exceeds its file or byte cap.
+    """
+
+    def __init__(self, directory=ARTIFACT_DIR, max_bytes=ARTIFACT_MAX_BYTES, max_files=ARTIFACT_MAX_FILES,
+                 quality=ARTIFACT_JPEG_QUALITY, rate_limit=ARTIFACT_RATE_LIMIT_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.quality = quality
+        self.rate_limit = rate_limit
+        self.captured = 0
+        self.suppressed = 0
+        # (name, exception type) -> [last capture time, failures suppressed since]
+        self._recent = {}
+        self._lock = threading.Lock()
+        self._index = None  # deque of (stem, total bytes), oldest first; loaded on first write
+        self._total_bytes = 0
+
+    def _should_capture(self, key, now):
+        entry = self._recent.get(key)
+        if entry and now - entry[0] < self.rate_limit:
+            entry[1] += 1
+            self.suppressed += 1
+            return None
+        suppressed = entry[1] if entry else 0
+        self._recent[key] = [now, 0]
+        return suppressed
+
+    async def capture(self, page, name, error=None):
+        """Screenshot the page for a failure; returns the image path, or None if skipped or failed"""
+        if error is None:
+            error = sys.exc_info()[1]
+        now = time.time()
+        key = (_stem(name), type(error).__name__ if error else None)
+        suppressed = self._should_capture(key, now)
+        if suppressed is None:
+            logger.info(f"Skipping screenshot {key[0]}: captured within the last {self.rate_limit:.0f}s")
+            return None
+
+        metadata = {
+            "name": key[0],
+            "timestamp": now,
+            "time": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+            "url": getattr(page, "url", None),
+            "exception": None if error is None else f"{type(error).__name__}: {error}",
+            "traceback": None if error is None else "".join(traceback.format_exception(error))[-4000:],
+            "suppressed_since_last": suppressed,
+        }
+        try:
+            image = await page.screenshot(type="jpeg", quality=self.quality, timeout=SCREENSHOT_TIMEOUT_MS)
+        except Exception as e:
+            logger.warning(f"Could not take screenshot {key[0]}: {e}")
+            image = None
+        try:
+            path = await asyncio.to_thread(self._write, key[0], now, image, metadata)
+        except OSError as e:
+            logger.warning(f"Could not save artifact {key[0]}: {e}")
+            return None
+        self.captured += 1
+        logger.info(f"Error artifact saved: {path}")
+        return path
+
+    def _write(self, name, now, image, metadata):
+        """Write the image and sidecar, then trim the ring buffer (worker thread)"""
+        stem = f"{datetime.fromtimestamp(now).strftime('%Y%m%d-%H%M%S-%f')}_{name}"
+        os.makedirs(self.directory, exist_ok=True)
+        image_path = os.path.join(self.directory, stem + ".jpg")
+        size = 0
+        if image is not None:
+            with open(image_path, "wb") as f:
+                f.write(image)
+            size += len(image)
+        metadata["image"] = os.path.basename(image_path) if image is not None else None
+        sidecar = json.dumps(metadata, indent=2).encode("utf-8")
+        with open(os.path.join(self.directory, stem + ".json"), "wb") as f:
+            f.write(sidecar)
+        size += len(sidecar)
+
+        with self._lock:
+            index = self._load_index()
+            index.append((stem, size))
+            self._total_bytes += size
+            while index and (len(index) > self.max_files or self._total_bytes > self.max_bytes):
+                old_stem, old_size = index.popleft()
+                self._total_bytes -= old_size
+                for ext in (".jpg", ".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, old_stem + ext))
+                    except FileNotFoundError:
+                        pass
+        return image_path if image is not None else os.path.join(self.directory, stem + ".json")
+
+    def _load_index(self):
+        """Artifacts already on disk from earlier runs, oldest first (names sort by time)"""
+        if self._index is None:
+            sizes = {}
+            for entry in os.scandir(self.directory):
+                stem, ext = os.path.splitext(entry.name)
+                if ext in (".jpg", ".json") and entry.is_file():
+                    sizes[stem] = sizes.get(stem, 0) + entry.stat().st_size
+            self._index = deque(sorted(sizes.items()))
+            self._total_bytes = sum(sizes.values())
+        return self._index
+
+    def stats(self):
+        with self._lock:
+            files = len(self._index) if self._index is not None else None
+            return {"captured": self.captured, "suppressed": self.suppressed,
+                    "artifacts": files, "bytes": self._total_bytes}
+
+
+# Process-wide store
+_store = None
+
+
+def get_artifact_store():
+    """Return the shared ArtifactStore"""
+    global _store
+    if _store is None:
+        _store = ArtifactStore()
+    return _store
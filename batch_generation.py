@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import asyncio
+import logging
+
+from generation_cache import get_generation_cache, cache_key
+from llm_client import get_llm_client
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of tweets packed into one request
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "8"))
+
+# Seconds the pipeline waits to fill a batch before sending it
+LLM_BATCH_WINDOW = float(os.getenv("LLM_BATCH_WINDOW", "5"))
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+BATCH_OUTPUT_SPEC = """
+You will receive several tweets, each with a numeric id. Write one reply per tweet,
+following the guidelines above for each reply independently.
+
+Respond with ONLY a JSON array, one object per tweet, in this exact shape:
+[{"id": 0, "reply": "..."}, {"id": 1, "reply": "..."}]
+"""
+
+
+def build_batch_prompt(instructions, texts):
+    """Pack the shared instructions once, followed by every tweet with its id"""
+    tweets = "\n\n".join(f"[id {i}]\n{text}" for i, text in enumerate(texts))
+    return f"{instructions}\n{BATCH_OUTPUT_SPEC}\nTweets:\n\n{tweets}"
+
+
+def parse_batch_response(raw, count):
+    """Map a JSON array of {"id", "reply"} objects back to tweet positions.
+
+    Returns a list of length ``count``; entries that are missing, invalid or
+    given more than once are None, so they fall back to single generation
+    rather than risk a reply landing under the wrong tweet.
+    """
+    replies = [None] * count
+    try:
+        items = json.loads(_FENCE_RE.sub("", (raw or "").strip()))
+    except ValueError as e:
+        logger.warning(f"Batch response is not valid JSON: {e}")
+        return replies
+
+    if not isinstance(items, list):
+        logger.warning("Batch response is not a JSON array")
+        return replies
+
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index, reply = item.get("id"), item.get("reply")
+        if type(index) is not int or not 0 <= index < count:
+            continue
+        if index in seen:
+            logger.warning(f"Batch response has id {index} more than once, ignoring it")
+            replies[index] = None
+            continue
+        seen.add(index)
+        if isinstance(reply, str) and reply.strip():
+            replies[index] = reply.strip()
+    return replies
+
+
+async def generate_batch(texts, instructions, model, generate_one, template_version,
+                         generation_config=None, clean=None):
+    """Generate replies for several tweets with a single structured LLM call.
+
+    Cached replies are reused; the rest are sent in one request asking for
+    JSON output. Items that fail validation fall back to ``generate_one``.
+    ``template_version``, ``model`` and ``generation_config`` must match the
+    single-tweet path so both share cache entries.
+    """
+    cache = get_generation_cache()
+    keys = [cache_key(text, template_version, model, generation_config) for text in texts]
+    replies = [cache.get(key) for key in keys]
+    pending = [i for i, reply in enumerate(replies) if reply is None]
+
+    if len(pending) > 1:
+        config = dict(generation_config or {})
+        config["response_mime_type"] = "application/json"
+        if "max_output_tokens" in config:
+            config["max_output_tokens"] *= len(pending)
+
+        try:
+            raw = await get_llm_client().generate(
+                build_batch_prompt(instructions, [texts[i] for i in pending]),
+                model=model,
+                generation_config=config
+            )
+            batch_replies = parse_batch_response(raw, len(pending))
+        except Exception as e:
+            logger.error(f"Batch generation error: {e}")
+            batch_replies = [None] * len(pending)
+
+        for i, reply in zip(pending, batch_replies):
+            if reply and clean:
+                reply = clean(reply)
+            if reply:
+                replies[i] = reply
+                cache.put(keys[i], reply)
+        logger.info(f"Batch generated {sum(1 for r in batch_replies if r)}/{len(pending)} replies in one call")
+
+    # Per-tweet fallback for anything the batch didn't cover
+    missing = [i for i, reply in enumerate(replies) if not reply]
+    if missing:
+        results = await asyncio.gather(*(generate_one(texts[i]) for i in missing))
+        for i, reply in zip(missing, results):
+            replies[i] = reply
+    return replies
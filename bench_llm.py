@@ -0,0 +1,172 @@
+"""Load benchmark for the LLM layer against the local fake Gemini server.
+
+Starts fake_gemini_server in-process, points llm_client at it and drives a
+generation function at several concurrency levels, reporting p50/p95/p99
+latency, throughput and error counts.
+
+    python bench_llm.py --target replier --concurrency 1,4,16 --requests 200 --error-rate 0.05
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+from fake_gemini_server import start_fake_gemini_server
+
+TARGETS = ("client", "replier", "batch")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list (0.0 for an empty one)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def _configure_environment(base_url, backoff_base):
+    # llm_client and generation_cache read these at import time
+    os.environ["GEMINI_API_BASE"] = base_url
+    os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+    os.environ.setdefault("LLM_BACKOFF_BASE", str(backoff_base))
+    os.environ.setdefault("GENERATION_CACHE_DB", os.path.join(tempfile.mkdtemp(prefix="bench_llm_"), "cache.db"))
+
+
+def _make_call(target, batch_size):
+    """Return (async call(level, i), items per call) for the benchmarked function.
+
+    Prompts carry the level number as well as the call number, so no level
+    is served from the generation cache filled by an earlier one.
+    """
+    if target == "client":
+        from llm_client import get_llm_client
+
+        async def call(level, i):
+            return await get_llm_client().generate(f"Benchmark prompt {level}-{i}: what's next for rollups?")
+        return call, 1
+
+    if target == "replier":
+        from replier import generate_reply
+
+        async def call(level, i):
+            return await generate_reply(f"Benchmark tweet {level}-{i} about restaking and shared security")
+        return call, 1
+
+    from replier import generate_replies_batch
+
+    async def call(level, i):
+        texts = [f"Benchmark tweet {level}-{i}-{j} about modular data availability" for j in range(batch_size)]
+        replies = await generate_replies_batch(texts)
+        if not all(replies):
+            raise RuntimeError(f"{sum(1 for r in replies if not r)} of {batch_size} replies missing")
+        return replies
+    return call, batch_size
+
+
+async def run_level(call, level, concurrency, requests, server_config):
+    """Fire ``requests`` calls with at most ``concurrency`` in flight"""
+    import llm_client
+
+    # Fresh provider per level so connection pool size and breakers match the level
+    llm_client._client = llm_client.LLMProvider(llm_client.AsyncGeminiClient(max_concurrency=concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], {}
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await call(level, i)
+                if not result:
+                    raise RuntimeError("empty result")
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                name = type(e).__name__
+                errors[name] = errors.get(name, 0) + 1
+
+    requests_before = server_config.requests
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    provider = llm_client.get_llm_client()
+    await provider.close()
+    server_requests = server_config.requests - requests_before
+    # Every successful call must have reached the server (retries add more), or
+    # the level measured generation-cache hits instead of the LLM layer
+    assert server_requests >= len(latencies), \
+        f"Level {level}: {len(latencies)} successful calls but only {server_requests} server requests"
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": errors,
+        "server_requests": server_requests,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "prompt_tokens": provider.prompt_tokens,
+        "output_tokens": provider.output_tokens,
+    }
+
+
+def print_report(results, items_per_call):
+    print(f"{'conc':>5} {'ok':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>9} {'items/s':>9} {'server':>7}  errors")
+    for r in results:
+        error_count = sum(r["errors"].values())
+        print(f"{r['concurrency']:>5} {r['ok']:>6} {error_count:>5} {r['p50_ms']:>9} {r['p95_ms']:>9} "
+              f"{r['p99_ms']:>9} {r['throughput']:>9} {r['throughput'] * items_per_call:>9.2f} {r['server_requests']:>7}  {r['errors'] or ''}")
+
+
+async def run_benchmark(args, server_config):
+    call, items_per_call = _make_call(args.target, args.batch_size)
+    results = []
+    for level, concurrency in enumerate(args.concurrency):
+        results.append(await run_level(call, level, concurrency, args.requests, server_config))
+    return results, items_per_call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the LLM layer against a fake Gemini server")
+    parser.add_argument("--target", choices=TARGETS, default="replier",
+                        help="client: LLMProvider.generate, replier: generate_reply, batch: generate_replies_batch")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="calls per concurrency level")
+    parser.add_argument("--batch-size", type=int, default=8, help="tweets per call for --target batch")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--response-chars", type=int, default=200)
+    parser.add_argument("--backoff-base", type=float, default=0.05, help="LLM_BACKOFF_BASE used while benchmarking")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    server, base_url, config = start_fake_gemini_server(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, response_chars=args.response_chars, seed=args.seed
+    )
+    _configure_environment(base_url, args.backoff_base)
+    try:
+        results, items_per_call = asyncio.run(run_benchmark(args, config))
+    finally:
+        server.shutdown()
+
+    print(f"target={args.target} latency={args.latency}s±{args.jitter} error_rate={args.error_rate} "
+          f"rate_limit_rate={args.rate_limit_rate} server_requests={config.requests}")
+    print_report(results, items_per_call)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
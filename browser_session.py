@@ -0,0 +1,155 @@
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from twitter_client import start_playwright, launch_browser_context, new_bot_page, ensure_logged_in
+from traffic_replay import replaying, block_unrecorded
+
+logger = logging.getLogger(__name__)
+
+# Seconds allowed for the cheap liveness probe before the browser is considered dead
+LIVENESS_TIMEOUT = float(os.getenv("BROWSER_LIVENESS_TIMEOUT", "5"))
+
+
+class BrowserSession:
+    """Owns the Playwright driver, browser context and pages for the whole process.
+
+    Tasks lease a named page with ``lease()``; the session checks liveness
+    cheaply on each lease and only relaunches (and logs in again) when the
+    browser or page has actually died.
+    """
+
+    def __init__(self, headless=False):
+        self.headless = headless
+        self.playwright = None
+        self.context = None
+        self.launch_count = 0
+        self._pages = {}
+        self._page_locks = {}
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Start Playwright (once), launch the context and log in"""
+        if self.playwright is None:
+            self.playwright = await start_playwright()
+
+        self.context = await launch_browser_context(self.playwright, headless=self.headless)
+        self.launch_count += 1
+
+        # The persistent context always opens with one blank page; reuse it
+        page = self.context.pages[0] if self.context.pages else await new_bot_page(self.context)
+        page.set_default_timeout(45000)
+        self._pages = {"main": page}
+        if replaying():
+            # Recorded pages are served from HAR files; nothing else reaches the network
+            await block_unrecorded(self.context)
+        else:
+            await ensure_logged_in(page)
+        logger.info(f"Browser session ready (launch #{self.launch_count})")
+
+    async def is_alive(self):
+        """Cheap liveness probe: the context is open and the main page answers JS"""
+        page = self._pages.get("main")
+        if self.context is None or page is None or page.is_closed():
+            return False
+        try:
+            await asyncio.wait_for(page.evaluate("1"), LIVENESS_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.warning(f"Browser liveness check failed: {e}")
+            return False
+
+    async def ensure(self, check_login=False):
+        """Make sure the browser is running, relaunching it only when needed"""
+        async with self._lock:
+            if not await self.is_alive():
+                if self.context is not None:
+                    logger.warning("Browser session is dead, relaunching...")
+                await self._close_context()
+                await self.start()
+            elif check_login and not replaying():
+                await ensure_logged_in(self._pages["main"])
+
+    async def get_page(self, name="main"):
+        """Return the named page, opening it in the shared context if needed"""
+        await self.ensure()
+        page = self._pages.get(name)
+        if page is None or page.is_closed():
+            page = await new_bot_page(self.context)
+            self._pages[name] = page
+        return page
+
+    @property
+    def pages(self):
+        """Currently open pages by name"""
+        return dict(self._pages)
+
+    async def recycle_page(self, name="main"):
+        """Replace a page with a fresh one to drop its accumulated DOM and JS heap"""
+        lock = self._page_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            old_page = self._pages.pop(name, None)
+            if self.context is None:
+                return
+            self._pages[name] = await new_bot_page(self.context)
+            if old_page is not None and not old_page.is_closed():
+                try:
+                    await old_page.close()
+                except Exception as e:
+                    logger.error(f"Page close error: {e}")
+
+    @asynccontextmanager
+    async def lease(self, name="main"):
+        """Lease a named page; only one task uses a given page at a time"""
+        lock = self._page_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            yield await self.get_page(name)
+
+    async def _close_context(self):
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception as e:
+                logger.error(f"Browser context close error: {e}")
+        self.context = None
+        self._pages = {}
+
+    async def restart(self):
+        """Force a relaunch of the browser context.
+
+        Waits until no page is leased; must not be called while holding a lease.
+        """
+        locks = list(self._page_locks.values())
+        for lock in locks:
+            await lock.acquire()
+        try:
+            async with self._lock:
+                await self._close_context()
+                await self.start()
+        finally:
+            for lock in locks:
+                lock.release()
+
+    async def close(self):
+        """Close the context and stop the Playwright driver"""
+        async with self._lock:
+            await self._close_context()
+            if self.playwright is not None:
+                try:
+                    await self.playwright.stop()
+                except Exception as e:
+                    logger.error(f"Playwright stop error: {e}")
+                self.playwright = None
+
+
+# Process-wide session
+_session = None
+
+
+def get_browser_session():
+    """Return the shared BrowserSession (headless when running on Render)"""
+    global _session
+    if _session is None:
+        _session = BrowserSession(headless=bool(os.environ.get('RENDER', False)))
+    return _session
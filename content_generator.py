@@ -1,17 +1,21 @@
-import os
 from dotenv import load_dotenv
 import textwrap
 from logging import getLogger
 import random
-import google.generativeai as genai
+import re
+import hashlib
 from config import PROJECTS
+from generation_cache import get_generation_cache, cache_key
+from llm_client import get_llm_client
 
 # Load environment variables
 load_dotenv()
 
-# Configure Google Gemini API
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel('gemini-1.5-flash')
+# Google Gemini model (requests go through llm_client)
+GEMINI_MODEL = 'gemini-1.5-flash'
+
+# Bump when the reply prompt changes so cached replies are not reused
+REPLY_PROMPT_VERSION = "1"
 
 # Fallback content to use in case of API errors
 FALLBACK_REPLIES = [
@@ -32,9 +36,34 @@ FALLBACK_CONTENT = [
     "@{handle} is one to watch in the evolving Web3 landscape. Their focus on {problem} addresses a critical need, and their technical execution appears solid. Interested to see their ecosystem growth in Q3/Q4. #Blockchain #Innovation #{hashtag}"
 ]
 
+# Values filled into FALLBACK_CONTENT templates
+FALLBACK_PROBLEMS = ["scaling", "security", "interoperability", "data availability", "decentralized computing"]
+FALLBACK_SECTORS = ["DeFi", "infrastructure", "data", "payments", "gaming"]
+
 logger = getLogger(__name__)
 
-def generate_web3_reply(tweet_text, keyword=None):
+def _stable_index(seed, size):
+    """Pick the same index for the same seed across runs (unlike random/hash())"""
+    return int(hashlib.sha256(seed.encode("utf-8")).hexdigest(), 16) % size
+
+def offline_reply(tweet_text):
+    """Deterministic reply used when no model is reachable"""
+    return FALLBACK_REPLIES[_stable_index(tweet_text or "", len(FALLBACK_REPLIES))]
+
+def offline_content(project):
+    """Deterministic project post used when no model is reachable"""
+    name = project["name"]
+    handle = project.get("twitter", "").lstrip("@") or name.replace(" ", "")
+    template = FALLBACK_CONTENT[_stable_index(name, len(FALLBACK_CONTENT))]
+    return template.format(
+        project=name,
+        handle=handle,
+        problem=FALLBACK_PROBLEMS[_stable_index(name + ":problem", len(FALLBACK_PROBLEMS))],
+        sector=FALLBACK_SECTORS[_stable_index(name + ":sector", len(FALLBACK_SECTORS))],
+        hashtag=re.sub(r"\W", "", name)
+    )
+
+async def generate_web3_reply(tweet_text, keyword=None):
     """Generate a reply to a tweet, optionally focused on a keyword"""
     
     prompt = f"""
@@ -56,20 +85,25 @@ def generate_web3_reply(tweet_text, keyword=None):
     Provide ONLY the reply text, with no additional explanations.
     """
     
+    cache = get_generation_cache()
+    key = cache_key(prompt, REPLY_PROMPT_VERSION, GEMINI_MODEL)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    
     try:
-        response = model.generate_content(prompt)
-        reply = response.text.strip()
+        reply = await get_llm_client().generate(prompt, model=GEMINI_MODEL)
         
         # Check for Twitter's character limit
         if len(reply) > 280:
             reply = textwrap.shorten(reply, width=277, placeholder="...")
         
+        cache.put(key, reply)
         return reply
     except Exception as e:
         print(f"Gemini API reply generation error: {e}")
         # Use fallback content
-        reply = random.choice(FALLBACK_REPLIES)
-        return reply
+        return offline_reply(tweet_text)
 
 def generate_web3_content():
     """Generate content about a random web3 project"""
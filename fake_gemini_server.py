@@ -0,0 +1,144 @@
+"""Local stand-in for the Gemini generateContent endpoint.
+
+Point the bot at it with GEMINI_API_BASE=http://127.0.0.1:<port>/v1beta and
+any GEMINI_API_KEY. Latency, error rate and response size are configurable
+so client overhead and concurrency behaviour can be measured offline.
+
+    python fake_gemini_server.py --port 8089 --latency 0.4 --jitter 0.2 --error-rate 0.05
+"""
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import http.server
+
+logger = logging.getLogger(__name__)
+
+_PATH_RE = re.compile(r"^/v1beta/models/([^/:]+):generateContent$")
+_BATCH_ID_RE = re.compile(r"\[id (\d+)\]")
+
+_WORDS = ("rollup", "validator", "liquidity", "sequencer", "restaking", "oracle",
+          "bridge", "throughput", "governance", "airdrop", "modular", "onchain")
+
+
+class FakeGeminiConfig:
+    """Behaviour of the fake server; mutable while it runs"""
+
+    def __init__(self, latency=0.3, jitter=0.1, error_rate=0.0, rate_limit_rate=0.0,
+                 response_chars=200, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.response_chars = response_chars
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def _fake_text(rng, chars):
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(_WORDS))
+    return " ".join(words)[:chars]
+
+
+class FakeGeminiHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    config = None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        match = _PATH_RE.match(self.path.split("?")[0])
+        if not match:
+            return self._send(404, {"error": {"code": 404, "message": "Not found"}})
+
+        config = self.config
+        with config.lock:
+            config.requests += 1
+            roll = config.random.random()
+            delay = max(0.0, config.latency + config.random.uniform(-config.jitter, config.jitter))
+        time.sleep(delay)
+
+        if roll < config.error_rate:
+            return self._send(503, {"error": {"code": 503, "message": "The model is overloaded."}})
+        if roll < config.error_rate + config.rate_limit_rate:
+            return self._send(429, {"error": {"code": 429, "message": "Resource has been exhausted."}})
+
+        try:
+            request = json.loads(body or b"{}")
+            prompt = request["contents"][0]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError):
+            return self._send(400, {"error": {"code": 400, "message": "Invalid JSON payload."}})
+
+        mime_type = (request.get("generationConfig") or {}).get("responseMimeType")
+        with config.lock:
+            if mime_type == "application/json":
+                ids = [int(i) for i in _BATCH_ID_RE.findall(prompt)] or [0]
+                text = json.dumps([{"id": i, "reply": _fake_text(config.random, config.response_chars)} for i in ids])
+            else:
+                text = _fake_text(config.random, config.response_chars)
+
+        self._send(200, {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}],
+            "usageMetadata": {
+                "promptTokenCount": len(prompt) // 4,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": (len(prompt) + len(text)) // 4,
+            },
+            "modelVersion": match.group(1),
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        return
+
+
+def start_fake_gemini_server(port=0, **config_kwargs):
+    """Start the server in a daemon thread; returns (server, base_url, config)"""
+    config = FakeGeminiConfig(**config_kwargs)
+    handler = type("BoundFakeGeminiHandler", (FakeGeminiHandler,), {"config": config})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+    return server, base_url, config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Gemini generateContent server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.3, help="mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="uniform +/- latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--response-chars", type=int, default=200, help="length of generated text")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server, base_url, _ = start_fake_gemini_server(
+        port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, response_chars=args.response_chars, seed=args.seed
+    )
+    print(f"Fake Gemini listening: GEMINI_API_BASE={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""Offline stand-in for the parts of twitter.com the bot drives.
+
+Serves profile, tweet and compose pages with the same ``data-testid``
+markup the selectors in twitter_client rely on, the UserTweets timeline
+JSON used by network extraction, and records posted tweets. Point the
+bot at it with TWITTER_BASE_URL=http://127.0.0.1:<port>.
+
+    python fake_twitter_server.py --port 8090 --timeline-size 50 --large-account whale:5000
+"""
+import re
+import sys
+import html
+import json
+import time
+import logging
+import argparse
+import threading
+import http.server
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+# Snowflake-sized IDs (above 2**53) so BigInt handling is exercised
+FIRST_TWEET_ID = 1800000000000000000
+TWEET_INTERVAL_SECONDS = 600
+
+_TIMELINE_API_RE = re.compile(r"^/i/api/graphql/[^/]+/(UserTweets|UserTweetsAndReplies|UserMedia)$")
+_CREATE_TWEET_RE = re.compile(r"^/i/api/graphql/[^/]+/CreateTweet$")
+_STATUS_RE = re.compile(r"^/(\w{1,15})/status/(\d+)$")
+_PROFILE_RE = re.compile(r"^/(\w{1,15})$")
+
+_TOPICS = ("rollup", "restaking", "sequencer", "bridge", "oracle", "validator set", "intent layer", "DA layer")
+
+
+class FakeTwitterConfig:
+    """Timelines served by the fake site and the tweets posted to it"""
+
+    def __init__(self, timeline_size=20, timelines=None, pinned=True, latency=0.0, api_page_size=20):
+        self.timeline_size = timeline_size
+        self.timelines = dict(timelines or {})
+        self.pinned = pinned
+        self.latency = latency
+        self.api_page_size = api_page_size
+        self.started_at = time.time()
+        self.posts = []
+        self.lock = threading.Lock()
+        self._profiles = {}
+
+    def tweets(self, account):
+        """Tweets of an account, newest first; the pinned one (if any) is an old tweet"""
+        count = self.timelines.get(account, self.timeline_size)
+        tweets = []
+        for i in range(count):
+            tweets.append({
+                "id": str(FIRST_TWEET_ID - i * 1000),
+                "text": f"{account} update {i}: what does the {_TOPICS[i % len(_TOPICS)]} roadmap mean for fees? #{i}",
+                "created": self.started_at - i * TWEET_INTERVAL_SECONDS,
+                "pinned": False,
+            })
+        if self.pinned and count:
+            tweets.insert(0, {
+                "id": str(FIRST_TWEET_ID - count * 1000 - 7),
+                "text": f"{account} pinned: read this thread first",
+                "created": self.started_at - (count + 30) * TWEET_INTERVAL_SECONDS,
+                "pinned": True,
+            })
+        return tweets
+
+    def profile_html(self, account):
+        with self.lock:
+            if account not in self._profiles:
+                self._profiles[account] = render_profile(account, self.tweets(account))
+            return self._profiles[account]
+
+    def record_post(self, post):
+        with self.lock:
+            self.posts.append(post)
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _created_at(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%a %b %d %H:%M:%S +0000 %Y")
+
+
+def render_article(account, tweet):
+    social = '<div data-testid="socialContext">Pinned</div>' if tweet["pinned"] else ""
+    return f"""<article data-testid="tweet" role="article" tabindex="0">{social}
+<div data-testid="User-Name"><a href="/{account}" role="link">{account}</a>
+<a href="/{account}/status/{tweet['id']}" role="link"><time datetime="{_iso(tweet['created'])}">now</time></a></div>
+<div data-testid="tweetText" lang="en" dir="auto">{html.escape(tweet['text'])}</div>
+<div role="group"><div role="button" data-testid="reply" aria-label="Reply">Reply</div>
+<div role="button" data-testid="retweet">Repost</div><div role="button" data-testid="like">Like</div></div>
+</article>"""
+
+
+# Compose dialog, injected on demand so waits on its selectors are real.
+# In "reply" mode the dialog closes after posting; in "post" mode it is
+# cleared and stays open so a thread can be typed into the same box.
+COMPOSER_JS = """
+function openComposer(mode, inReplyTo) {
+  if (document.querySelector("[data-testid='tweetTextarea_0']")) return;
+  const dialog = document.createElement("div");
+  dialog.setAttribute("role", "dialog");
+  dialog.setAttribute("aria-modal", "true");
+  dialog.innerHTML = '<div data-testid="tweetTextarea_0" role="textbox" contenteditable="true" aria-label="Post text"></div>' +
+    '<div role="button" data-testid="addButton" aria-label="Add post">Add</div>' +
+    '<div role="button" data-testid="tweetButton">' + (mode === "reply" ? "Reply" : "Post") + '</div>';
+  document.body.appendChild(dialog);
+  dialog.querySelector("[data-testid='tweetButton']").addEventListener("click", () => {
+    const box = dialog.querySelector("[data-testid='tweetTextarea_0']");
+    const text = box.innerText;
+    if (mode === "reply") { dialog.remove(); } else { box.innerText = ""; }
+    fetch("/i/api/graphql/fixture/CreateTweet", {
+      method: "POST",
+      headers: {"Content-Type": "application/json"},
+      body: JSON.stringify({text: text, in_reply_to: inReplyTo || null})
+    });
+  });
+}
+document.addEventListener("click", (event) => {
+  const reply = event.target.closest("[data-testid='reply']");
+  if (reply) {
+    const link = reply.closest("article").querySelector("a[href*='/status/']");
+    openComposer("reply", link.getAttribute("href").split("/").pop());
+  }
+  const compose = event.target.closest("[data-testid='SideNav_NewTweet_Button']");
+  if (compose) { event.preventDefault(); openComposer("post", null); }
+});
+"""
+
+
+def _page(title, body, script=""):
+    return f"""<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{html.escape(title)}</title></head>
+<body><header role="banner"><a href="/compose/tweet" data-testid="SideNav_NewTweet_Button" role="link">Post</a></header>
+<main role="main"><div data-testid="primaryColumn">{body}</div></main>
+<script>{COMPOSER_JS}{script}</script></body></html>"""
+
+
+def render_profile(account, tweets):
+    articles = "\n".join(render_article(account, t) for t in tweets)
+    # The real client loads the timeline with a GraphQL request after the shell renders
+    variables = json.dumps(json.dumps({"screen_name": account, "count": 20}))
+    script = f'fetch("/i/api/graphql/fixture/UserTweets?variables=" + encodeURIComponent({variables}));'
+    body = f'<h2 role="heading">{account}</h2><section aria-label="Timeline">{articles}</section>'
+    return _page(f"{account} / X", body, script)
+
+
+def render_status(account, tweet):
+    return _page(f"{account} on X", f'<section aria-label="Conversation">{render_article(account, tweet)}</section>')
+
+
+def render_home(open_composer=False):
+    script = 'openComposer("post", null);' if open_composer else ""
+    return _page("Home / X", '<section aria-label="Timeline"></section>', script)
+
+
+def timeline_json(account, tweets, page_size):
+    """UserTweets response in the shape timeline_capture.parse_timeline reads"""
+    def result(tweet):
+        return {"__typename": "Tweet", "rest_id": tweet["id"],
+                "core": {"user_results": {"result": {"legacy": {"screen_name": account}}}},
+                "legacy": {"id_str": tweet["id"], "full_text": tweet["text"],
+                           "created_at": _created_at(tweet["created"]), "lang": "en"}}
+
+    def entry(tweet):
+        return {"entryId": f"tweet-{tweet['id']}",
+                "content": {"itemContent": {"tweet_results": {"result": result(tweet)}}}}
+
+    instructions = []
+    pinned = [t for t in tweets if t["pinned"]]
+    if pinned:
+        instructions.append({"type": "TimelinePinEntry", "entry": entry(pinned[0])})
+    regular = [t for t in tweets if not t["pinned"]][:page_size]
+    instructions.append({"type": "TimelineAddEntries", "entries": [entry(t) for t in regular]})
+    return {"data": {"user": {"result": {"timeline_v2": {"timeline": {"instructions": instructions}}}}}}
+
+
+class FakeTwitterHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        config = self.config
+
+        match = _TIMELINE_API_RE.match(path)
+        if match:
+            variables = json.loads(parse_qs(url.query).get("variables", ["{}"])[0])
+            account = variables.get("screen_name", "")
+            return self._send(200, "application/json",
+                              json.dumps(timeline_json(account, config.tweets(account), config.api_page_size)))
+
+        if config.latency:
+            time.sleep(config.latency)
+
+        if path in ("/", "/home"):
+            return self._send(200, "text/html", render_home())
+        if path == "/compose/tweet":
+            return self._send(200, "text/html", render_home(open_composer=True))
+
+        match = _STATUS_RE.match(path)
+        if match:
+            account, tweet_id = match.groups()
+            tweet = next((t for t in config.tweets(account) if t["id"] == tweet_id), None)
+            if tweet is None:
+                return self._send(404, "text/html", _page("Not found", "<span>This post doesn't exist</span>"))
+            return self._send(200, "text/html", render_status(account, tweet))
+
+        match = _PROFILE_RE.match(path)
+        if match:
+            return self._send(200, "text/html", config.profile_html(match.group(1)))
+
+        self._send(404, "text/html", _page("Not found", "<span>This page doesn't exist</span>"))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not _CREATE_TWEET_RE.match(urlsplit(self.path).path):
+            return self._send(404, "application/json", "{}")
+        post = json.loads(body or b"{}")
+        post["posted_at"] = time.time()
+        self.config.record_post(post)
+        self._send(200, "application/json", json.dumps({"data": {"create_tweet": {"tweet_results": {}}}}))
+
+    def _send(self, status, content_type, text):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        return
+
+
+def start_fake_twitter_server(port=0, **config_kwargs):
+    """Start the server in a daemon thread; returns (server, base_url, config)"""
+    config = FakeTwitterConfig(**config_kwargs)
+    handler = type("BoundFakeTwitterHandler", (FakeTwitterHandler,), {"config": config})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake twitter.com fixture server")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--timeline-size", type=int, default=20, help="tweets per profile")
+    parser.add_argument("--large-account", action="append", default=[], metavar="NAME:SIZE",
+                        help="give one account a different timeline size (repeatable)")
+    parser.add_argument("--no-pinned", action="store_true", help="don't add a pinned tweet to profiles")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every page load")
+    args = parser.parse_args(argv)
+
+    timelines = {name: int(size) for name, size in (spec.split(":") for spec in args.large_account)}
+    server, base_url, config = start_fake_twitter_server(
+        port=args.port, timeline_size=args.timeline_size, timelines=timelines,
+        pinned=not args.no_pinned, latency=args.latency
+    )
+    print(f"Fake Twitter listening: TWITTER_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"{len(config.posts)} posts received")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+
+from metrics import CACHE_LOOKUPS
+from state_store import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# SQLite database holding cached LLM generations
+GENERATION_CACHE_DB = os.getenv("GENERATION_CACHE_DB", os.path.join(DATA_DIR, "generation_cache.db"))
+
+# Entries older than this are treated as missing (default 7 days)
+GENERATION_CACHE_TTL = float(os.getenv("GENERATION_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Least recently used entries are evicted past this many rows
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "5000"))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    cache_key   TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_generations_last_access ON generations (last_access);
+CREATE INDEX IF NOT EXISTS idx_generations_created_at ON generations (created_at);
+"""
+
+
+def normalize_text(text):
+    """Normalize unicode and whitespace so trivially different copies share a key"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def cache_key(text, template_version, model, generation_config=None):
+    """Content address of a generation: input text + prompt version + model + config.
+
+    The text is compared after unicode, whitespace and case folding, so
+    copies of a tweet that differ only in those share a reply.
+    """
+    material = json.dumps({
+        "text": normalize_text(text).casefold(),
+        "template": template_version,
+        "model": model,
+        "config": generation_config or {},
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """Persistent LRU/TTL cache of LLM outputs keyed by ``cache_key()``"""
+
+    def __init__(self, path=GENERATION_CACHE_DB, ttl=GENERATION_CACHE_TTL, max_entries=GENERATION_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, key):
+        """Return the cached value or None; a hit refreshes the entry's LRU position"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM generations WHERE cache_key = ? AND created_at > ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                CACHE_LOOKUPS.inc(cache="generation", result="miss")
+                return None
+            self._conn.execute("UPDATE generations SET last_access = ? WHERE cache_key = ?", (now, key))
+            self.hits += 1
+        CACHE_LOOKUPS.inc(cache="generation", result="hit")
+        return row[0]
+
+    def put(self, key, value):
+        """Store a generation, then drop expired rows and the LRU overflow"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generations (cache_key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            expired = self._conn.execute(
+                "DELETE FROM generations WHERE created_at <= ?", (now - self.ttl,)
+            ).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM generations").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """DELETE FROM generations WHERE cache_key IN (
+                           SELECT cache_key FROM generations ORDER BY last_access LIMIT ?)""",
+                    (overflow,)
+                )
+            self.evictions += expired + max(overflow, 0)
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM generations").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide cache, opened on first use
+_cache = None
+
+
+def get_generation_cache():
+    """Return the shared GenerationCache, opening it on first call"""
+    global _cache
+    if _cache is None:
+        _cache = GenerationCache()
+    return _cache
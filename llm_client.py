@@ -0,0 +1,291 @@
+import os
+import time
+import random
+import asyncio
+import logging
+
+from metrics import LLM_REQUEST_SECONDS, LLM_TOKENS
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# REST base of the Gemini API (point at a local stand-in for testing)
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# Models tried, in order, after the requested one fails (comma separated)
+LLM_FALLBACK_MODELS = [m.strip() for m in os.getenv("LLM_FALLBACK_MODELS", "gemini-1.5-flash").split(",") if m.strip()]
+
+# At most this many generation requests in flight at once
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# Default per-call deadline in seconds
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+
+# Retries per model for timeouts, 429 and 5xx, with jittered exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+# A model's circuit opens after this many consecutive failures and stays open this long
+LLM_CIRCUIT_FAILURES = int(os.getenv("LLM_CIRCUIT_FAILURES", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "120"))
+
+# When every model fails, reply paths use the deterministic offline fallback text
+LLM_OFFLINE_FALLBACK = os.getenv("LLM_OFFLINE_FALLBACK", "false").lower() == "true"
+
+
+class LLMError(Exception):
+    """Raised when a generation request fails or returns no text"""
+
+
+class LLMRetryableError(LLMError):
+    """A failure worth retrying: timeout, connection error, 429 or 5xx"""
+
+
+class LLMConfigError(LLMError):
+    """Raised when the client is not configured (missing API key)"""
+
+
+class CircuitOpenError(LLMError):
+    """Raised without a request while a model's circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Closed: calls go through. After ``failure_threshold`` consecutive
+    failures it opens and rejects calls for ``reset_seconds``; then a single
+    trial call is let through (half-open) and its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold=LLM_CIRCUIT_FAILURES, reset_seconds=LLM_CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def release(self):
+        """End a trial call without a verdict, e.g. a bad request the model did answer"""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+def backoff_delay(attempt, base=LLM_BACKOFF_BASE, cap=LLM_BACKOFF_MAX):
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AsyncGeminiClient:
+    """Non-blocking Gemini ``generateContent`` transport.
+
+    One keep-alive connection pool is shared by all calls, concurrency is
+    bounded by a semaphore, and every call has its own deadline. Cancelling
+    the awaiting task aborts the HTTP request. Each call is a single attempt;
+    retries and fallbacks live in ``LLMProvider``.
+    """
+
+    def __init__(self, api_key=None, base_url=GEMINI_API_BASE,
+                 max_concurrency=LLM_MAX_CONCURRENCY, timeout=LLM_TIMEOUT):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+
+    def _get_session(self):
+        # aiohttp is imported on first use so importing this module stays cheap
+        import aiohttp
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def generate(self, prompt, model=DEFAULT_MODEL, generation_config=None,
+                       system_instruction=None, timeout=None):
+        """Generate text for a prompt and return it stripped; raises LLMError"""
+        api_key = self.api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise LLMConfigError("GEMINI_API_KEY not found in environment variables")
+
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        if generation_config:
+            payload["generationConfig"] = _camel_case_config(generation_config)
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+
+        import aiohttp
+        url = f"{self.base_url}/models/{model}:generateContent"
+        deadline = aiohttp.ClientTimeout(total=timeout or self.timeout)
+
+        async with self._semaphore:
+            with span("llm.generate", model=model):
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    async with self._get_session().post(
+                        url, json=payload, headers={"x-goog-api-key": api_key}, timeout=deadline
+                    ) as response:
+                        if response.status != 200:
+                            body = await response.text()
+                            error = f"Gemini API returned {response.status}: {body[:200]}"
+                            if response.status == 429 or response.status >= 500:
+                                raise LLMRetryableError(error)
+                            raise LLMError(error)
+                        result = await response.json()
+                    outcome = "ok"
+                except asyncio.TimeoutError:
+                    outcome = "timeout"
+                    raise LLMRetryableError(f"Gemini API call timed out after {deadline.total}s")
+                except aiohttp.ClientError as e:
+                    raise LLMRetryableError(f"Gemini API request error: {e}")
+                finally:
+                    LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, model=model, outcome=outcome)
+
+        usage = result.get("usageMetadata") or {}
+        self.prompt_tokens += usage.get("promptTokenCount", 0)
+        self.output_tokens += usage.get("candidatesTokenCount", 0)
+        LLM_TOKENS.inc(usage.get("promptTokenCount", 0), model=model, kind="prompt")
+        LLM_TOKENS.inc(usage.get("candidatesTokenCount", 0), model=model, kind="output")
+
+        try:
+            text = result["candidates"][0]["content"]["parts"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            raise LLMError("Empty response from Gemini API")
+        if not text or not text.strip():
+            raise LLMError("No text in Gemini API response")
+        return text.strip()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class LLMProvider:
+    """The single entry point for text generation.
+
+    Tries the requested model and then LLM_FALLBACK_MODELS. Each model gets
+    retries with jittered exponential backoff and its own circuit breaker,
+    so a failing model is skipped immediately instead of costing a full
+    timeout per tweet. Raises LLMError when every model fails.
+    """
+
+    def __init__(self, client=None, fallback_models=None, max_retries=LLM_MAX_RETRIES):
+        self.client = client or AsyncGeminiClient()
+        self.fallback_models = LLM_FALLBACK_MODELS if fallback_models is None else fallback_models
+        self.max_retries = max_retries
+        self.breakers = {}
+
+    @property
+    def prompt_tokens(self):
+        return self.client.prompt_tokens
+
+    @property
+    def output_tokens(self):
+        return self.client.output_tokens
+
+    def breaker(self, model):
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker()
+        return self.breakers[model]
+
+    async def generate(self, prompt, model=DEFAULT_MODEL, **kwargs):
+        """Generate text, walking the model fallback chain; raises LLMError"""
+        chain = [model] + [m for m in self.fallback_models if m != model]
+        last_error = None
+
+        for current in chain:
+            breaker = self.breaker(current)
+            for attempt in range(self.max_retries + 1):
+                if not breaker.allow():
+                    last_error = CircuitOpenError(f"Circuit open for {current}")
+                    logger.warning(f"Skipping {current}: circuit breaker open")
+                    break
+                try:
+                    text = await self.client.generate(prompt, model=current, **kwargs)
+                    breaker.record_success()
+                    return text
+                except LLMRetryableError as e:
+                    breaker.record_failure()
+                    last_error = e
+                    if attempt < self.max_retries:
+                        delay = backoff_delay(attempt)
+                        logger.warning(f"{current} failed ({e}), retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                except LLMConfigError:
+                    breaker.release()
+                    raise
+                except LLMError as e:
+                    # Bad request or empty answer: retrying the same model won't help,
+                    # but the model did respond, so it doesn't count towards opening
+                    breaker.release()
+                    last_error = e
+                    break
+                except asyncio.CancelledError:
+                    # Shutdown, not the model's fault: end any trial call without a verdict
+                    breaker.release()
+                    raise
+                except BaseException:
+                    # An unexpected error must not leave a trial call pending
+                    breaker.record_failure()
+                    raise
+            logger.warning(f"Model {current} failed: {last_error}")
+
+        raise last_error or LLMError("No model available")
+
+    async def close(self):
+        await self.client.close()
+
+
+def _camel_case_config(config):
+    """Accept the snake_case keys the google-generativeai SDK uses (top_p -> topP)"""
+    converted = {}
+    for key, value in config.items():
+        head, *rest = key.split("_")
+        converted[head + "".join(part.title() for part in rest)] = value
+    return converted
+
+
+# Process-wide provider
+_client = None
+
+
+def get_llm_client():
+    """Return the shared LLMProvider"""
+    global _client
+    if _client is None:
+        _client = LLMProvider()
+    return _client
@@ -0,0 +1,165 @@
+"""Logging pipeline for the bot's entry points.
+
+Records are put on an unbounded queue by a QueueHandler and written by a
+QueueListener thread, so logging never blocks the event loop on disk or
+console I/O. The log file rotates by size and by age, can be written as
+JSON lines carrying the current cycle's correlation ID, and stray
+``print()`` output can be routed through the same pipeline.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import contextvars
+import logging.handlers
+from contextlib import contextmanager
+
+# Log file (empty to log to the console only)
+LOG_FILE = os.getenv("LOG_FILE", "web3bot.log")
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Rotate the log file at this size or age (seconds, 0 disables); keep this many old files
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_MAX_AGE = float(os.getenv("LOG_MAX_AGE", str(24 * 3600)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+
+# "text" (default) or "json" (one JSON object per line) for the log file
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+# Route print() output into the log as well (logger "print")
+LOG_CAPTURE_PRINT = os.getenv("LOG_CAPTURE_PRINT", "1").lower() in ("1", "true", "yes")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Correlation ID of the cycle the current task is working on
+_cycle_id = contextvars.ContextVar("log_cycle_id", default=None)
+
+# (listener, queue handler, original stdout) while the pipeline is running
+_pipeline = None
+
+
+@contextmanager
+def log_cycle(task):
+    """Tag every record logged inside the block (and tasks it starts) with a new cycle ID"""
+    token = _cycle_id.set(f"{task}-{uuid.uuid4().hex[:8]}")
+    try:
+        yield _cycle_id.get()
+    finally:
+        _cycle_id.reset(token)
+
+
+class CycleFilter(logging.Filter):
+    """Attach the cycle ID; installed on the QueueHandler so it runs in the caller's context"""
+
+    def filter(self, record):
+        record.cycle_id = _cycle_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        cycle_id = getattr(record, "cycle_id", None)
+        if cycle_id:
+            entry["cycle"] = cycle_id
+        # QueueHandler has already folded any traceback into the message
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Numbered rotation when the file reaches ``max_bytes`` or is older than ``max_age`` seconds"""
+
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, max_age=LOG_MAX_AGE, backup_count=LOG_BACKUP_COUNT):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_age = max_age
+        self.opened_at = time.time()
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() - self.opened_at >= self.max_age:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.opened_at = time.time()
+
+
+class PrintToLog:
+    """File-like stand-in for sys.stdout that logs each complete line"""
+
+    def __init__(self, logger, level=logging.INFO):
+        self.logger = logger
+        self.level = level
+        self._buffer = ""
+
+    def write(self, text):
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            if line.strip():
+                self.logger.log(self.level, line.rstrip())
+        return len(text)
+
+    def flush(self):
+        if self._buffer.strip():
+            self.logger.log(self.level, self._buffer.rstrip())
+        self._buffer = ""
+
+    def isatty(self):
+        return False
+
+
+def setup_logging(log_file=LOG_FILE, fmt=LOG_FORMAT, capture_print=LOG_CAPTURE_PRINT, level=LOG_LEVEL):
+    """Install the queue-based pipeline on the root logger; safe to call more than once"""
+    global _pipeline
+    if _pipeline is not None:
+        return
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [console]
+    if log_file:
+        file_handler = RotatingLogHandler(log_file)
+        file_handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(CycleFilter())
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    stdout = sys.stdout
+    if capture_print:
+        sys.stdout = PrintToLog(logging.getLogger("print"))
+    _pipeline = (listener, queue_handler, stdout)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records, stop the listener and restore stdout"""
+    global _pipeline
+    if _pipeline is None:
+        return
+    listener, queue_handler, stdout = _pipeline
+    _pipeline = None
+    if isinstance(sys.stdout, PrintToLog):
+        sys.stdout.flush()
+        sys.stdout = stdout
+    logging.getLogger().removeHandler(queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
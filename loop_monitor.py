@@ -0,0 +1,206 @@
+"""Opt-in detector for code that blocks the asyncio event loop.
+
+A ticker task wakes every LOOP_MONITOR_INTERVAL seconds and records how late
+it woke (the loop lag). A watchdog thread notices when the ticker has not run
+for LOOP_BLOCK_THRESHOLD seconds, i.e. a callback is holding the loop, and
+captures the loop thread's stack with ``sys._current_frames()`` while it is
+still blocked. Blocks are grouped by stack and written, with lag percentiles,
+to LOOP_MONITOR_REPORT when monitoring stops:
+
+    LOOP_MONITOR=1 LOOP_BLOCK_THRESHOLD=0.1 python main.py
+"""
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+# Set to 1 to run the detector (adds a ticker task and a watchdog thread)
+LOOP_MONITOR = os.getenv("LOOP_MONITOR", "0").lower() in ("1", "true", "yes")
+
+# The loop counts as blocked when the ticker hasn't run for this many seconds
+LOOP_BLOCK_THRESHOLD = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.1"))
+
+# How often the ticker wakes to measure lag (seconds)
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.05"))
+
+# JSON report written when monitoring stops
+LOOP_MONITOR_REPORT = os.getenv("LOOP_MONITOR_REPORT", "loop_report.json")
+
+# The watchdog thread also rewrites the report this often (seconds), so long runs leave evidence
+LOOP_MONITOR_REPORT_INTERVAL = float(os.getenv("LOOP_MONITOR_REPORT_INTERVAL", "300"))
+
+# Lag samples kept for the percentiles in the report
+LAG_HISTORY = 20000
+
+# Innermost frames used to group blocks that come from the same place
+STACK_KEY_FRAMES = 6
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LoopMonitor:
+    """Measures event-loop lag and captures the stack of every callback that blocks the loop"""
+
+    def __init__(self, threshold=LOOP_BLOCK_THRESHOLD, interval=LOOP_MONITOR_INTERVAL,
+                 report_path=LOOP_MONITOR_REPORT):
+        self.threshold = threshold
+        self.interval = interval
+        self.report_path = report_path
+        self.lags = deque(maxlen=LAG_HISTORY)
+        # stack key -> {"count", "total_seconds", "max_seconds", "stack"}
+        self.blocks = {}
+        self.started_at = None
+        self._last_tick = None
+        self._loop_thread_id = None
+        self._pending = None  # (stack key, blocked since) while a block is in progress
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ticker = None
+        self._watchdog = None
+
+    def start(self):
+        """Start the ticker on the running loop and the watchdog thread"""
+        self._loop_thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._ticker = asyncio.get_running_loop().create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        """Stop monitoring and write the report; returns it"""
+        self._stop.set()
+        if self._ticker:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+        self._finish_block(time.monotonic())
+        report = self.report()
+        self.write_report(report)
+        return report
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                self.lags.append(max(0.0, now - expected))
+            self._last_tick = now
+            self._finish_block(now)
+
+    def _watch(self):
+        poll = max(0.005, self.threshold / 4)
+        next_write = time.monotonic() + LOOP_MONITOR_REPORT_INTERVAL
+        while not self._stop.wait(poll):
+            if time.monotonic() >= next_write:
+                next_write = time.monotonic() + LOOP_MONITOR_REPORT_INTERVAL
+                self.write_report(self.report(), quiet=True)
+            last_tick = self._last_tick
+            blocked_for = time.monotonic() - last_tick - self.interval
+            if blocked_for < self.threshold:
+                continue
+            with self._lock:
+                if self._pending is not None or self._last_tick != last_tick:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame)
+                key = self._stack_key(stack)
+                self._pending = (key, last_tick + self.interval)
+                entry = self.blocks.setdefault(key, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                                                     "stack": traceback.format_list(stack)})
+                entry["count"] += 1
+            logger.warning(f"Event loop blocked for {blocked_for * 1000:.0f} ms+ at {key.splitlines()[-1]}")
+
+    def _finish_block(self, now):
+        """Record the duration of the block in progress, if any, once the loop runs again"""
+        with self._lock:
+            if self._pending is None:
+                return
+            key, since = self._pending
+            self._pending = None
+            duration = max(0.0, now - since)
+            entry = self.blocks[key]
+            entry["total_seconds"] += duration
+            entry["max_seconds"] = max(entry["max_seconds"], duration)
+
+    @staticmethod
+    def _stack_key(stack):
+        """The innermost frames outside this module, as 'file:line function' lines"""
+        frames = [f for f in stack if f.filename != __file__][-STACK_KEY_FRAMES:]
+        return "\n".join(f"{os.path.basename(f.filename)}:{f.lineno} {f.name}" for f in frames)
+
+    def report(self):
+        with self._lock:
+            lags = sorted(self.lags)
+            blocks = sorted(self.blocks.items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+            hot_spots = [{"where": key.splitlines(), "count": entry["count"],
+                          "total_ms": round(entry["total_seconds"] * 1000, 1),
+                          "max_ms": round(entry["max_seconds"] * 1000, 1),
+                          "stack": entry["stack"]} for key, entry in blocks]
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": round(time.time() - self.started_at, 1) if self.started_at else 0.0,
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": {
+                "samples": len(lags),
+                "p50": round(_percentile(lags, 0.50) * 1000, 2),
+                "p95": round(_percentile(lags, 0.95) * 1000, 2),
+                "p99": round(_percentile(lags, 0.99) * 1000, 2),
+                "max": round((lags[-1] if lags else 0.0) * 1000, 2),
+            },
+            "blocks": sum(spot["count"] for spot in hot_spots),
+            "hot_spots": hot_spots,
+        }
+
+    def write_report(self, report, quiet=False):
+        if not self.report_path:
+            return
+        try:
+            with open(self.report_path, "w") as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            logger.error(f"Could not write event loop report: {e}")
+            return
+        if quiet:
+            return
+        logger.info(f"Event loop report: {report['blocks']} blocks over {self.threshold * 1000:.0f} ms, "
+                    f"lag p99 {report['lag_ms']['p99']} ms, written to {self.report_path}")
+        for spot in report["hot_spots"][:5]:
+            logger.info(f"  {spot['total_ms']:.0f} ms in {spot['count']} blocks at {spot['where'][-1]}")
+
+
+@asynccontextmanager
+async def monitor_event_loop(enabled=None):
+    """Run a LoopMonitor for the duration of the block when LOOP_MONITOR is set (or ``enabled``)"""
+    if not (LOOP_MONITOR if enabled is None else enabled):
+        yield None
+        return
+    monitor = LoopMonitor()
+    monitor.start()
+    try:
+        yield monitor
+    finally:
+        await monitor.stop()
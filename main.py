@@ -4,59 +4,49 @@ import time
 import json
 import random
 import logging
-import schedule
 import traceback
 import re
 import threading
-import http.server
-import socketserver
+from http.server import ThreadingHTTPServer
 from logging import getLogger
-import google.generativeai as genai
 from dotenv import load_dotenv
 from twitter_client import login, post_tweet_thread_v2, cleanup_browser, browse_tweets_v2, human_like_delay, reply_to_tweet
 from datetime import datetime, timedelta
 import importlib
-from replier import generate_reply
+from replier import generate_reply, generate_replies_batch, require_api_key
+from state_store import get_state_store
+from resource_blocker import get_resource_blocker
+from browser_session import get_browser_session
+from generation_cache import get_generation_cache, cache_key
+from llm_client import get_llm_client, LLM_OFFLINE_FALLBACK
+from content_generator import offline_reply, offline_content
+from reply_pipeline import ReplyPipeline
+from account_scheduler import AccountScheduler
+from batch_generation import generate_batch
+from resource_governor import browser_rss_bytes
+from metrics import MetricsHandler, BROWSER_RSS_BYTES, CYCLE_SECONDS, health_monitor
+from loop_monitor import monitor_event_loop
+from tracing import trace_cycle
+from logging_setup import setup_logging, log_cycle
+import traffic_replay
 import asyncio
 
 logger = getLogger(__name__)
 
-# Logging configuration
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    handlers=[logging.FileHandler("web3bot.log"), 
-                             logging.StreamHandler()])
-
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API  
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
 # HTTP sunucusu için global değişkenler
 httpd = None
 
-# HTTP sunucusu için basit bir işleyici
-class SimpleHandler(http.server.SimpleHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'text/plain')
-        self.end_headers()
-        self.wfile.write(b'Twitter bot active')
-    
-    def log_message(self, format, *args):
-        # Sustur log mesajlarını
-        return
-
-# HTTP sunucusu başlatma fonksiyonu - asyncio kullanmadan
+# HTTP sunucusu başlatma fonksiyonu - asyncio kullanmadan (/, /metrics ve /healthz)
 def start_http_server():
     global httpd
     try:
         port = int(os.getenv('PORT', 10000))
-        handler = SimpleHandler
-        httpd = socketserver.TCPServer(("", port), handler)
+        BROWSER_RSS_BYTES.set_function(browser_rss_bytes)
+        httpd = ThreadingHTTPServer(("", port), MetricsHandler)
+        httpd.daemon_threads = True
         logger.info(f"HTTP sunucusu port {port} üzerinde başlatıldı")
         httpd.serve_forever()
     except Exception as e:
@@ -82,21 +72,6 @@ MONITORED_ACCOUNTS = [
     "Dogetoshi", "benbybit", "MacroCRG", "Melt_Dem"
 ]
 
-# Keywords to look for in tweets
-KEYWORDS = [
-    "0G", "Allora", "ANIME", "Aptos", "Arbitrum", "Berachain", "Boop", 
-    "Caldera", "Camp Network", "Corn", "Defi App", "dYdX", "Eclipse", 
-    "Fogo", "Frax", "FUEL", "Huma", "Humanity Protocol", "Hyperbolic", 
-    "Initia", "Injective", "Infinex", "IQ", "Irys", "Kaia", "Kaito", 
-    "MegaETH", "Mitosis", "Monad", "Movement", "Multibank", "Multipli", 
-    "Near", "Newton", "Novastro", "OpenLedger", "PARADEX", "PENGU", 
-    "Polkadot", "Portal to BTC", "PuffPaw", "Pyth", "QUAI", "SatLayer", 
-    "Sei", "Sidekick", "Skate", "Somnia", "Soon", "Soph Protocol", 
-    "Soul Protocol", "Starknet", "Story", "Succinct", "Symphony", 
-    "Theoriq", "Thrive Protocol", "Union", "Virtuals Protocol", "Wayfinder", 
-    "XION", "YEET", "Zcash"
-]
-
 # Projects for content creation
 PROJECTS = [
     {"name": "Allora", "twitter": "@AlloraNetwork", "website": "allora.network"},
@@ -144,43 +119,29 @@ def reload_modules():
         logger.error(f"Module reload error: {e}")
 
 async def initialize_browser(max_attempts=3, wait_time=5):
-    """Initialize browser with retry logic using Async API"""
+    """Return the shared browser session's context and page, launching it if needed"""
     global browser, page
 
-    # Check if we're running in production (Render) or local development
-    is_production = os.environ.get('RENDER', False)
+    session = get_browser_session()
 
     for attempt in range(1, max_attempts + 1):
         try:
-            logger.info(f"Browser initialization attempt {attempt} of {max_attempts}")
-            logger.info("Initializing browser...")
-
-            # Use headless mode in production, non-headless in development
-            browser, page = await login(headless=True if is_production else False)
-
-            if browser and page:
-                logger.info("Browser initialized and logged in to Twitter")
-                return browser, page
-            else:
-                raise Exception("Browser or page is None")
+            # Cheap when the session is already running; relaunches and logs in otherwise
+            await session.ensure()
+            browser, page = session.context, await session.get_page()
+            return browser, page
 
         except Exception as e:
-            logger.error(f"Browser initialization error: {e}")
+            logger.error(f"Browser initialization error (attempt {attempt} of {max_attempts}): {e}")
             if hasattr(e, 'message'):
                 logger.error(f"Browser logs:\n{e.message}")
-            try:
-                if browser:
-                    await cleanup_browser(browser)
-            except Exception as cleanup_error:
-                logger.error(f"Failed to cleanup browser: {cleanup_error}")
+            # Start from scratch on the next attempt
+            await session.close()
 
             if attempt < max_attempts:
                 logger.info(f"Waiting {wait_time} seconds before retrying...")
                 await asyncio.sleep(wait_time)
             else:
-                logger.error(f"Browser initialization failed on attempt {attempt}: {e}")
-                if hasattr(e, 'message'):
-                    logger.error(f"Browser logs:\n{e.message}")
                 raise
 
 def cleanup_browser(browser):
@@ -195,103 +156,66 @@ def cleanup_browser(browser):
         browser = None
         page = None
 
+def log_resource_stats():
+    """Log and reset the per-cycle resource blocking counters"""
+    blocker = get_resource_blocker()
+    if blocker:
+        blocker.log_and_reset()
+
 async def check_tweets_and_reply():
     """Check tweets from all specified accounts and reply to recent ones"""
     try:
         logger.info("Starting tweet monitoring and reply task...")
         
         # Initialize browser or use existing session
-        browser, page = await initialize_browser()
+        await initialize_browser()
         
         # Track which tweets we've already replied to
-        replied_tweets_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replied_tweets.json")
-        
-        # Load previously replied tweets
-        replied_tweets = {}
+        store = get_state_store()
         try:
-            if os.path.exists(replied_tweets_file):
-                with open(replied_tweets_file, 'r') as f:
-                    replied_tweets = json.load(f)
-                    
-                # Keep tweets from last 24 hours only
-                current_time = time.time()
-                for tweet_url, reply_time in list(replied_tweets.items()):
-                    if current_time - reply_time > 24 * 3600:  # 24 hours in seconds
-                        del replied_tweets[tweet_url]
+            pruned = store.prune_replied()
+            if pruned:
+                logger.info(f"Pruned {pruned} expired replied tweets")
         except Exception as e:
-            logger.error(f"Error loading replied tweets: {e}")
-            replied_tweets = {}
+            logger.error(f"Error pruning replied tweets: {e}")
         
-        # Get one hour ago timestamp for checking recent tweets
-        one_hour_ago = datetime.now() - timedelta(hours=1)
+        # Get one hour ago timestamp for checking recent tweets (recording time when replaying)
+        one_hour_ago = traffic_replay.now() - timedelta(hours=1)
         
-        # Process each monitored account
-        for account in MONITORED_ACCOUNTS:
-            logger.info(f"Checking tweets from {account}...")
-            
-            # Get recent tweets (limit to 10)
-            tweets = await browse_tweets_v2(page, account, limit=10)
-            
-            if not tweets:
-                logger.warning(f"No tweets found for {account}")
-                continue
-            
-            # Find tweets from the last hour that we haven't replied to yet
+        def select_recent(account, tweets):
+            """Find tweets from the last hour that we haven't replied to yet"""
             new_tweets = []
             for tweet in tweets:
-                if 'url' in tweet and tweet['url'] not in replied_tweets:
-                    # Try to parse the tweet timestamp
-                    tweet_time = None
-                    if 'timestamp' in tweet:
-                        try:
-                            tweet_time = datetime.strptime(tweet['timestamp'], "%Y-%m-%dT%H:%M:%S")
-                        except:
-                            # If timestamp parsing fails, assume it's recent
-                            tweet_time = datetime.now()
-                    
-                    # If we can't determine time or it's recent, include it
-                    if tweet_time is None or tweet_time > one_hour_ago:
+                if tweet.url and not store.has_replied(tweet.url):
+                    # Tweets without a timestamp count as recent
+                    if tweet.is_newer_than(one_hour_ago.timestamp()):
                         new_tweets.append(tweet)
             
-            # Reply to new tweets            if new_tweets:
+            if new_tweets:
                 logger.info(f"Found {len(new_tweets)} new tweets from {account} in the last hour")
-                for tweet in new_tweets:
-                    # Generate reply for the tweet using Gemini (OpenAI değil)
-                    reply_text = generate_web3_reply(tweet['text'])  # _with_gemini kaldırıldı
-                    logger.info(f"Generated reply for {account}: {reply_text}")
-                    
-                    # Send the reply
-                    if 'url' in tweet:
-                        success = await reply_to_tweet(page, tweet['url'], reply_text)
-                        if success:
-                            logger.info(f"Reply successfully sent to {account}: {tweet['url']}")
-                            # Mark this tweet as replied
-                            replied_tweets[tweet['url']] = time.time()
-                        else:
-                            logger.error(f"Reply failed for {account}: {tweet['url']}")
-                        
-                        # Avoid detection by adding delay
-                        await human_like_delay(15000, 30000)  # Longer delay between replies
-                    else:
-                        logger.error(f"No URL found for {account}'s tweet, can't reply")
             else:
                 logger.info(f"No new tweets found for {account} in the last hour")
+            return new_tweets
+        
+        # Browse, generate (Gemini) and post as overlapping stages
+        pipeline = ReplyPipeline(
+            MONITORED_ACCOUNTS,
+            generate=generate_web3_reply,
+            generate_batch=generate_web3_replies_batch,
+            select=select_recent,
+            limit=10,
+            reply_delay=(15000, 30000),  # Longer delay between replies
+            account_delay=(3000, 5000)
+        )
+        with log_cycle("check"), CYCLE_SECONDS.time(task="check"), \
+                trace_cycle("check", accounts=len(MONITORED_ACCOUNTS)):
+            return await pipeline.run()
             
-            # Small delay between checking different accounts
-            human_like_delay(3000, 5000)
-            
-        # Save updated replied tweets
-        try:
-            # Make sure directory exists
-            os.makedirs(os.path.dirname(replied_tweets_file), exist_ok=True)
-            with open(replied_tweets_file, 'w') as f:
-                json.dump(replied_tweets, f)
-        except Exception as e:
-            logger.error(f"Error saving replied tweets: {e}")
-        
     except Exception as e:
         logger.error(f"Tweet check error: {e}")
         traceback.print_exc()
+    finally:
+        log_resource_stats()
 
 async def post_web3_content(page, project, content):
     """Post content about a Web3 project"""
@@ -408,7 +332,7 @@ def split_content_intelligently(content, max_length=280):
     
     return tweets
 
-def generate_web3_content(project):
+async def generate_web3_content(project):
     """Generate intelligent content about a Web3 project using Gemini"""
     try:
         # Get project details
@@ -445,9 +369,6 @@ def generate_web3_content(project):
         IMPORTANT: Keep your content under 280 characters total if possible.
         """
         
-        # Use Gemini 2.0 Flash model
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
         # Model system prompt to instruct the model about its role
         system_instruction = """You are a senior blockchain researcher and Web3 expert with deep technical knowledge of crypto projects.
         Your goal is to create educational, insightful content that demonstrates genuine expertise.
@@ -465,18 +386,14 @@ def generate_web3_content(project):
             "max_output_tokens": 600,
         }
         
-        # Create the chat session with system instructions
-        chat = model.start_chat(history=[])
-        
-        # Generate content with system instruction
-        response = chat.send_message(
-            f"{system_instruction}\n\n{prompt}",
-            generation_config=generation_config
+        # Generate content with system instruction on the shared async client
+        content = await get_llm_client().generate(
+            prompt,
+            model=CONTENT_MODEL,
+            generation_config=generation_config,
+            system_instruction=system_instruction
         )
         
-        # Extract content
-        content = response.text.strip()
-        
         # Clean up the text
         content = re.sub(r'\(\d+\/\d+\)', '', content)
         content = re.sub(r'\d+\/\d+', '', content)
@@ -503,18 +420,16 @@ def generate_web3_content(project):
     except Exception as e:
         logger.error(f"Error generating content with Gemini: {e}")
         # Fallback content
-        fallback = f"{name}'s {twitter} approach to {random.choice(['scaling', 'security', 'interoperability', 'data availability', 'decentralized computing'])} addresses key challenges in the ecosystem. Visit {website} for technical details. #Web3 #{name}"
-        return [fallback]  # Return as list for consistency
+        return split_content_intelligently(offline_content(project))  # Return as list for consistency
 
-def generate_web3_reply(original_tweet_text):
-    """Generate an insightful, expert-level reply to a tweet related to Web3 using Gemini"""
-    try:
-        # Create a detailed prompt for AI
-        prompt = f"""As a Web3/crypto expert, write an insightful, thoughtful reply to this tweet:
-        
-        "{original_tweet_text}"
-        
-        Follow these guidelines:
+# Bump when the generate_web3_reply prompt changes so cached replies are not reused
+WEB3_REPLY_PROMPT_VERSION = "1"
+
+# Gemini models used for replies and project content
+REPLY_MODEL = "gemini-2.0-flash"
+CONTENT_MODEL = "gemini-1.5-flash"
+
+WEB3_REPLY_GUIDELINES = """Follow these guidelines:
         
         1. Show deep knowledge of the crypto/Web3 ecosystem
         2. Bring up a specific related point that wasn't mentioned in the original tweet
@@ -529,72 +444,82 @@ def generate_web3_reply(original_tweet_text):
         
         Make your reply technically accurate, insightful and valuable to the conversation.
         """
+
+# Use Gemini for reply generation
+WEB3_REPLY_GENERATION_CONFIG = {
+    "temperature": 0.8,
+    "top_p": 0.9,
+    "top_k": 32,
+    "max_output_tokens": 300,
+}
+
+def clean_generated_reply(content):
+    """Remove thread numbering and notes about length from generated text"""
+    content = re.sub(r'\(\d+/\d+\)', '', content)
+    content = re.sub(r'\d+/\d+', '', content)
+    content = re.sub(r'This is a single tweet.*?characters\.', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'No need for a thread\.', '', content, flags=re.IGNORECASE)
+    return content
+
+async def generate_web3_reply(original_tweet_text):
+    """Generate an insightful, expert-level reply to a tweet related to Web3 using Gemini"""
+    try:
+        # Create a detailed prompt for AI
+        prompt = f"""As a Web3/crypto expert, write an insightful, thoughtful reply to this tweet:
         
-        # Use Gemini for reply generation
-        generation_config = {
-            "temperature": 0.8,
-            "top_p": 0.9,
-            "top_k": 32,
-            "max_output_tokens": 300,
-        }
+        "{original_tweet_text}"
         
-        chat = genai.start_chat(history=[])
-        response = chat.send_message(prompt, generation_config=generation_config)
+        {WEB3_REPLY_GUIDELINES}"""
         
-        # Extract and clean the content
-        content = response.text.strip()
-        content = re.sub(r'\(\d+/\d+\)', '', content)
-        content = re.sub(r'\d+/\d+', '', content)
-        content = re.sub(r'This is a single tweet.*?characters\.', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'No need for a thread\.', '', content, flags=re.IGNORECASE)
+        cache = get_generation_cache()
+        key = cache_key(original_tweet_text, WEB3_REPLY_PROMPT_VERSION, REPLY_MODEL, WEB3_REPLY_GENERATION_CONFIG)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
         
+        content = await get_llm_client().generate(prompt, model=REPLY_MODEL, generation_config=WEB3_REPLY_GENERATION_CONFIG)
+        content = clean_generated_reply(content)
+        
+        if content:
+            cache.put(key, content)
         return content
     except Exception as e:
         logger.error(f"Error generating reply: {e}")
-        return ""
+        return offline_reply(original_tweet_text) if LLM_OFFLINE_FALLBACK else ""
+
+async def generate_web3_replies_batch(tweet_texts):
+    """Generate replies for several tweets in one Gemini request (same prompt and cache as generate_web3_reply)"""
+    instructions = f"""As a Web3/crypto expert, write an insightful, thoughtful reply to each of the tweets below.
+        
+        {WEB3_REPLY_GUIDELINES}"""
+    return await generate_batch(
+        tweet_texts,
+        instructions,
+        REPLY_MODEL,
+        generate_one=generate_web3_reply,
+        template_version=WEB3_REPLY_PROMPT_VERSION,
+        generation_config=WEB3_REPLY_GENERATION_CONFIG,
+        clean=clean_generated_reply
+    )
 
 async def perform_browser_health_check():
     """Check browser health and restart if necessary"""
     global browser, page
     
+    session = get_browser_session()
     try:
         logger.info("Performing browser health check...")
-        
-        # Check if browser is still responsive
-        if browser is None or page is None:
-            logger.warning("Browser or page is None, restarting...")
-            await cleanup_browser(browser)
-            browser, page = await initialize_browser()
-            return
-        
-        # Try to navigate to a simple page
-        try:
-            await page.goto("https://twitter.com/home", timeout=30000)
-            current_url = page.url
-            logger.info(f"Browser check: Current URL is {current_url}")
-            
-            # Check if we're still logged in
-            if "login" in current_url.lower():
-                logger.warning("No longer logged in, re-initializing...")
-                await cleanup_browser(browser)
-                browser, page = await initialize_browser()
-                return
-                
-        except Exception as e:
-            logger.error(f"Browser navigation error: {e}")
-            logger.warning("Restarting browser due to navigation issues...")
-            await cleanup_browser(browser)
-            browser, page = await initialize_browser()
-            return
-            
+        # Relaunches only if the browser is dead, then re-checks the login
+        await session.ensure(check_login=True)
+        browser, page = session.context, await session.get_page()
         logger.info("Browser health check completed: Browser is healthy")
         
     except Exception as e:
         logger.error(f"Browser health check error: {e}")
         # Try to recover
         try:
-            await cleanup_browser(browser)
-            browser, page = await initialize_browser()
+            await session.restart()
+            browser, page = session.context, await session.get_page()
             logger.info("Browser reinitialized after health check failure")
         except Exception as recover_e:
             logger.error(f"Recovery after health check failed: {recover_e}")
@@ -624,15 +549,14 @@ async def monitor_and_reply_to_tweets(page, accounts):
             
             for tweet in tweets:
                 try:
-                    tweet_time = datetime.strptime(tweet['timestamp'], "%Y-%m-%dT%H:%M:%S")
-                    if tweet_time >= one_hour_ago:
-                        logger.info(f"Found recent tweet from {account}: {tweet['text'][:50]}...")
+                    if tweet.is_newer_than(one_hour_ago.timestamp()):
+                        logger.info(f"Found recent tweet from {account}: {tweet.text[:50]}...")
                                   # Generate reply
-                        reply_text = generate_reply(tweet['text'])
+                        reply_text = await generate_reply(tweet.text)
                         logger.info(f"Generated reply: {reply_text[:50]}...")
                         
                         # Post reply
-                        success = await reply_to_tweet(page, tweet['url'], reply_text)
+                        success = await reply_to_tweet(page, tweet.url, reply_text)
                         if success:
                             logger.info(f"Successfully replied to tweet from {account}")
                         else:
@@ -650,7 +574,7 @@ async def post_content_for_projects(page, projects):
         selected_projects = random.sample(projects, 2)
         for project in selected_projects:
             logger.info(f"Posting content for project: {project['name']}")
-            content = generate_web3_content(project)
+            content = await generate_web3_content(project)
             success = await post_web3_content(page, project, content)
             if success:
                 logger.info(f"Successfully posted content for project: {project['name']}")
@@ -706,19 +630,18 @@ async def test_mode():
             
             # Show found tweets
             for i, tweet in enumerate(tweets):
-                logger.info(f"Tweet {i+1}: {tweet.get('text', '')[:100]}...")
-                if 'url' in tweet:
-                    logger.info(f"URL: {tweet['url']}")
+                logger.info(f"Tweet {i+1}: {tweet.text[:100]}...")
+                logger.info(f"URL: {tweet.url}")
             
         elif test_feature == "check":
             logger.info("Starting tweet monitoring and reply test...")
             await check_tweets_and_reply()
         elif test_feature == "post":
             logger.info("Starting content posting test...")
-            await post_web3_content(page, PROJECTS[0], generate_web3_content(PROJECTS[0]))
+            await post_web3_content(page, PROJECTS[0], await generate_web3_content(PROJECTS[0]))
         elif test_feature == "combined":
             logger.info("Starting combined test...")
-            await post_web3_content(page, PROJECTS[0], generate_web3_content(PROJECTS[0]))
+            await post_web3_content(page, PROJECTS[0], await generate_web3_content(PROJECTS[0]))
             await human_like_delay(10000, 20000)
             await check_tweets_and_reply()
         else:
@@ -734,49 +657,66 @@ async def test_mode():
 # Ana kod bloğu - DOSYANIN EN SONUNA
 async def run_bot():
     """Initialize and run the bot"""
+    require_api_key()
+    session = get_browser_session()
+    # Heartbeat and browser probe behind /healthz
+    monitor = asyncio.create_task(health_monitor(session))
     try:
-        browser, page = await initialize_browser()
-        await main_loop()
+        # LOOP_MONITOR=1 reports callbacks that block the event loop
+        async with monitor_event_loop():
+            await initialize_browser()
+            await main_loop()
     except Exception as e:
         logger.error(f"Bot execution error: {e}")
-        if 'browser' in locals():
-            await cleanup_browser(browser)
+    finally:
+        monitor.cancel()
+        await session.close()
+        await get_llm_client().close()
+
+async def reply_to_latest_tweets(accounts=None, scheduler=None):
+    """Reply to the latest tweet of the given accounts (default: all monitored accounts)"""
+    store = get_state_store()
+
+    def select_latest(account, tweets):
+        """Reply to the latest tweet unless we already did"""
+        if store.has_replied(tweets[0].url):
+            logger.info(f"Already replied to {account}'s latest tweet")
+            return []
+        return tweets[:1]
+
+    pipeline = ReplyPipeline(
+        accounts or MONITORED_ACCOUNTS,
+        generate=generate_reply,
+        generate_batch=generate_replies_batch,
+        select=select_latest,
+        # A few tweets let the scheduler estimate posting rates; only the latest gets a reply
+        limit=5 if scheduler else 1,
+        reply_delay=(30000, 45000),  # Add delay between replies
+        account_delay=(0, 0),
+        observe=scheduler.observe if scheduler else None
+    )
+    try:
+        with log_cycle("latest"), CYCLE_SECONDS.time(task="latest"), \
+                trace_cycle("latest", accounts=len(pipeline.accounts)):
+            return await pipeline.run()
+    finally:
+        log_resource_stats()
 
 async def main_loop():
-    """Main bot loop"""
+    """Main bot loop: check each account when its adaptive schedule says it is due"""
+    scheduler = AccountScheduler(MONITORED_ACCOUNTS)
     try:
         while True:
             try:
-                current_hour = datetime.now().hour
+                due = scheduler.due()
+                if due:
+                    logger.info(f"Starting tweet reply task for {len(due)} due accounts...")
+                    await reply_to_latest_tweets(due, scheduler)
                 
-                # First priority: Reply to tweets
-                logger.info("Starting tweet reply task...")
-                for account in MONITORED_ACCOUNTS:
-                    try:
-                        logger.info(f"Checking tweets from {account}...")
-                        tweets = await browse_tweets_v2(page, account, limit=1)
-                        
-                        if tweets:
-                            latest_tweet = tweets[0]
-                            reply_text = generate_reply(latest_tweet['text'])
-                            
-                            if reply_text:
-                                logger.info(f"Replying to tweet from {account}")
-                                success = await reply_to_tweet(page, latest_tweet['url'], reply_text)
-                                if success:
-                                    logger.info(f"Successfully replied to {account}'s tweet")
-                                else:
-                                    logger.error(f"Failed to reply to {account}'s tweet")
-                            
-                            # Add delay between replies
-                            await human_like_delay(30000, 45000)
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing account {account}: {e}")
-                        continue
-                
-                # Wait before next iteration
-                await asyncio.sleep(3600)  # 1 hour
+                # Sleep until the next account is due
+                wait = scheduler.seconds_until_next()
+                logger.info(f"Next account check in {wait / 60:.1f} minutes")
+                await asyncio.sleep(wait)
                 
             except Exception as loop_error:
                 logger.error(f"Error in main loop: {loop_error}")
@@ -786,17 +726,8 @@ async def main_loop():
         logger.error(f"Fatal error in main loop: {e}")
         raise
 
-def start_http_server():
-    """Start HTTP server in a separate thread"""
-    global httpd
-    try:
-        httpd = socketserver.TCPServer(("", 10000), SimpleHandler)
-        logger.info("HTTP sunucusu port 10000 üzerinde başlatıldı")
-        httpd.serve_forever()
-    except Exception as e:
-        logger.error(f"HTTP sunucu hatası: {e}")
-
 if __name__ == "__main__":
+    setup_logging()
     try:
         # Start HTTP server in a separate thread
         http_thread = threading.Thread(target=start_http_server, daemon=True)
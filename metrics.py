@@ -0,0 +1,271 @@
+"""Process metrics in the Prometheus text format, and liveness for /healthz.
+
+Counters, gauges and histograms keep their values per label set behind one
+lock each, so recording from the event loop and scraping from the health
+server thread are both cheap and safe:
+
+    PAGE_LOAD_SECONDS.observe(1.3, operation="profile", outcome="ok")
+    with CYCLE_SECONDS.time(task="check"):
+        ...
+"""
+import os
+import json
+import math
+import time
+import bisect
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+# /healthz reports the event loop as stalled after this many seconds without a heartbeat
+HEALTH_LOOP_STALL_SECONDS = float(os.getenv("HEALTH_LOOP_STALL_SECONDS", "60"))
+
+# Seconds between the heartbeats and browser probes of health_monitor()
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "15"))
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Every metric created in this process, in creation order
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Base class: a named metric with fixed label names, registered on creation"""
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labels, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in items]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        """Compute the (unlabelled) value when scraped instead of storing it"""
+        self._function = function
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def _samples(self):
+        if self._function is None:
+            return super()._samples()
+        try:
+            value = self._function()
+        except Exception as e:
+            logger.debug(f"Could not collect {self.name}: {e}")
+            return []
+        return [] if value is None else [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block, even when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            running = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                running += bucket_count
+                lines.append(f"{self.name}_bucket{self._label_text(key, [('le', _format_value(bound))])} {running}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+PAGE_LOAD_SECONDS = Histogram("bot_page_load_seconds", "Page navigation time by operation",
+                              ["operation", "outcome"])
+LLM_REQUEST_SECONDS = Histogram("bot_llm_request_seconds", "Gemini API request time by model",
+                                ["model", "outcome"])
+LLM_TOKENS = Counter("bot_llm_tokens_total", "Gemini tokens used by model and kind (prompt/output)",
+                     ["model", "kind"])
+REPLIES = Counter("bot_replies_total", "Replies by result (success/failure/no_reply)", ["result"])
+CACHE_LOOKUPS = Counter("bot_cache_lookups_total", "Cache lookups by cache and result (hit/miss)",
+                        ["cache", "result"])
+SELECTOR_MATCHES = Counter("bot_selector_matches_total",
+                           "Browser lookups by action and the candidate selector that matched (none if none did)",
+                           ["action", "selector"])
+CYCLE_SECONDS = Histogram("bot_cycle_duration_seconds", "Duration of a full reply cycle by task", ["task"],
+                          buckets=(10, 30, 60, 120, 300, 600, 1200, 1800, 3600))
+BROWSER_RSS_BYTES = Gauge("bot_browser_rss_bytes", "Resident memory of the bot's browser process tree")
+EVENT_LOOP_LAG_SECONDS = Gauge("bot_event_loop_lag_seconds", "How late the last health heartbeat woke up")
+BROWSER_ALIVE = Gauge("bot_browser_alive", "1 if the last browser liveness probe succeeded")
+
+
+class Health:
+    """Liveness as seen by the event loop; written by health_monitor(), read by /healthz"""
+
+    def __init__(self):
+        self.last_beat = None
+        self.browser_alive = None
+        self.browser_checked = None
+
+    def beat(self, lag=0.0):
+        self.last_beat = time.monotonic()
+        EVENT_LOOP_LAG_SECONDS.set(round(lag, 4))
+
+    def set_browser_alive(self, alive):
+        self.browser_alive = alive
+        self.browser_checked = time.monotonic()
+        BROWSER_ALIVE.set(1 if alive else 0)
+
+    def status(self):
+        now = time.monotonic()
+        since_beat = None if self.last_beat is None else now - self.last_beat
+        loop_ok = since_beat is not None and since_beat <= HEALTH_LOOP_STALL_SECONDS
+        browser_ok = bool(self.browser_alive)
+        return {
+            "healthy": loop_ok and browser_ok,
+            "event_loop": {"ok": loop_ok, "seconds_since_heartbeat": None if since_beat is None else round(since_beat, 1)},
+            "browser": {"ok": browser_ok,
+                        "seconds_since_check": None if self.browser_checked is None else round(now - self.browser_checked, 1)},
+        }
+
+
+health = Health()
+
+
+async def health_monitor(session, interval=HEALTH_PROBE_INTERVAL):
+    """Heartbeat the event loop and probe the browser every ``interval`` seconds until cancelled"""
+    lag = 0.0
+    while True:
+        health.beat(lag)
+        try:
+            health.set_browser_alive(await session.is_alive())
+        except Exception as e:
+            logger.warning(f"Browser liveness probe failed: {e}")
+            health.set_browser_alive(False)
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.monotonic() - started - interval)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Health server: / (plain banner), /metrics (Prometheus) and /healthz (JSON, 503 when unhealthy)"""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            status, content_type, body = 200, "text/plain; version=0.0.4; charset=utf-8", render_metrics().encode()
+        elif path == "/healthz":
+            report = health.status()
+            status = 200 if report["healthy"] else 503
+            content_type, body = "application/json", json.dumps(report).encode()
+        else:
+            status, content_type, body = 200, "text/plain", b"Twitter bot active"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the log
+        return
@@ -0,0 +1,184 @@
+import os
+import re
+import logging
+import hashlib
+from collections import OrderedDict
+
+from generation_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Tweets scoring below this never reach the LLM (0 lets every non-empty, unique tweet through)
+RELEVANCE_THRESHOLD = float(os.getenv("RELEVANCE_THRESHOLD", "1"))
+
+# Number of recent tweet texts remembered for duplicate detection
+RELEVANCE_DEDUP_SIZE = int(os.getenv("RELEVANCE_DEDUP_SIZE", "5000"))
+
+# Projects we write about; a mention is a strong signal
+PROJECT_KEYWORDS = [
+    "0G", "Allora", "ANIME", "Aptos", "Arbitrum", "Berachain", "Boop",
+    "Caldera", "Camp Network", "Corn", "Defi App", "dYdX", "Eclipse",
+    "Fogo", "Frax", "FUEL", "Huma", "Humanity Protocol", "Hyperbolic",
+    "Initia", "Injective", "Infinex", "IQ", "Irys", "Kaia", "Kaito",
+    "MegaETH", "Mitosis", "Monad", "Movement", "Multibank", "Multipli",
+    "Near", "Newton", "Novastro", "OpenLedger", "PARADEX", "PENGU",
+    "Polkadot", "Portal to BTC", "PuffPaw", "Pyth", "QUAI", "SatLayer",
+    "Sei", "Sidekick", "Skate", "Somnia", "Soon", "Soph Protocol",
+    "Soul Protocol", "Starknet", "Story", "Succinct", "Symphony",
+    "Theoriq", "Thrive Protocol", "Union", "Virtuals Protocol", "Wayfinder",
+    "XION", "YEET", "Zcash"
+]
+
+# General Web3 vocabulary; each distinct term adds a little relevance
+TOPIC_KEYWORDS = [
+    "web3", "crypto", "blockchain", "layer1", "layer2", "L1", "L2", "zk", "zkEVM", "staking",
+    "restaking", "airdrop", "airdrops", "DeFi", "modular", "rollup", "rollups", "EVM", "onchain",
+    "on-chain", "token", "tokenomics", "validator", "sequencer", "bridge", "DEX", "TVL",
+    "stablecoin", "NFT", "DAO", "mainnet", "testnet", "Ethereum", "ETH", "Bitcoin", "BTC", "Solana"
+]
+
+# Names that are also everyday words only count when capitalised as written
+CASE_SENSITIVE_KEYWORDS = {"Soon", "Story", "Union", "Near", "Corn", "Skate", "Symphony",
+                           "Newton", "Movement", "Sidekick", "IQ", "ANIME", "FUEL", "YEET", "Boop"}
+
+PROJECT_WEIGHT = 2.0
+TOPIC_WEIGHT = 1.0
+CASHTAG_WEIGHT = 0.5
+
+# Twitter language codes that carry no language information
+_NEUTRAL_LANGS = {"", "en", "und", "qme", "qam", "qct", "qht", "qst", "zxx", "art"}
+
+_URL_RE = re.compile(r"https?://\S+")
+_MENTION_RE = re.compile(r"@\w+")
+_CASHTAG_RE = re.compile(r"(?<![\w$])\$[A-Za-z]{2,10}\b")
+
+
+def _combined_pattern(terms, flags=0):
+    """One alternation of all terms with word boundaries; longest first so phrases beat their prefixes"""
+    if not terms:
+        return None
+    alternatives = sorted((r"\s+".join(map(re.escape, t.split())) for t in terms), key=len, reverse=True)
+    return re.compile(r"(?<![\w$#])#?(?:" + "|".join(alternatives) + r")(?![\w-])", flags)
+
+
+def _canonical(match):
+    return " ".join(match.lstrip("#").split()).lower()
+
+
+class RelevanceFilter:
+    """Scores tweets with precompiled keyword patterns before any LLM call.
+
+    All keywords are folded into two combined regexes (case-insensitive,
+    plus a case-sensitive one for names that are also everyday words), so
+    a tweet is scanned once regardless of the number of keywords. Empty,
+    duplicate, non-English and low-scoring tweets are rejected; every
+    rejection is one generation call saved.
+    """
+
+    def __init__(self, projects=PROJECT_KEYWORDS, topics=TOPIC_KEYWORDS,
+                 threshold=RELEVANCE_THRESHOLD, dedup_size=RELEVANCE_DEDUP_SIZE):
+        self.threshold = threshold
+        self.dedup_size = dedup_size
+        self._weights = {}
+        self._names = {}
+        for terms, weight in ((topics, TOPIC_WEIGHT), (projects, PROJECT_WEIGHT)):
+            for term in terms:
+                key = _canonical(term)
+                self._weights[key] = max(weight, self._weights.get(key, 0))
+                self._names.setdefault(key, term)
+
+        folded = [t for t in list(projects) + list(topics) if t not in CASE_SENSITIVE_KEYWORDS]
+        exact = [t for t in list(projects) + list(topics) if t in CASE_SENSITIVE_KEYWORDS]
+        self._patterns = [p for p in (_combined_pattern(folded, re.IGNORECASE), _combined_pattern(exact)) if p]
+
+        # normalized text hash -> tweet id, most recent last
+        self._seen = OrderedDict()
+        self.checked = 0
+        self.passed = 0
+        self.rejected = {}
+
+    def score(self, text):
+        """Return (score, matched entity names) for a text"""
+        entities = {}
+        for pattern in self._patterns:
+            for match in pattern.findall(text):
+                key = _canonical(match)
+                entities[key] = self._weights.get(key, TOPIC_WEIGHT)
+        cashtags = {m.upper() for m in _CASHTAG_RE.findall(text)}
+        score = sum(entities.values()) + CASHTAG_WEIGHT * len(cashtags)
+        return score, sorted(self._names[k] for k in entities) + sorted(cashtags)
+
+    def check(self, text, tweet_id=None, lang=None):
+        """Classify a tweet; returns {"relevant", "score", "entities", "reason"}"""
+        self.checked += 1
+        result = self._classify(text or "", tweet_id, lang)
+        if result["relevant"]:
+            self.passed += 1
+        else:
+            self.rejected[result["reason"]] = self.rejected.get(result["reason"], 0) + 1
+            logger.info(f"Skipping tweet ({result['reason']}, score {result['score']}): {(text or '')[:60]!r}")
+        return result
+
+    def check_tweet(self, tweet):
+        """``check`` for a Tweet"""
+        return self.check(tweet.text, tweet.id, tweet.lang)
+
+    def _classify(self, text, tweet_id, lang):
+        stripped = _MENTION_RE.sub(" ", _URL_RE.sub(" ", text))
+        if not any(c.isalnum() for c in stripped):
+            return {"relevant": False, "score": 0.0, "entities": [], "reason": "empty"}
+
+        if (lang or "").lower() not in _NEUTRAL_LANGS or not _looks_english(stripped):
+            return {"relevant": False, "score": 0.0, "entities": [], "reason": "non_english"}
+
+        # The same text under a different tweet ID is a copy; the same ID is a retry
+        digest = hashlib.sha1(normalize_text(stripped).lower().encode("utf-8")).hexdigest()
+        first_id = self._seen.get(digest)
+        if first_id is not None and tweet_id is not None and first_id != tweet_id:
+            return {"relevant": False, "score": 0.0, "entities": [], "reason": "duplicate"}
+        self._seen[digest] = first_id if first_id is not None else tweet_id
+        self._seen.move_to_end(digest)
+        while len(self._seen) > self.dedup_size:
+            self._seen.popitem(last=False)
+
+        score, entities = self.score(text)
+        if score < self.threshold:
+            return {"relevant": False, "score": score, "entities": entities, "reason": "off_topic"}
+        return {"relevant": True, "score": score, "entities": entities, "reason": None}
+
+    def stats(self):
+        saved = sum(self.rejected.values())
+        return {"checked": self.checked, "passed": self.passed, "rejected": dict(self.rejected), "saved_calls": saved}
+
+    def reset_stats(self):
+        self.checked = 0
+        self.passed = 0
+        self.rejected = {}
+
+    def log_and_reset(self, label="cycle"):
+        stats = self.stats()
+        if stats["checked"]:
+            logger.info(f"Relevance filter ({label}): {stats['passed']}/{stats['checked']} passed, "
+                        f"{stats['saved_calls']} LLM calls saved {stats['rejected']}")
+        self.reset_stats()
+
+
+def _looks_english(text):
+    """Cheap script check: most letters are Latin"""
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return True
+    latin = sum(1 for c in letters if c.isascii())
+    return latin / len(letters) >= 0.7
+
+
+# Process-wide filter
+_filter = None
+
+
+def get_relevance_filter():
+    """Return the shared RelevanceFilter"""
+    global _filter
+    if _filter is None:
+        _filter = RelevanceFilter()
+    return _filter
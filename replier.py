@@ -1,12 +1,15 @@
 import os
-import requests
-import json
+import asyncio
 from dotenv import load_dotenv
 from logging import getLogger
-import time
 from config import MONITORED_ACCOUNTS
 from twitter_client import login, reply_to_tweet, browse_tweets_v2
 from datetime import datetime, timedelta
+from generation_cache import get_generation_cache, cache_key
+from llm_client import get_llm_client, LLMError, LLM_OFFLINE_FALLBACK
+from content_generator import offline_reply
+from batch_generation import generate_batch
+from tweet_record import Tweet
 
 # Initialize logger
 logger = getLogger(__name__)
@@ -14,13 +17,19 @@ logger = getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
+# Gemini API key (checked by the entry points via require_api_key, not at import)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
 
-# Gemini 2.0 Flash API endpoint
-GEMINI_FLASH_ENDPOINT = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+def require_api_key():
+    """Raise ValueError if no Gemini API key is configured"""
+    if not os.getenv("GEMINI_API_KEY"):
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+
+# Gemini 2.0 Flash model (requests go through llm_client)
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Bump when PROMPT_REPLY changes so cached replies are not reused
+PROMPT_REPLY_VERSION = "1"
 
 PROMPT_REPLY = """
 You are a Web3 analyst and Twitter engager. Generate a unique, engaging, and contextual reply to the following tweet about Web3.
@@ -37,78 +46,66 @@ Guidelines:
 - Ask thoughtful questions when relevant
 """
 
-def generate_reply(text):
+async def generate_reply(text):
     """Generate a contextual reply using Gemini 2.0 Flash API"""
+    cache = get_generation_cache()
+    key = cache_key(text, PROMPT_REPLY_VERSION, GEMINI_MODEL)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Using cached reply for tweet: {cached}")
+        return cached
+
     try:
         prompt = f"{PROMPT_REPLY}\n\nTweet: {text}\n\nGenerate a reply that directly addresses the specific content and context of this tweet."
-        
-        # Prepare the request payload
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }]
-        }
-        
-        # Make the API request
-        headers = {'Content-Type': 'application/json'}
-        response = requests.post(
-            GEMINI_FLASH_ENDPOINT,
-            headers=headers,
-            data=json.dumps(payload),
-            timeout=30
-        )
-        
-        # Check if request was successful
-        response.raise_for_status()
-        
-        # Parse the response
-        result = response.json()
-        
-        if not result or 'candidates' not in result or not result['candidates']:
-            logger.error("Empty response from Gemini API")
-            return None
-            
-        # Extract the generated text
-        generated_text = result['candidates'][0]['content']['parts'][0]['text']
-        
-        if not generated_text:
-            logger.error("No text in Gemini API response")
-            return None
-
-        reply = generated_text.strip()
+
+        # Runs on the shared async client so the event loop keeps driving the browser
+        generated_text = await get_llm_client().generate(prompt, model=GEMINI_MODEL)
+
+        reply = generated_text[:240]  # Ensure we stay within Twitter's limit
         logger.info(f"Generated reply for tweet: {reply}")
-        return reply[:240]  # Ensure we stay within Twitter's limit
+        cache.put(key, reply)
+        return reply
 
-    except requests.exceptions.RequestException as e:
+    except LLMError as e:
         logger.error(f"API request error: {e}")
-        return None
+        return offline_reply(text) if LLM_OFFLINE_FALLBACK else None
     except Exception as e:
         logger.error(f"Error generating reply: {e}")
         return None
 
-def run_replier():
-    browser, page = login()
+async def generate_replies_batch(texts):
+    """Generate replies for several tweets in one Gemini request, falling back to generate_reply per tweet"""
+    return await generate_batch(
+        texts,
+        PROMPT_REPLY,
+        GEMINI_MODEL,
+        generate_one=generate_reply,
+        template_version=PROMPT_REPLY_VERSION,
+        clean=lambda reply: reply[:240]
+    )
+
+async def run_replier():
+    require_api_key()
+    browser, page = await login()
     for tweet in get_tweets():
-        reply = generate_reply(tweet['text'])
+        reply = await generate_reply(tweet.text)
         if reply:
-            reply_to_tweet(page, tweet['url'], reply)
-        time.sleep(3)  # Add delay between replies
-    browser.close()
+            await reply_to_tweet(page, tweet.url, reply)
+        await asyncio.sleep(3)  # Add delay between replies
+    await browser.close()
 
-def reply_to_tracked_accounts(page):
+async def reply_to_tracked_accounts(page):
     """Reply to monitored Twitter accounts"""
     try:
         for account in MONITORED_ACCOUNTS:
             logger.info(f"Checking tweets from {account}...")
-            tweets = browse_tweets_v2(page, account)
+            tweets = await browse_tweets_v2(page, account)
             if tweets:
                 for tweet in tweets:
-                    reply = generate_reply(tweet['text'])
+                    reply = await generate_reply(tweet.text)
                     if reply:
-                        reply_to_tweet(page, tweet['url'], reply)
-                        time.sleep(3)  # Add delay between replies
+                        await reply_to_tweet(page, tweet.url, reply)
+                        await asyncio.sleep(3)  # Add delay between replies
     except Exception as e:
         logger.error(f"Error replying to tracked accounts: {e}")
 
@@ -120,7 +117,7 @@ def get_tweets():
         tweets = [
             {"text": "Example tweet text", "url": "https://twitter.com/example/status/12345", "timestamp": "2025-06-17T12:00:00"}
         ]
-        return tweets
+        return [Tweet.from_dict(t) for t in tweets]
     except Exception as e:
         logger.error(f"Error fetching tweets: {e}")
         return []
\ No newline at end of file
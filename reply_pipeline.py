@@ -0,0 +1,272 @@
+import time
+import asyncio
+import logging
+
+from twitter_client import browse_tweets_v2, reply_to_tweet, human_like_delay
+from state_store import get_state_store
+from browser_session import get_browser_session
+from resource_governor import get_resource_governor
+from llm_client import LLM_MAX_CONCURRENCY
+from batch_generation import LLM_BATCH_SIZE, LLM_BATCH_WINDOW
+from traffic_replay import recording, replaying, account_page, stub_reply
+from relevance_filter import get_relevance_filter
+from metrics import REPLIES
+from tracing import span, set_track, trace_track
+
+logger = logging.getLogger(__name__)
+
+# Sentinel telling a stage its input is exhausted
+_DONE = object()
+
+
+def advance_cursor(store, account, tweets, failed_tweets=()):
+    """Move the account's cursor past processed tweets, stopping before any failed reply"""
+    try:
+        if not tweets:
+            return
+        failed_ids = [t.id for t in failed_tweets]
+        # Stay just below the oldest failure so it is retried next cycle
+        new_cursor = min(failed_ids) - 1 if failed_ids else max(t.id for t in tweets)
+        newest = next((t for t in tweets if t.id == new_cursor), None)
+        store.set_cursor(account, new_cursor, newest.iso_timestamp if newest else None)
+    except Exception as e:
+        logger.error(f"Error updating cursor for {account}: {e}")
+
+
+class StageStats:
+    """Item count, latency and peak input-queue depth of one pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def record(self, seconds):
+        self.items += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def observe_queue(self, queue):
+        self.max_queue_depth = max(self.max_queue_depth, queue.qsize())
+
+    def as_dict(self):
+        return {
+            "items": self.items,
+            "avg_seconds": round(self.total_seconds / self.items, 3) if self.items else 0.0,
+            "max_seconds": round(self.max_seconds, 3),
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class ReplyPipeline:
+    """Discover -> generate -> post, connected by asyncio queues.
+
+    Discovery browses accounts on its own page while replies are generated
+    concurrently in the background, so LLM latency overlaps with page
+    navigation. Posting runs on a separate page and keeps the configured
+    delay after every reply, so write pacing is unchanged.
+
+    ``select(account, tweets)`` picks which discovered tweets to reply to;
+    ``generate(text)`` is an async function returning the reply text. If
+    ``generate_batch(texts)`` is given, queued tweets are grouped (up to
+    ``batch_size``, waiting at most ``batch_window`` seconds) into one call.
+    ``observe(account, tweets)``, if given, sees every account's discovered tweets
+    after a successful load; accounts whose page failed are not reported.
+    """
+
+    def __init__(self, accounts, generate, select, limit=1, reply_delay=(30000, 45000),
+                 account_delay=(3000, 5000), generators=LLM_MAX_CONCURRENCY,
+                 generate_batch=None, batch_size=LLM_BATCH_SIZE, batch_window=LLM_BATCH_WINDOW,
+                 observe=None):
+        self.accounts = accounts
+        self.observe = observe
+        self.generate = generate
+        self.generate_batch = generate_batch
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.select = select
+        self.limit = limit
+        self.reply_delay = reply_delay
+        self.account_delay = account_delay
+        self.generators = generators
+        self.store = get_state_store()
+        self.session = get_browser_session()
+        self.governor = get_resource_governor()
+        self.relevance = get_relevance_filter()
+        self.stats = {name: StageStats(name) for name in ("discover", "generate", "post")}
+        # account -> {"tweets": [...], "pending": int, "failed": [...]}
+        self._accounts = {}
+
+    async def run(self):
+        """Run one full cycle over all accounts and return per-stage stats"""
+        started = time.monotonic()
+        to_generate = asyncio.Queue()
+        to_post = asyncio.Queue()
+
+        generators = [asyncio.create_task(self._generate_stage(to_generate, to_post, worker=i))
+                      for i in range(self.generators)]
+        poster = asyncio.create_task(self._post_stage(to_post))
+        try:
+            with trace_track("discover"):
+                await self._discover_stage(to_generate)
+            for _ in generators:
+                await to_generate.put(_DONE)
+            await asyncio.gather(*generators)
+            await to_post.put(_DONE)
+            await poster
+        finally:
+            for task in generators + [poster]:
+                task.cancel()
+            # Let cancelled stages unwind (release their pages) before returning
+            await asyncio.gather(*generators, poster, return_exceptions=True)
+
+        stats = {name: s.as_dict() for name, s in self.stats.items()}
+        stats["cycle_seconds"] = round(time.monotonic() - started, 1)
+        stats["relevance"] = self.relevance.stats()
+        logger.info(f"Reply pipeline finished: {stats}")
+        self.relevance.log_and_reset()
+        return stats
+
+    async def _discover_stage(self, to_generate):
+        for account in self.accounts:
+            with span("account", account=account) as account_span:
+                try:
+                    start = time.monotonic()
+                    async with self._discover_page(account) as page:
+                        # A failed load raises instead of looking like a quiet account, so it
+                        # neither moves the cursor nor counts as silence in observe()
+                        tweets = await browse_tweets_v2(page, account, limit=self.limit,
+                                                        since_id=self.store.get_cursor(account),
+                                                        raise_errors=True)
+                    if self.observe:
+                        self.observe(account, tweets)
+                    selected = self.select(account, tweets) if tweets else []
+                    # Empty, duplicate, non-English and off-topic tweets never reach the LLM
+                    selected = [t for t in selected if self.relevance.check_tweet(t)["relevant"]]
+                    self.stats["discover"].record(time.monotonic() - start)
+                    account_span.set(tweets=len(tweets), selected=len(selected))
+
+                    self._accounts[account] = {"tweets": tweets, "pending": len(selected), "failed": []}
+                    if tweets and not selected:
+                        advance_cursor(self.store, account, tweets)
+                    for tweet in selected:
+                        await to_generate.put((account, tweet))
+                    self.stats["generate"].observe_queue(to_generate)
+                except Exception as e:
+                    logger.error(f"Error discovering tweets for {account}: {e}")
+
+                # Recycle the page or relaunch the browser if memory has grown too much
+                with span("governor_check"):
+                    await self.governor.check()
+
+                # Small delay between checking different accounts
+                await self._pace(self.account_delay)
+
+    def _discover_page(self, account):
+        """The shared discover page, or a per-account page while recording/replaying HAR traffic"""
+        if recording() or replaying():
+            return account_page(self.session, account)
+        return self.session.lease("discover")
+
+    async def _pace(self, delay):
+        # Pacing only matters against the live site
+        if not replaying():
+            await human_like_delay(*delay)
+
+    async def _next_batch(self, to_generate):
+        """Take queued items for one generation call; returns (items, done)"""
+        item = await to_generate.get()
+        if item is _DONE:
+            return [], True
+        items = [item]
+        if not self.generate_batch:
+            return items, False
+
+        deadline = time.monotonic() + self.batch_window
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(to_generate.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is _DONE:
+                return items, True
+            items.append(item)
+        return items, False
+
+    async def _generate_stage(self, to_generate, to_post, worker=0):
+        set_track(f"generate-{worker}")
+        done = False
+        while not done:
+            items, done = await self._next_batch(to_generate)
+            if not items:
+                continue
+
+            start = time.monotonic()
+            texts = [tweet.text for _, tweet in items]
+            with span("generate", accounts=",".join(account for account, _ in items), batch=len(items)):
+                try:
+                    if len(items) > 1:
+                        replies = await self.generate_batch(texts)
+                    else:
+                        replies = [await self.generate(texts[0])]
+                except Exception as e:
+                    logger.error(f"Error generating replies: {e}")
+                    replies = [None] * len(items)
+            elapsed = time.monotonic() - start
+            for _ in items:
+                self.stats["generate"].record(elapsed)
+
+            for (account, tweet), reply_text in zip(items, replies):
+                if reply_text:
+                    logger.info(f"Generated reply for {account}: {reply_text}")
+                    await to_post.put((account, tweet, reply_text))
+                    self.stats["post"].observe_queue(to_post)
+                else:
+                    logger.error(f"No reply generated for {account}: {tweet.url}")
+                    REPLIES.inc(result="no_reply")
+                    self._finish(account, tweet, success=False)
+
+    async def _post_stage(self, to_post):
+        set_track("post")
+        while True:
+            item = await to_post.get()
+            if item is _DONE:
+                return
+            account, tweet, reply_text = item
+            start = time.monotonic()
+            success = False
+            with span("post", account=account, tweet=tweet.id) as post_span:
+                try:
+                    async with self.session.lease("post") as page:
+                        post_reply = stub_reply if replaying() else reply_to_tweet
+                        success = await post_reply(page, tweet.url, reply_text)
+                except Exception as e:
+                    logger.error(f"Error posting reply for {account}: {e}")
+                post_span.set(success=success)
+            self.stats["post"].record(time.monotonic() - start)
+            REPLIES.inc(result="success" if success else "failure")
+
+            if success:
+                logger.info(f"Reply successfully sent to {account}: {tweet.url}")
+                # Mark this tweet as replied (committed immediately)
+                self.store.mark_replied(tweet.url)
+            else:
+                logger.error(f"Reply failed for {account}: {tweet.url}")
+            self._finish(account, tweet, success)
+
+            # Avoid detection by adding delay between replies
+            await self._pace(self.reply_delay)
+
+    def _finish(self, account, tweet, success):
+        """Advance the account's cursor once all of its selected tweets are handled"""
+        state = self._accounts[account]
+        if not success:
+            state["failed"].append(tweet)
+        state["pending"] -= 1
+        if state["pending"] == 0:
+            advance_cursor(self.store, account, state["tweets"], state["failed"])
@@ -0,0 +1,146 @@
+import os
+import re
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _env_list(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# Set BLOCK_RESOURCES=false to load every request as before
+RESOURCE_BLOCKING_ENABLED = os.getenv("BLOCK_RESOURCES", "true").lower() == "true"
+
+# Playwright resource types that are never needed by the bot
+BLOCKED_RESOURCE_TYPES = _env_list("BLOCK_RESOURCE_TYPES", ["image", "media", "font"])
+
+# URL patterns (regex) blocked regardless of resource type: trackers, video and avatars
+BLOCKED_URL_PATTERNS = _env_list("BLOCK_URL_PATTERNS", [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"ads-twitter\.com",
+    r"ads-api\.(twitter|x)\.com",
+    r"analytics\.(twitter|x)\.com",
+    r"/i/jot\b",
+    r"/1\.1/jot/",
+    r"video\.twimg\.com",
+    r"pbs\.twimg\.com/(media|profile_images|profile_banners|amplify_video_thumb|ext_tw_video_thumb|card_img)/",
+])
+
+# URL patterns (regex) that are always let through so login and posting keep working
+ALLOWED_URL_PATTERNS = _env_list("ALLOW_URL_PATTERNS", [
+    r"/i/flow/",
+    r"/onboarding/",
+    r"arkoselabs\.com",
+    r"funcaptcha",
+    r"recaptcha",
+    r"/account/access",
+    r"/i/api/graphql/[^/]+/CreateTweet",
+])
+
+# Rough transfer sizes used to estimate what blocking saved; aborted
+# requests are never downloaded, so the real size is unknown
+ESTIMATED_BYTES_PER_TYPE = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "script": 20_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+def _compile(patterns):
+    return re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+
+
+class ResourceBlocker:
+    """Abort media, font and tracker requests on a browser context.
+
+    Installed once per context with ``install()``; counts blocked requests
+    per resource type until ``reset_stats()`` is called.
+    """
+
+    def __init__(self, resource_types=None, url_patterns=None, allow_patterns=None):
+        self.resource_types = set(BLOCKED_RESOURCE_TYPES if resource_types is None else resource_types)
+        self._block_re = _compile(BLOCKED_URL_PATTERNS if url_patterns is None else url_patterns)
+        self._allow_re = _compile(ALLOWED_URL_PATTERNS if allow_patterns is None else allow_patterns)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def should_block(self, url, resource_type):
+        """Return True if a request should be aborted"""
+        if self._allow_re and self._allow_re.search(url):
+            return False
+        if resource_type in self.resource_types:
+            return True
+        return bool(self._block_re and self._block_re.search(url))
+
+    async def install(self, context):
+        """Route every request of the context through the blocker"""
+        await context.route("**/*", self._handle_route)
+        logger.info(f"Resource blocking enabled for types: {sorted(self.resource_types)}")
+
+    async def _handle_route(self, route):
+        request = route.request
+        try:
+            if self.should_block(request.url, request.resource_type):
+                self._record(request.resource_type)
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+        except Exception as e:
+            # Route may already be handled if the page navigated away
+            logger.debug(f"Route handling error for {request.url}: {e}")
+
+    def _record(self, resource_type):
+        with self._lock:
+            self.blocked_requests += 1
+            self.blocked_bytes_estimate += ESTIMATED_BYTES_PER_TYPE.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    def reset_stats(self):
+        with self._lock:
+            self.blocked_requests = 0
+            self.blocked_bytes_estimate = 0
+            self.blocked_by_type = {}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "blocked_requests": self.blocked_requests,
+                "blocked_bytes_estimate": self.blocked_bytes_estimate,
+                "blocked_by_type": dict(self.blocked_by_type),
+            }
+
+    def log_and_reset(self, label="cycle"):
+        """Log the blocked totals since the last reset, then start counting again"""
+        stats = self.stats()
+        logger.info(
+            f"Resource blocking ({label}): {stats['blocked_requests']} requests blocked, "
+            f"~{stats['blocked_bytes_estimate'] / 1_000_000:.1f} MB saved (estimated), "
+            f"by type: {stats['blocked_by_type']}"
+        )
+        self.reset_stats()
+        return stats
+
+
+# Process-wide blocker shared by every context the bot launches
+_blocker = None
+
+
+def get_resource_blocker():
+    """Return the shared ResourceBlocker, or None if blocking is disabled"""
+    global _blocker
+    if not RESOURCE_BLOCKING_ENABLED:
+        return None
+    if _blocker is None:
+        _blocker = ResourceBlocker()
+    return _blocker
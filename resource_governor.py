@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+
+import psutil
+
+from browser_session import get_browser_session
+from logging_setup import RotatingLogHandler
+
+logger = logging.getLogger(__name__)
+
+# Relaunch the whole context when the browser process tree exceeds this RSS
+BROWSER_RSS_LIMIT_MB = float(os.getenv("BROWSER_RSS_LIMIT_MB", "700"))
+
+# Recycle a single page when its JS heap or DOM node count exceeds these
+PAGE_JS_HEAP_LIMIT_MB = float(os.getenv("PAGE_JS_HEAP_LIMIT_MB", "250"))
+PAGE_DOM_NODES_LIMIT = int(os.getenv("PAGE_DOM_NODES_LIMIT", "150000"))
+
+# Samples are appended here as JSON lines for threshold tuning (opt-in, empty disables)
+GOVERNOR_SAMPLES_FILE = os.getenv("GOVERNOR_SAMPLES_FILE", "")
+
+# The samples file rotates at this size, keeping one old file
+GOVERNOR_SAMPLES_MAX_BYTES = int(os.getenv("GOVERNOR_SAMPLES_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# Number of recent samples kept in memory
+SAMPLE_HISTORY = 500
+
+_BROWSER_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+def own_browser_processes():
+    """Return the browser processes started by this Python process (never other users' Chrome)"""
+    processes = []
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            name = proc.name().lower()
+            if any(n in name for n in _BROWSER_PROCESS_NAMES):
+                processes.append(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return processes
+
+
+def browser_rss_bytes():
+    """Total resident memory of our own browser process tree"""
+    total = 0
+    for proc in own_browser_processes():
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total
+
+
+async def page_performance_metrics(context, page):
+    """Read JS heap size and DOM node count of a page through CDP Performance metrics"""
+    cdp = await context.new_cdp_session(page)
+    try:
+        await cdp.send("Performance.enable")
+        result = await cdp.send("Performance.getMetrics")
+        return {m["name"]: m["value"] for m in result.get("metrics", [])}
+    finally:
+        await cdp.detach()
+
+
+class ResourceGovernor:
+    """Samples browser memory and recycles pages or the context past the watermarks.
+
+    Call ``check()`` between tasks (while no page is leased). Each sample is
+    kept in ``samples`` and, if GOVERNOR_SAMPLES_FILE is set, appended to that
+    size-capped file from a worker thread.
+    """
+
+    def __init__(self, session, rss_limit_mb=BROWSER_RSS_LIMIT_MB,
+                 js_heap_limit_mb=PAGE_JS_HEAP_LIMIT_MB, dom_nodes_limit=PAGE_DOM_NODES_LIMIT,
+                 samples_file=GOVERNOR_SAMPLES_FILE):
+        self.session = session
+        self.rss_limit_mb = rss_limit_mb
+        self.js_heap_limit_mb = js_heap_limit_mb
+        self.dom_nodes_limit = dom_nodes_limit
+        self.samples_file = samples_file
+        self._samples_handler = None
+        if samples_file:
+            self._samples_handler = RotatingLogHandler(samples_file, max_bytes=GOVERNOR_SAMPLES_MAX_BYTES,
+                                                       max_age=0, backup_count=1)
+            self._samples_handler.setFormatter(logging.Formatter("%(message)s"))
+        self.samples = deque(maxlen=SAMPLE_HISTORY)
+        self.page_recycles = 0
+        self.relaunches = 0
+
+    async def sample(self):
+        """Take one sample of the process tree RSS and per-page JS heap / DOM nodes"""
+        sample = {
+            "ts": time.time(),
+            "rss_mb": round(browser_rss_bytes() / 1_048_576, 1),
+            "pages": {},
+        }
+        context = self.session.context
+        for name, page in self.session.pages.items():
+            if context is None or page.is_closed():
+                continue
+            try:
+                metrics = await page_performance_metrics(context, page)
+                sample["pages"][name] = {
+                    "js_heap_mb": round(metrics.get("JSHeapUsedSize", 0) / 1_048_576, 1),
+                    "dom_nodes": int(metrics.get("Nodes", 0)),
+                }
+            except Exception as e:
+                logger.debug(f"Could not read performance metrics for page {name}: {e}")
+        return sample
+
+    async def check(self):
+        """Sample, then relaunch the context or recycle pages that crossed a threshold"""
+        try:
+            sample = await self.sample()
+        except Exception as e:
+            logger.error(f"Resource sampling error: {e}")
+            return None
+
+        actions = []
+        if sample["rss_mb"] > self.rss_limit_mb:
+            logger.warning(f"Browser RSS {sample['rss_mb']} MB over {self.rss_limit_mb} MB, relaunching context")
+            await self.session.restart()
+            self.relaunches += 1
+            actions.append("relaunch")
+        else:
+            for name, metrics in sample["pages"].items():
+                if metrics["js_heap_mb"] > self.js_heap_limit_mb or metrics["dom_nodes"] > self.dom_nodes_limit:
+                    logger.warning(f"Page {name} over limits ({metrics}), recycling it")
+                    await self.session.recycle_page(name)
+                    self.page_recycles += 1
+                    actions.append(f"recycle:{name}")
+
+        sample["actions"] = actions
+        self.samples.append(sample)
+        await self._export(sample)
+        return sample
+
+    async def _export(self, sample):
+        if self._samples_handler is None:
+            return
+        record = logging.makeLogRecord({"msg": json.dumps(sample), "levelno": logging.INFO, "levelname": "INFO"})
+        # The handler rotates the file and reports write errors through logging's handleError
+        await asyncio.to_thread(self._samples_handler.handle, record)
+
+
+# Process-wide governor for the shared browser session
+_governor = None
+
+
+def get_resource_governor():
+    """Return the shared ResourceGovernor"""
+    global _governor
+    if _governor is None:
+        _governor = ResourceGovernor(get_browser_session())
+    return _governor
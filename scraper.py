@@ -1,17 +1,32 @@
 import os
-import subprocess
 import json
+import asyncio
 import logging
-import tempfile
-import ssl
+import threading
+import subprocess
 import certifi
 import platform
 import random  # Bu satırı eklediğinizden emin olun
 from datetime import datetime, timedelta
+from relevance_filter import get_relevance_filter
+from tweet_record import Tweet
 
 # Logger yapılandırması
 logger = logging.getLogger(__name__)
 
+# Aynı anda çalışan en fazla snscrape süreci
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "4"))
+
+# snscrape süreci bu kadar saniye içinde bitmezse sonlandırılır
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "120"))
+
+# snscrape çıktısında izin verilen en uzun JSON satırı (bayt); alıntı ve medya içeren
+# tweetler asyncio'nun varsayılan 64 KiB sınırını aşabilir
+SCRAPER_LINE_LIMIT = 16 * 1024 * 1024
+
+# Süreç başına bir kez yapılan kurulumdan sonra snscrape'e verilen ortam
+_scraper_env = None
+
 def install_snscrape():
     """snscrape kütüphanesini kurar"""
     try:
@@ -40,88 +55,223 @@ def fix_ssl_certificates():
     except Exception as e:
         logger.warning(f"SSL sertifika yapılandırması başarısız: {e}")
 
-def scrape_twitter_accounts(username, limit=10, days=1):
-    """Belirli bir kullanıcının son tweetlerini çeker"""
-    install_snscrape()
-    fix_ssl_certificates()
-    
-    logger.info(f"{username} hesabının son {limit} tweeti çekiliyor...")
-    
+def prepare_scraper():
+    """Kurulumu ve SSL ayarını süreç başına bir kez yapar, snscrape ortamını döndürür"""
+    global _scraper_env
+    if _scraper_env is None:
+        install_snscrape()
+        fix_ssl_certificates()
+        env = os.environ.copy()
+        # SSL doğrulama yapılmadan çalıştır (güvenlik uyarısı - gerçek uygulamada dikkatli kullanın)
+        env["PYTHONHTTPSVERIFY"] = "0"
+        _scraper_env = env
+    return _scraper_env
+
+def snscrape_command(username, limit=10, days=1):
+    """Bir hesabın son tweetleri için snscrape komutu (kabuk olmadan çalıştırılır)"""
+    username = username.lstrip("@")
     # Son X gündeki tweetleri filtreleme
     since_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-    
-    # Geçici dosya oluştur
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False, encoding='utf-8') as tmp_file:
-        try:
-            # SSL doğrulama yapılmadan çalıştır (güvenlik uyarısı - gerçek uygulamada dikkatli kullanın)
-            env = os.environ.copy()
-            env["PYTHONHTTPSVERIFY"] = "0"
-            
-            # snscrape komutunu çalıştır
-            cmd = f'snscrape --jsonl --max-results {limit} twitter-search "from:{username} since:{since_date}"'
-            logger.info(f"Komut çalıştırılıyor: {cmd}")
-            
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, env=env)
-            
-            if result.returncode != 0:
-                logger.error(f"snscrape çalıştırma hatası: {result.stderr}")
-                
-                # Hata durumunda yapay tweet verileri oluştur
-                logger.warning("Gerçek tweet verisi alınamadı, yapay veriler kullanılacak")
-                fake_tweets = generate_fake_tweets(username, limit)
-                tmp_file.write("\n".join([json.dumps(tweet) for tweet in fake_tweets]))
-            else:
-                # Çıktıyı dosyaya yaz
-                tmp_file.write(result.stdout)
-            
-            tmp_filename = tmp_file.name
-        except Exception as e:
-            logger.error(f"snscrape çalıştırma hatası: {e}")
-            tmp_filename = tmp_file.name
-            
-            # Hata durumunda yapay tweet verileri oluştur
-            logger.warning("Gerçek tweet verisi alınamadı, yapay veriler kullanılacak")
-            fake_tweets = generate_fake_tweets(username, limit)
-            with open(tmp_filename, 'w', encoding='utf-8') as f:
-                f.write("\n".join([json.dumps(tweet) for tweet in fake_tweets]))
-    
-    # Dosyadan tweet verilerini oku
-    tweets = []
+    return ["snscrape", "--jsonl", "--max-results", str(limit),
+            "twitter-search", f"from:{username} since:{since_date}"]
+
+def parse_tweet_line(line, username):
+    """snscrape'in bir JSONL satırını Tweet'e çevirir; okunamazsa None"""
+    line = line.strip()
+    if not line:
+        return None
     try:
-        with open(tmp_filename, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        tweet_data = json.loads(line)
-                        
-                        # snscrape veya yapay veri formatı kontrolü
-                        if isinstance(tweet_data, dict):
-                            if 'content' in tweet_data:
-                                # snscrape formatı
-                                tweets.append({
-                                    'id': tweet_data.get('id', ''),
-                                    'url': tweet_data.get('url', ''),
-                                    'date': tweet_data.get('date', ''),
-                                    'text': tweet_data.get('content', ''),
-                                    'username': tweet_data.get('user', {}).get('username', username)
-                                })
-                            else:
-                                # Yapay veri formatı
-                                tweets.append(tweet_data)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"JSON çözümleme hatası: {e} - {line}")
-                        continue
-    except Exception as e:
-        logger.error(f"Tweet verilerini okuma hatası: {e}")
+        tweet_data = json.loads(line)
+    except json.JSONDecodeError as e:
+        logger.warning(f"JSON çözümleme hatası: {e} - {line[:200]}")
+        return None
+    if not isinstance(tweet_data, dict):
+        return None
+    tweet = Tweet.from_dict(tweet_data)
+    if tweet is not None and not tweet.author:
+        tweet.author = username.lstrip("@")
+    return tweet
+
+def _fallback_tweets(username, limit):
+    logger.warning("Gerçek tweet verisi alınamadı, yapay veriler kullanılacak")
+    return [Tweet.from_dict(tweet) for tweet in generate_fake_tweets(username.lstrip("@"), limit)]
+
+def iter_account_tweets(username, limit=10, days=1):
+    """Bir hesabın tweetlerini snscrape çıktısından geldikçe üretir (generator).
+
+    Satırlar doğrudan süreç borusundan okunur; üretici erken bırakılırsa
+    süreç sonlandırılır. snscrape hiç sonuç vermeden başarısız olursa
+    yapay veriler üretilir.
+    """
+    env = prepare_scraper()
+    logger.info(f"{username} hesabının son {limit} tweeti çekiliyor...")
+    try:
+        proc = subprocess.Popen(snscrape_command(username, limit, days), stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True, encoding='utf-8', env=env)
+    except OSError as e:
+        logger.error(f"snscrape çalıştırma hatası: {e}")
+        yield from _fallback_tweets(username, limit)
+        return
+
+    # stderr ayrı okunur, yoksa dolan boru süreci kilitleyebilir
+    stderr = []
+    drain = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+    drain.start()
+    count = 0
+    finished = False
+    try:
+        for line in proc.stdout:
+            tweet = parse_tweet_line(line, username)
+            if tweet is None:
+                continue
+            count += 1
+            yield tweet
+            if count >= limit:
+                break
+        else:
+            finished = True
     finally:
-        # Geçici dosyayı temizle
+        if not finished and proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        drain.join()
+        proc.stdout.close()
+        proc.stderr.close()
+
+    if count == 0 and finished and proc.returncode != 0:
+        logger.error(f"snscrape çalıştırma hatası: {''.join(stderr).strip()[-500:]}")
+        yield from _fallback_tweets(username, limit)
+    else:
+        logger.info(f"{username}: {count} tweet bulundu")
+
+def scrape_twitter_accounts(username, limit=10, days=1):
+    """Belirli bir kullanıcının son tweetlerini çeker"""
+    return list(iter_account_tweets(username, limit, days))
+
+async def _reap(proc, stderr):
+    """Süreç bitip stderr okunana kadar bekler ve stderr'i döndürür.
+
+    Bu sırada gelen iptal bekleme bittikten sonra yeniden yükseltilir;
+    yoksa öldürülen süreç toplanmadan ve boruları kapanmadan kalır.
+    """
+    waiting = asyncio.gather(proc.wait(), stderr)
+    cancelled = False
+    while True:
         try:
-            os.unlink(tmp_filename)
-        except:
-            pass
-    
-    logger.info(f"{len(tweets)} tweet bulundu")
-    return tweets
+            _, errors = await asyncio.shield(waiting)
+            break
+        except asyncio.CancelledError:
+            cancelled = True
+    if cancelled:
+        raise asyncio.CancelledError()
+    return errors
+
+async def _scrape_account_async(username, limit, days, on_tweet):
+    """Bir hesabı asenkron snscrape süreciyle tarar, her Tweet için on_tweet çağırır.
+
+    on_tweet False döndürürse yeterli sonuç toplanmıştır ve süreç sonlandırılır;
+    görev iptal edildiğinde de süreç sonlandırılır.
+    """
+    env = prepare_scraper()
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *snscrape_command(username, limit, days),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=env,
+            limit=SCRAPER_LINE_LIMIT)
+    except OSError as e:
+        logger.error(f"snscrape çalıştırma hatası: {e}")
+        for tweet in _fallback_tweets(username, limit):
+            if not on_tweet(tweet):
+                break
+        return
+
+    stderr = asyncio.create_task(proc.stderr.read())
+    count = 0
+    finished = False
+    try:
+        async with asyncio.timeout(SCRAPER_TIMEOUT):
+            while True:
+                try:
+                    line = await proc.stdout.readline()
+                except ValueError:
+                    # Sınırı aşan satır atlanır, hesabın geri kalanı okunmaya devam eder
+                    logger.warning(f"{username}: {SCRAPER_LINE_LIMIT} bayttan uzun satır atlandı")
+                    continue
+                if not line:
+                    finished = True
+                    break
+                tweet = parse_tweet_line(line.decode('utf-8', errors='replace'), username)
+                if tweet is None:
+                    continue
+                count += 1
+                if not on_tweet(tweet) or count >= limit:
+                    break
+    except TimeoutError:
+        logger.error(f"snscrape {username} için {SCRAPER_TIMEOUT:.0f} saniyede bitmedi")
+    finally:
+        # Erken çıkış, zaman aşımı veya iptal: süreci arkada bırakma
+        if not finished and proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        errors = await _reap(proc, stderr)
+
+    if count == 0 and finished and proc.returncode != 0:
+        logger.error(f"snscrape çalıştırma hatası: {errors.decode('utf-8', errors='replace').strip()[-500:]}")
+        for tweet in _fallback_tweets(username, limit):
+            if not on_tweet(tweet):
+                break
+    else:
+        logger.info(f"{username}: {count} tweet bulundu")
+
+async def scrape_accounts(usernames, limit=10, days=1, max_results=None, concurrency=SCRAPER_CONCURRENCY):
+    """Birden çok hesabı en fazla ``concurrency`` eşzamanlı snscrape süreciyle tarar.
+
+    Tweet'ler hesap sırasıyla döndürülür. ``max_results`` kadar sonuç
+    toplanınca bekleyen ve çalışan görevler iptal edilir, süreçleri
+    sonlandırılır.
+    """
+    results = {username: [] for username in usernames}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    enough = asyncio.Event()
+    total = 0
+
+    def collector(username):
+        def on_tweet(tweet):
+            nonlocal total
+            if enough.is_set():
+                return False
+            results[username].append(tweet)
+            total += 1
+            if max_results is not None and total >= max_results:
+                enough.set()
+                return False
+            return True
+        return on_tweet
+
+    async def worker(username):
+        async with semaphore:
+            if not enough.is_set():
+                await _scrape_account_async(username, limit, days, collector(username))
+
+    tasks = [asyncio.create_task(worker(username)) for username in usernames]
+    waiter = asyncio.create_task(enough.wait())
+    try:
+        pending = set(tasks)
+        while pending and not enough.is_set():
+            _, pending = await asyncio.wait(pending | {waiter}, return_when=asyncio.FIRST_COMPLETED)
+            pending.discard(waiter)
+    finally:
+        for task in tasks + [waiter]:
+            task.cancel()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    for username, outcome in zip(usernames, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"{username} taranırken hata: {outcome}")
+    if enough.is_set():
+        logger.info(f"{max_results} sonuca ulaşıldı, kalan taramalar iptal edildi")
+    return [tweet for username in usernames for tweet in results[username]]
 
 def generate_fake_tweets(username, count=5):
     """Test için sahte tweet verileri üretir"""
@@ -152,19 +302,8 @@ WATCHED_USERS = [
     "@SymphonyFinance", "@theoriq_ai", "@thriveprotocol", "@union_build", "@yeet"
 ]
 
-KEYWORDS = [
-    "web3", "crypto", "blockchain", "layer1", "layer2", "zk", "staking",
-    "airdrops", "DeFi", "modular", "rollup", "EVM", "onchain"
-]
-
 def get_tweets():
-    results = []
-    for user in WATCHED_USERS:
-        for tweet in sntwitter.TwitterUserScraper(user).get_items():
-            if any(k in tweet.content.lower() for k in KEYWORDS):
-                results.append({
-                    'text': tweet.content,
-                    'url': tweet.url
-                })
-            break
-    return results
\ No newline at end of file
+    """İzlenen hesapların son tweetlerinden konuyla ilgili olanları döndürür"""
+    relevance = get_relevance_filter()
+    tweets = asyncio.run(scrape_accounts(WATCHED_USERS, limit=1))
+    return [tweet for tweet in tweets if relevance.check_tweet(tweet)["relevant"]]
@@ -0,0 +1,81 @@
+"""Per-action memory of which candidate selector last matched.
+
+Twitter's markup changes often, so every browser action in twitter_client
+lists several candidate selectors. The one that matched last time is kept
+per action in the state store and tried first. Hits and misses are counted
+(bot_cache_lookups_total{cache="selector"}) and each miss is logged, so a
+selector that has gone stale shows up without reading screenshots.
+"""
+import logging
+
+from metrics import CACHE_LOOKUPS, SELECTOR_MATCHES
+from state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorCache:
+    """Remembers the winning selector for each action, persisted through a StateStore"""
+
+    def __init__(self, store=None):
+        self._store = store
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            if self._store is None:
+                self._store = get_state_store()
+            self._entries = self._store.get_selector_cache()
+        return self._entries
+
+    def order(self, action, selectors):
+        """The candidates with the selector that last worked for ``action`` moved to the front"""
+        entry = self._load().get(action)
+        cached = entry["selector"] if entry else None
+        if cached not in selectors:
+            return list(selectors)
+        return [cached] + [s for s in selectors if s != cached]
+
+    def record(self, action, selector):
+        """Count the outcome of a lookup (``selector`` None: nothing matched) and remember the winner"""
+        entry = self._load().setdefault(action, {"selector": None, "hits": 0, "misses": 0})
+        cached = entry["selector"]
+        SELECTOR_MATCHES.inc(action=action, selector=selector or "none")
+        if selector is not None and selector == cached:
+            entry["hits"] += 1
+            CACHE_LOOKUPS.inc(cache="selector", result="hit")
+        else:
+            entry["misses"] += 1
+            CACHE_LOOKUPS.inc(cache="selector", result="miss")
+            if selector is not None:
+                entry["selector"] = selector
+            if cached is not None:
+                logger.warning(f"Selector cache miss for {action}: {cached!r} -> {selector!r} "
+                               f"(hit rate {self.hit_rate(action):.0%})")
+        try:
+            self._store.set_selector_cache(action, entry["selector"], entry["hits"], entry["misses"])
+        except Exception as e:
+            logger.error(f"Could not save selector cache for {action}: {e}")
+
+    def hit_rate(self, action):
+        entry = self._load().get(action)
+        if not entry or not entry["hits"] + entry["misses"]:
+            return 0.0
+        return entry["hits"] / (entry["hits"] + entry["misses"])
+
+    def report(self):
+        """{action: {selector, hits, misses, hit_rate}} for every action seen"""
+        return {action: dict(entry, hit_rate=round(self.hit_rate(action), 3))
+                for action, entry in sorted(self._load().items())}
+
+
+# Process-wide cache, loaded from the state store on first use
+_cache = None
+
+
+def get_selector_cache():
+    """Return the shared SelectorCache"""
+    global _cache
+    if _cache is None:
+        _cache = SelectorCache()
+    return _cache
@@ -0,0 +1,212 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Directory for the bot's databases; browser_data is the persistent volume in Docker
+DATA_DIR = os.getenv("BOT_DATA_DIR", os.path.join(BASE_DIR, "browser_data"))
+
+# SQLite database holding the bot's persistent state
+STATE_DB_PATH = os.getenv("BOT_STATE_DB", os.path.join(DATA_DIR, "bot_state.db"))
+
+# Old JSON file, imported once into the database and then renamed
+LEGACY_REPLIED_FILE = os.path.join(BASE_DIR, "replied_tweets.json")
+
+# How long a reply is remembered (24 hours)
+REPLIED_TTL_SECONDS = 24 * 3600
+
+_TWEET_ID_RE = re.compile(r"/status(?:es)?/(\d+)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS replied_tweets (
+    tweet_key  TEXT PRIMARY KEY,
+    tweet_url  TEXT NOT NULL,
+    replied_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_replied_tweets_replied_at ON replied_tweets (replied_at);
+CREATE TABLE IF NOT EXISTS account_cursors (
+    account         TEXT PRIMARY KEY,
+    tweet_id        INTEGER NOT NULL,
+    tweet_timestamp TEXT,
+    updated_at      REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS account_schedule (
+    account       TEXT PRIMARY KEY,
+    rate          REAL,
+    last_checked  REAL,
+    last_tweet_at REAL,
+    next_check    REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS selector_cache (
+    action     TEXT PRIMARY KEY,
+    selector   TEXT,
+    hits       INTEGER NOT NULL,
+    misses     INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def tweet_key(tweet_url):
+    """Return the status ID of a tweet URL, or the URL itself if it has none"""
+    match = _TWEET_ID_RE.search(tweet_url or "")
+    return match.group(1) if match else tweet_url
+
+
+class StateStore:
+    """SQLite (WAL mode) store for replied tweets and per-account cursors.
+
+    Every write is committed immediately, so a crash mid-cycle keeps the
+    replies already sent. Lookups go through the primary key and expiry
+    through the ``replied_at`` index, so neither scans the whole history.
+    """
+
+    def __init__(self, path=STATE_DB_PATH, legacy_file=LEGACY_REPLIED_FILE):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # isolation_level=None: autocommit, each statement is its own transaction
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        logger.info(f"State store opened: {path}")
+
+        self._migrate_legacy_file(legacy_file)
+
+    def _migrate_legacy_file(self, legacy_file=LEGACY_REPLIED_FILE):
+        """Import replied_tweets.json once, then rename it so it is not read again"""
+        if not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                replied_tweets = json.load(f)
+
+            rows = [(tweet_key(url), url, float(ts)) for url, ts in replied_tweets.items()]
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO replied_tweets (tweet_key, tweet_url, replied_at) VALUES (?, ?, ?)",
+                        rows
+                    )
+                except Exception:
+                    # Leave autocommit mode intact; the file stays in place for the next start
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+
+            os.replace(legacy_file, legacy_file + ".migrated")
+            logger.info(f"Imported {len(replied_tweets)} entries from {legacy_file}")
+        except Exception as e:
+            logger.error(f"Error migrating {legacy_file}: {e}")
+
+    def has_replied(self, tweet_url, ttl=REPLIED_TTL_SECONDS):
+        """Return True if we replied to this tweet within the TTL"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM replied_tweets WHERE tweet_key = ? AND replied_at > ?",
+                (tweet_key(tweet_url), time.time() - ttl)
+            ).fetchone()
+        return row is not None
+
+    def mark_replied(self, tweet_url, replied_at=None):
+        """Record a reply; committed before returning"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO replied_tweets (tweet_key, tweet_url, replied_at) VALUES (?, ?, ?)",
+                (tweet_key(tweet_url), tweet_url, replied_at if replied_at is not None else time.time())
+            )
+
+    def prune_replied(self, ttl=REPLIED_TTL_SECONDS):
+        """Delete replies older than the TTL and return how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM replied_tweets WHERE replied_at <= ?",
+                (time.time() - ttl,)
+            )
+        return cursor.rowcount
+
+    def get_cursor(self, account):
+        """Return the newest tweet ID already processed for an account, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tweet_id FROM account_cursors WHERE account = ?",
+                (account.lower(),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, account, tweet_id, tweet_timestamp=None):
+        """Advance an account's cursor; it never moves backwards"""
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO account_cursors (account, tweet_id, tweet_timestamp, updated_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT (account) DO UPDATE SET
+                       tweet_id = excluded.tweet_id,
+                       tweet_timestamp = excluded.tweet_timestamp,
+                       updated_at = excluded.updated_at
+                   WHERE excluded.tweet_id > account_cursors.tweet_id""",
+                (account.lower(), int(tweet_id), tweet_timestamp, time.time())
+            )
+
+    def get_schedules(self):
+        """Return {account: {rate, last_checked, last_tweet_at, next_check}} for all scheduled accounts"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT account, rate, last_checked, last_tweet_at, next_check FROM account_schedule"
+            ).fetchall()
+        return {
+            account: {"rate": rate, "last_checked": last_checked, "last_tweet_at": last_tweet_at, "next_check": next_check}
+            for account, rate, last_checked, last_tweet_at, next_check in rows
+        }
+
+    def set_schedule(self, account, rate, last_checked, last_tweet_at, next_check):
+        """Save an account's learned posting rate and next poll time"""
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO account_schedule (account, rate, last_checked, last_tweet_at, next_check)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (account.lower(), rate, last_checked, last_tweet_at, next_check)
+            )
+
+    def get_selector_cache(self):
+        """Return {action: {selector, hits, misses}} for every browser action seen so far"""
+        with self._lock:
+            rows = self._conn.execute("SELECT action, selector, hits, misses FROM selector_cache").fetchall()
+        return {action: {"selector": selector, "hits": hits, "misses": misses}
+                for action, selector, hits, misses in rows}
+
+    def set_selector_cache(self, action, selector, hits, misses):
+        """Save the selector that last worked for an action, with its hit/miss counts"""
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO selector_cache (action, selector, hits, misses, updated_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (action, selector, hits, misses, time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide store, opened on first use
+_store = None
+
+
+def get_state_store():
+    """Return the shared StateStore, opening it on first call"""
+    global _store
+    if _store is None:
+        _store = StateStore()
+    return _store
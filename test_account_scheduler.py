@@ -0,0 +1,98 @@
+"""Tests for the adaptive per-account polling schedule"""
+import pytest
+
+import account_scheduler
+from account_scheduler import AccountScheduler, POLL_DEFAULT_INTERVAL, POLL_MAX_INTERVAL, POLL_MIN_INTERVAL
+from state_store import StateStore
+from tweet_record import Tweet
+
+NOW = 1_800_000_000.0
+HOUR = 3600.0
+
+
+def tweets_at(*times, pinned=()):
+    return [Tweet(id=i + 1, text="gm", url=f"https://x.com/a/status/{i + 1}", timestamp=t, is_pinned=t in pinned)
+            for i, t in enumerate(times)]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(account_scheduler, "POLL_JITTER", 0)
+    store = StateStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+
+def test_first_visit_rate_from_tweet_spacing(store):
+    scheduler = AccountScheduler(["alice"], store)
+    # 4 tweets over 3 hours: one per hour
+    scheduler.observe("alice", tweets_at(NOW - 3 * HOUR, NOW - 2 * HOUR, NOW - HOUR, NOW), now=NOW)
+    assert scheduler.state["alice"]["rate"] == pytest.approx(1 / HOUR)
+    assert scheduler.tweets_per_day("alice") == pytest.approx(24)
+    assert scheduler.seconds_until_next(now=NOW) == pytest.approx(HOUR)
+
+
+def test_rate_is_an_exponential_moving_average(store):
+    scheduler = AccountScheduler(["alice"], store)
+    scheduler.observe("alice", tweets_at(NOW - HOUR, NOW), now=NOW)
+    # Two new tweets in the 4 hours since the last one seen: 0.5 per hour
+    scheduler.observe("alice", tweets_at(NOW + 2 * HOUR, NOW + 4 * HOUR), now=NOW + 4 * HOUR)
+    expected = (1 - account_scheduler.RATE_SMOOTHING) * (1 / HOUR) + account_scheduler.RATE_SMOOTHING * (0.5 / HOUR)
+    assert scheduler.state["alice"]["rate"] == pytest.approx(expected)
+
+
+def test_silence_lowers_the_rate_and_pinned_tweets_are_ignored(store):
+    scheduler = AccountScheduler(["alice"], store)
+    scheduler.observe("alice", tweets_at(NOW - HOUR, NOW), now=NOW)
+    rate = scheduler.state["alice"]["rate"]
+    # Only an old pinned tweet on the next visit, 10 hours later
+    scheduler.observe("alice", tweets_at(NOW - 100 * HOUR, pinned=(NOW - 100 * HOUR,)), now=NOW + 10 * HOUR)
+    assert scheduler.state["alice"]["rate"] < rate
+    assert scheduler.state["alice"]["last_tweet_at"] == NOW
+
+
+@pytest.mark.parametrize("times, expected", [
+    # Hundreds of tweets an hour: clamped to the minimum
+    ([NOW - 60 + i for i in range(60)], POLL_MIN_INTERVAL),
+    # Two tweets a week apart: clamped to the maximum
+    ([NOW - 7 * 24 * HOUR, NOW], POLL_MAX_INTERVAL),
+    # Not enough history: default
+    ([NOW], POLL_DEFAULT_INTERVAL),
+    ([], POLL_DEFAULT_INTERVAL),
+])
+def test_interval_is_clamped(store, times, expected):
+    scheduler = AccountScheduler(["alice"], store)
+    scheduler.observe("alice", tweets_at(*times), now=NOW)
+    assert scheduler.seconds_until_next(now=NOW) == pytest.approx(expected)
+    assert POLL_MIN_INTERVAL <= scheduler.interval("alice") <= POLL_MAX_INTERVAL
+
+
+def test_due_pops_in_order_and_reschedules(store):
+    scheduler = AccountScheduler(["alice", "bob", "carol"], store)
+    # Everyone is due on the first run
+    assert sorted(scheduler.due(now=NOW)) == ["alice", "bob", "carol"]
+    assert scheduler.due(now=NOW) == []
+    # Provisionally rescheduled one default interval ahead, so failed visits are retried
+    assert scheduler.seconds_until_next(now=NOW) == pytest.approx(POLL_DEFAULT_INTERVAL)
+
+    scheduler.observe("bob", tweets_at(*[NOW - 60 + i for i in range(60)]), now=NOW)
+    assert scheduler.due(now=NOW + POLL_MIN_INTERVAL) == ["bob"]
+    # Superseded heap entries are skipped: bob is next due one minimum interval later
+    assert scheduler.due(now=NOW + POLL_MIN_INTERVAL + 1) == []
+    assert scheduler.seconds_until_next(now=NOW + POLL_MIN_INTERVAL) == pytest.approx(POLL_MIN_INTERVAL)
+    assert sorted(scheduler.due(now=NOW + POLL_DEFAULT_INTERVAL)) == ["alice", "bob", "carol"]
+
+
+def test_schedule_survives_a_restart(store, tmp_path):
+    scheduler = AccountScheduler(["Alice", "bob"], store)
+    scheduler.observe("Alice", tweets_at(NOW - HOUR, NOW), now=NOW)
+    scheduler.observe("bob", tweets_at(NOW - 7 * 24 * HOUR, NOW), now=NOW)
+
+    reopened = StateStore(str(tmp_path / "state.db"))
+    restored = AccountScheduler(["Alice", "bob", "new"], reopened)
+    assert restored.state["Alice"] == scheduler.state["Alice"]
+    assert restored.state["bob"]["next_check"] == pytest.approx(NOW + POLL_MAX_INTERVAL)
+    # Only the account without a saved schedule is due right away
+    assert restored.due(now=NOW) == ["new"]
+    assert restored.due(now=NOW + HOUR) == ["Alice", "new"]
+    reopened.close()
@@ -0,0 +1,87 @@
+"""Tests for the bounded error-artifact store"""
+import json
+import asyncio
+
+from artifact_store import ArtifactStore
+
+
+class FakePage:
+    url = "https://x.com/alice/status/1"
+
+    def __init__(self, size=1000, fail=False):
+        self.size = size
+        self.fail = fail
+        self.calls = []
+
+    async def screenshot(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.fail:
+            raise RuntimeError("page crashed")
+        return b"\xff\xd8" + b"x" * self.size
+
+
+def sidecars(directory):
+    return sorted(directory.glob("*.json"))
+
+
+def test_captures_jpeg_with_metadata_of_the_handled_exception(tmp_path):
+    store = ArtifactStore(str(tmp_path), rate_limit=60)
+    page = FakePage()
+
+    async def fail():
+        try:
+            raise TimeoutError("reply button not found")
+        except TimeoutError:
+            return await store.capture(page, "reply_button_error.png")
+
+    path = asyncio.run(fail())
+    assert path.endswith("_reply_button_error.jpg")
+    assert page.calls[0]["type"] == "jpeg"
+    [sidecar] = sidecars(tmp_path)
+    metadata = json.loads(sidecar.read_text())
+    assert metadata["url"] == FakePage.url
+    assert metadata["exception"] == "TimeoutError: reply button not found"
+    assert "raise TimeoutError" in metadata["traceback"]
+    assert metadata["image"] == path.rsplit("/", 1)[-1]
+
+
+def test_identical_failures_are_rate_limited(tmp_path):
+    store = ArtifactStore(str(tmp_path), rate_limit=60)
+    page = FakePage()
+
+    async def run():
+        results = [await store.capture(page, "reply_error.png", ValueError("x")) for _ in range(5)]
+        results.append(await store.capture(page, "reply_error.png", KeyError("other failure")))
+        return results
+
+    results = asyncio.run(run())
+    assert [r is not None for r in results] == [True, False, False, False, False, True]
+    assert len(page.calls) == 2
+    assert store.stats()["suppressed"] == 4
+
+
+def test_ring_buffer_keeps_newest_within_caps(tmp_path):
+    (tmp_path / "20000101-000000-000000_old.jpg").write_bytes(b"x" * 500)
+    store = ArtifactStore(str(tmp_path), max_files=3, max_bytes=10**6, rate_limit=0)
+
+    async def run():
+        for i in range(6):
+            await store.capture(FakePage(), f"browse_error_{i}.png", ValueError(i))
+
+    asyncio.run(run())
+    names = sorted(p.name for p in tmp_path.glob("*.jpg"))
+    assert [n.split("_", 1)[1] for n in names] == ["browse_error_3.jpg", "browse_error_4.jpg", "browse_error_5.jpg"]
+
+    small = ArtifactStore(str(tmp_path / "small"), max_files=100, max_bytes=5000, rate_limit=0)
+    asyncio.run(small.capture(FakePage(size=100), "a.png", ValueError()))
+    for i in range(5):
+        asyncio.run(small.capture(FakePage(size=2000), f"b{i}.png", ValueError()))
+    assert small.stats()["bytes"] <= 5000
+    assert small.stats()["artifacts"] == 2
+
+
+def test_screenshot_failure_still_records_metadata(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    path = asyncio.run(store.capture(FakePage(fail=True), "fatal_error.png", RuntimeError("boom")))
+    assert path.endswith(".json")
+    assert json.loads(open(path).read())["image"] is None
@@ -0,0 +1,101 @@
+"""Tests for batched reply generation and its response parser"""
+import json
+import asyncio
+
+import pytest
+
+import batch_generation
+from batch_generation import generate_batch, parse_batch_response
+from generation_cache import GenerationCache
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('[{"id": 0, "reply": "a"}, {"id": 1, "reply": "b"}]', ["a", "b"]),
+    # Order in the array doesn't matter, the ids do
+    ('[{"id": 1, "reply": "b"}, {"id": 0, "reply": " a "}]', ["a", "b"]),
+    ('```json\n[{"id": 0, "reply": "a"}, {"id": 1, "reply": "b"}]\n```', ["a", "b"]),
+    ('```\n[{"id": 0, "reply": "a"}]\n```', ["a", None]),
+    # Missing id
+    ('[{"id": 1, "reply": "b"}]', [None, "b"]),
+    # Extra and out-of-range ids are ignored
+    ('[{"id": 0, "reply": "a"}, {"id": 1, "reply": "b"}, {"id": 2, "reply": "c"}, {"id": -1, "reply": "d"}]',
+     ["a", "b"]),
+    # Duplicate id: neither answer can be trusted
+    ('[{"id": 0, "reply": "a"}, {"id": 0, "reply": "a2"}, {"id": 1, "reply": "b"}]', [None, "b"]),
+    # Ids must be integers (no strings, floats or booleans)
+    ('[{"id": "0", "reply": "a"}, {"id": 1.0, "reply": "b"}]', [None, None]),
+    ('[{"id": true, "reply": "b"}]', [None, None]),
+    ('[{"id": 0, "reply": ""}, {"id": 1, "reply": 5}]', [None, None]),
+    ('[{"id": 0}, "b", null]', [None, None]),
+    ('{"id": 0, "reply": "a"}', [None, None]),
+    ("Sure! Here are your replies: a, b", [None, None]),
+    ("", [None, None]),
+    (None, [None, None]),
+])
+def test_parse_batch_response(raw, expected):
+    assert parse_batch_response(raw, 2) == expected
+
+
+class FakeLLM:
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    async def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    cache = GenerationCache(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(batch_generation, "get_generation_cache", lambda: cache)
+
+    def use(response):
+        client = FakeLLM(response)
+        monkeypatch.setattr(batch_generation, "get_llm_client", lambda: client)
+        return client
+    yield use
+    cache.close()
+
+
+def run_batch(texts):
+    fallback_calls = []
+
+    async def generate_one(text):
+        fallback_calls.append(text)
+        return f"single: {text}"
+
+    replies = asyncio.run(generate_batch(texts, "Reply nicely.", "m", generate_one, "v1"))
+    return replies, fallback_calls
+
+
+def test_missing_items_fall_back_to_generate_one(llm):
+    client = llm(json.dumps([{"id": 0, "reply": "batch 0"}, {"id": 2, "reply": "batch 2"}]))
+    replies, fallback_calls = run_batch(["t0", "t1", "t2"])
+    assert replies == ["batch 0", "single: t1", "batch 2"]
+    assert fallback_calls == ["t1"]
+    assert len(client.prompts) == 1
+
+
+def test_unparseable_batch_falls_back_for_every_item(llm):
+    llm("not json at all")
+    replies, fallback_calls = run_batch(["t0", "t1"])
+    assert replies == ["single: t0", "single: t1"]
+    assert fallback_calls == ["t0", "t1"]
+
+
+def test_batch_error_falls_back_for_every_item(llm):
+    llm(RuntimeError("quota"))
+    assert run_batch(["t0", "t1"])[0] == ["single: t0", "single: t1"]
+
+
+def test_cached_replies_skip_the_batch(llm):
+    llm(json.dumps([{"id": 0, "reply": "first"}, {"id": 1, "reply": "second"}]))
+    run_batch(["t0", "t1"])
+    client = llm("unused")
+    replies, fallback_calls = run_batch(["t0", "t1"])
+    assert replies == ["first", "second"]
+    assert client.prompts == [] and fallback_calls == []
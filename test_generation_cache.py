@@ -0,0 +1,96 @@
+"""Tests for the persistent LRU/TTL generation cache and its keys"""
+import pytest
+
+import generation_cache
+from generation_cache import GenerationCache, cache_key, normalize_text
+
+
+class Clock:
+    def __init__(self, now=1_800_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(generation_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = GenerationCache(str(tmp_path / "cache.db"), **kwargs)
+        caches.append(cache)
+        return cache
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+@pytest.mark.parametrize("a, b", [
+    ("gm  web3\nfrens", "gm web3 frens"),
+    ("  gm web3 ", "gm web3"),
+    ("GM Web3", "gm web3"),
+    ("ｇｍ　ｗｅｂ３", "gm web3"),  # full-width forms fold under NFKC
+])
+def test_equivalent_texts_share_a_key(a, b):
+    assert cache_key(a, "v1", "m") == cache_key(b, "v1", "m")
+
+
+@pytest.mark.parametrize("changed", [
+    dict(text="gm web4"),
+    dict(template_version="v2"),
+    dict(model="other-model"),
+    dict(generation_config={"temperature": 0.5}),
+])
+def test_key_changes_with_text_prompt_version_model_and_config(changed):
+    base = dict(text="gm web3", template_version="v1", model="m", generation_config={"temperature": 0.9})
+    assert cache_key(**{**base, **changed}) != cache_key(**base)
+
+
+def test_config_key_order_does_not_matter():
+    assert (cache_key("x", "v1", "m", {"top_p": 1, "temperature": 0.9})
+            == cache_key("x", "v1", "m", {"temperature": 0.9, "top_p": 1}))
+
+
+def test_normalize_text():
+    assert normalize_text(None) == ""
+    assert normalize_text(" a\t\tb \n") == "a b"
+
+
+def test_entries_expire_after_ttl(clock, make_cache):
+    cache = make_cache(ttl=60)
+    cache.put("k", "reply")
+    clock.now += 59
+    assert cache.get("k") == "reply"
+    # A hit refreshes the LRU position, not the age
+    clock.now += 2
+    assert cache.get("k") is None
+    # Expired rows are deleted by the next put
+    cache.put("other", "x")
+    assert cache.stats()["entries"] == 1 and cache.stats()["evictions"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_past_the_cap(clock, make_cache):
+    cache = make_cache(max_entries=2)
+    cache.put("a", "1")
+    clock.now += 1
+    cache.put("b", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"
+    clock.now += 1
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+    assert cache.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75, "evictions": 1, "entries": 2}
+
+
+def test_entries_persist_across_instances(clock, make_cache):
+    make_cache().put("k", "reply")
+    assert make_cache().get("k") == "reply"
@@ -0,0 +1,73 @@
+"""Import-time budget for the entry-point modules, measured with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter (in an empty working directory,
+without GEMINI_API_KEY) and must load within IMPORT_BUDGET_MS, without pulling
+in Playwright or aiohttp and without configuring logging or creating files.
+"""
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+# Modules the entry points import at load time must be installed
+pytest.importorskip("dotenv")
+pytest.importorskip("psutil")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative import time allowed per entry point, in milliseconds
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "300"))
+
+# Only imported once a browser starts or an LLM request is made
+HEAVY_MODULES = ("playwright", "aiohttp", "google.generativeai")
+
+ENTRY_POINTS = ("main", "replier", "traffic_replay", "twitter_client", "llm_client", "scraper")
+
+
+def import_profile(module, cwd):
+    """Import a module in a fresh interpreter; returns (import times in ms by module, probe)"""
+    probe = ("import sys, json, logging; "
+             f"import {module}; "
+             "print(json.dumps({'modules': sorted(sys.modules), "
+             "'handlers': len(logging.getLogger().handlers)}))")
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                            cwd=cwd, env=env, capture_output=True, text=True, timeout=60)
+    times = {}
+    errors = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            times[parts[2].strip()] = int(parts[1]) / 1000
+        except (IndexError, ValueError):
+            continue  # header line
+    assert result.returncode == 0, "\n".join(errors[-20:])
+    return times, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_imports_fast(module, tmp_path):
+    times, probe = import_profile(module, tmp_path)
+
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    print(f"\n{module}: {times[module]:.1f} ms cumulative; slowest: "
+          + ", ".join(f"{name} {ms:.1f}" for name, ms in slowest))
+
+    loaded = [name for name in probe["modules"]
+              if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)]
+    assert not loaded, f"importing {module} loaded {loaded}"
+    assert times[module] <= IMPORT_BUDGET_MS, f"importing {module} took {times[module]:.1f} ms"
+
+
+@pytest.mark.parametrize("module", ("main", "replier"))
+def test_import_has_no_side_effects(module, tmp_path):
+    _, probe = import_profile(module, tmp_path)
+    assert probe["handlers"] == 0, f"importing {module} configured logging"
+    assert os.listdir(tmp_path) == [], f"importing {module} created {os.listdir(tmp_path)}"
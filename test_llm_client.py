@@ -0,0 +1,134 @@
+"""Tests for the LLM circuit breaker and model fallback"""
+import asyncio
+
+import pytest
+
+from llm_client import (CircuitBreaker, CircuitOpenError, LLMConfigError, LLMError, LLMProvider,
+                        LLMRetryableError)
+
+
+class FakeClient:
+    """Stands in for AsyncGeminiClient; ``outcomes`` maps model -> list of results or exceptions"""
+    prompt_tokens = output_tokens = 0
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+
+    async def generate(self, prompt, model=None, **kwargs):
+        self.calls.append(model)
+        outcome = self.outcomes[model].pop(0)
+        if outcome == "hang":
+            await asyncio.sleep(3600)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    async def close(self):
+        pass
+
+
+def expire(breaker):
+    """Pretend the breaker's reset period has passed"""
+    breaker.opened_at -= breaker.reset_seconds
+
+
+async def cancel_call(provider):
+    """Start a generate call that hangs, then cancel it the way a shutting-down pipeline does"""
+    task = asyncio.create_task(provider.generate("p", model="m"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def provider_with(outcomes, threshold=2):
+    provider = LLMProvider(client=FakeClient(outcomes), fallback_models=[], max_retries=0)
+    provider.breakers["m"] = CircuitBreaker(failure_threshold=threshold, reset_seconds=60)
+    return provider
+
+
+def test_breaker_opens_then_half_open_trial_closes_it():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    expire(breaker)
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    # Only one trial call at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    expire(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+
+def test_provider_recovers_through_half_open():
+    provider = provider_with({"m": [LLMRetryableError("503"), LLMRetryableError("503"), "ok"]})
+    for _ in range(2):
+        with pytest.raises(LLMRetryableError):
+            asyncio.run(provider.generate("p", model="m"))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(provider.generate("p", model="m"))
+    assert provider.client.calls == ["m", "m"]
+
+    expire(provider.breakers["m"])
+    assert asyncio.run(provider.generate("p", model="m")) == "ok"
+    assert provider.breakers["m"].state == "closed"
+
+
+def test_cancelled_trial_does_not_wedge_the_breaker():
+    provider = provider_with({"m": [LLMRetryableError("503"), LLMRetryableError("503"), "hang", "ok"]})
+    for _ in range(2):
+        with pytest.raises(LLMRetryableError):
+            asyncio.run(provider.generate("p", model="m"))
+    breaker = provider.breakers["m"]
+    expire(breaker)
+
+    asyncio.run(cancel_call(provider))
+    # Cancellation is no verdict on the model: still half-open, and the next call is the trial
+    assert breaker.failures == 2 and breaker.state == "half-open"
+    assert asyncio.run(provider.generate("p", model="m")) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_cancelled_calls_do_not_open_the_breaker():
+    provider = provider_with({"m": ["hang"] * 5 + ["ok"]}, threshold=2)
+    for _ in range(5):
+        asyncio.run(cancel_call(provider))
+    assert provider.breakers["m"].failures == 0
+    assert provider.breakers["m"].state == "closed"
+    assert asyncio.run(provider.generate("p", model="m")) == "ok"
+
+
+@pytest.mark.parametrize("error", [LLMConfigError("no key"), ValueError("bad json")])
+def test_trial_flag_is_cleared_on_other_errors(error):
+    provider = provider_with({"m": [error, "ok"]}, threshold=1)
+    breaker = provider.breakers["m"]
+    breaker.record_failure()
+    expire(breaker)
+    with pytest.raises(type(error)):
+        asyncio.run(provider.generate("p", model="m"))
+    if breaker.state == "open":
+        expire(breaker)
+    assert asyncio.run(provider.generate("p", model="m")) == "ok"
+
+
+def test_non_retryable_errors_do_not_open_the_breaker():
+    provider = provider_with({"m": [LLMError("400 bad request")] * 5}, threshold=2)
+    for _ in range(5):
+        with pytest.raises(LLMError) as raised:
+            asyncio.run(provider.generate("p", model="m"))
+        assert not isinstance(raised.value, CircuitOpenError)
+    assert provider.breakers["m"].state == "closed"
+    assert len(provider.client.calls) == 5
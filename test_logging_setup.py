@@ -0,0 +1,91 @@
+"""Tests for the queue-based, rotating logging pipeline"""
+import json
+import time
+import asyncio
+import logging
+
+import pytest
+
+import logging_setup
+from logging_setup import setup_logging, shutdown_logging, log_cycle, RotatingLogHandler
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    root.handlers = []
+    path = tmp_path / "bot.log"
+    yield path
+    shutdown_logging()
+    root.handlers, root.level = saved_handlers, saved_level
+
+
+def read_json_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_json_lines_carry_the_cycle_id_across_tasks(pipeline):
+    setup_logging(log_file=str(pipeline), fmt="json", capture_print=False)
+    log = logging.getLogger("bot.test")
+
+    async def stage():
+        log.info("from a stage task")
+
+    async def cycle():
+        with log_cycle("check") as cycle_id:
+            log.info("cycle started")
+            await asyncio.create_task(stage())
+        log.info("between cycles")
+        return cycle_id
+
+    cycle_id = asyncio.run(cycle())
+    shutdown_logging()
+
+    entries = read_json_lines(pipeline)
+    assert [e["msg"] for e in entries] == ["cycle started", "from a stage task", "between cycles"]
+    assert cycle_id.startswith("check-")
+    assert [e.get("cycle") for e in entries] == [cycle_id, cycle_id, None]
+    assert entries[0]["logger"] == "bot.test" and entries[0]["level"] == "INFO"
+
+
+def test_print_is_routed_into_the_log(pipeline, capsys):
+    setup_logging(log_file=str(pipeline), capture_print=True)
+    print("stray print output")
+    shutdown_logging()
+
+    assert "print - INFO - stray print output" in pipeline.read_text()
+    assert capsys.readouterr().out == ""
+
+
+def test_logging_does_not_wait_for_slow_writes(pipeline, monkeypatch):
+    setup_logging(log_file=str(pipeline), capture_print=False)
+    listener = logging_setup._pipeline[0]
+    slow = listener.handlers[-1]
+    original_emit = slow.emit
+    monkeypatch.setattr(slow, "emit", lambda record: (time.sleep(0.05), original_emit(record)))
+
+    started = time.perf_counter()
+    for i in range(20):
+        logging.getLogger("bot.test").info(f"record {i}")
+    assert time.perf_counter() - started < 0.05
+
+    shutdown_logging()
+    assert pipeline.read_text().count("record ") == 20
+
+
+def test_rotates_by_size_and_by_age(tmp_path):
+    record = logging.LogRecord("bot", logging.INFO, __file__, 1, "x" * 100, None, None)
+
+    by_size = RotatingLogHandler(str(tmp_path / "size.log"), max_bytes=1000, max_age=0, backup_count=2)
+    for _ in range(30):
+        by_size.emit(record)
+    by_size.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["size.log", "size.log.1", "size.log.2"]
+
+    by_age = RotatingLogHandler(str(tmp_path / "age.log"), max_bytes=0, max_age=0.05, backup_count=2)
+    by_age.emit(record)
+    time.sleep(0.06)
+    by_age.emit(record)
+    by_age.close()
+    assert (tmp_path / "age.log.1").exists()
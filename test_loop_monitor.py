@@ -0,0 +1,52 @@
+"""Tests for the event-loop blocking detector"""
+import json
+import time
+import asyncio
+
+from loop_monitor import LoopMonitor, monitor_event_loop
+
+
+def blocking_helper():
+    time.sleep(0.3)
+
+
+async def scenario(monitor):
+    monitor.start()
+    await asyncio.sleep(0.1)
+    blocking_helper()
+    await asyncio.sleep(0.1)
+    return await monitor.stop()
+
+
+def test_blocking_call_is_reported_with_its_stack(tmp_path):
+    path = tmp_path / "loop_report.json"
+    monitor = LoopMonitor(threshold=0.1, interval=0.01, report_path=str(path))
+    report = asyncio.run(scenario(monitor))
+
+    assert report["blocks"] == 1
+    spot = report["hot_spots"][0]
+    assert spot["where"][-1].startswith("test_loop_monitor.py:") and spot["where"][-1].endswith("blocking_helper")
+    assert 200 <= spot["max_ms"] <= 1000
+    assert report["lag_ms"]["max"] >= 200
+    assert json.loads(path.read_text())["blocks"] == 1
+
+
+def test_non_blocking_code_reports_nothing(tmp_path):
+    async def idle():
+        monitor = LoopMonitor(threshold=0.1, interval=0.01, report_path=str(tmp_path / "report.json"))
+        monitor.start()
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+        return await monitor.stop()
+
+    report = asyncio.run(idle())
+    assert report["blocks"] == 0
+    assert report["lag_ms"]["samples"] > 0
+
+
+def test_disabled_by_default():
+    async def run():
+        async with monitor_event_loop(enabled=False) as monitor:
+            return monitor
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,116 @@
+"""Tests for the Prometheus metrics and the /metrics and /healthz endpoints"""
+import json
+import time
+import asyncio
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import metrics
+from metrics import Counter, Gauge, Histogram, MetricsHandler, render_metrics
+
+
+def test_counter_and_gauge_render_with_labels():
+    counter = Counter("test_events_total", "Events", ["kind"])
+    counter.inc(kind="a")
+    counter.inc(2, kind='quote"d')
+    gauge = Gauge("test_level", "Level")
+    gauge.set_function(lambda: 1.5)
+
+    text = render_metrics()
+    assert "# TYPE test_events_total counter" in text
+    assert 'test_events_total{kind="a"} 1' in text
+    assert 'test_events_total{kind="quote\\"d"} 2' in text
+    assert "test_level 1.5" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_latency_seconds", "Latency", ["op"], buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, op="x")
+
+    lines = histogram.render()
+    assert 'test_latency_seconds_bucket{op="x",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{op="x",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{op="x",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{op="x"} 4' in lines
+    assert histogram.count(op="x") == 4
+
+
+def test_concurrent_increments_are_not_lost():
+    counter = Counter("test_concurrent_total", "Concurrent increments")
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value() == 80000
+
+
+class FakeSession:
+    def __init__(self, alive):
+        self.alive = alive
+
+    async def is_alive(self):
+        return self.alive
+
+
+@pytest.fixture
+def health_server(monkeypatch):
+    monkeypatch.setattr(metrics, "health", metrics.Health())
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+async def run_monitor(session, seconds=0.05):
+    task = asyncio.create_task(metrics.health_monitor(session, interval=0.01))
+    await asyncio.sleep(seconds)
+    task.cancel()
+
+
+def test_healthz_reflects_loop_and_browser(health_server, monkeypatch):
+    status, body = get(health_server + "/healthz")
+    assert status == 503 and json.loads(body)["event_loop"]["ok"] is False
+
+    asyncio.run(run_monitor(FakeSession(alive=True)))
+    status, body = get(health_server + "/healthz")
+    assert status == 200 and json.loads(body)["healthy"] is True
+
+    asyncio.run(run_monitor(FakeSession(alive=False)))
+    status, body = get(health_server + "/healthz")
+    assert status == 503 and json.loads(body)["browser"]["ok"] is False
+
+    # A loop that stops beating is reported as stalled
+    monkeypatch.setattr(metrics, "HEALTH_LOOP_STALL_SECONDS", 0.01)
+    metrics.health.set_browser_alive(True)
+    time.sleep(0.05)
+    status, body = get(health_server + "/healthz")
+    assert status == 503 and json.loads(body)["event_loop"]["ok"] is False
+
+
+def test_metrics_endpoint_serves_text_format(health_server):
+    metrics.REPLIES.inc(result="success")
+    status, body = get(health_server + "/metrics")
+    assert status == 200
+    assert "# TYPE bot_replies_total counter" in body
+    assert 'bot_replies_total{result="success"}' in body
+    assert get(health_server + "/")[1] == "Twitter bot active"
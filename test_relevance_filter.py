@@ -0,0 +1,76 @@
+"""Tests for the keyword relevance filter that gates LLM calls"""
+import pytest
+
+from relevance_filter import CASHTAG_WEIGHT, PROJECT_WEIGHT, TOPIC_WEIGHT, RelevanceFilter
+from tweet_record import Tweet
+
+
+@pytest.mark.parametrize("text, score, entities", [
+    ("Monad mainnet is close", PROJECT_WEIGHT + TOPIC_WEIGHT, ["Monad", "mainnet"]),
+    ("Thoughts on #Monad today?", PROJECT_WEIGHT, ["Monad"]),
+    ("Humanity Protocol and Camp  Network ship", 2 * PROJECT_WEIGHT, ["Camp Network", "Humanity Protocol"]),
+    ("rollups, ROLLUPS and more Rollups", TOPIC_WEIGHT, ["rollups"]),
+    ("Ethereum L2 sequencer", 3 * TOPIC_WEIGHT, ["Ethereum", "L2", "sequencer"]),
+    # A cashtag is not the topic keyword it spells
+    ("Bought some $ETH and $ETH again", CASHTAG_WEIGHT, ["$ETH"]),
+    ("$PENGU and Pengu", CASHTAG_WEIGHT + PROJECT_WEIGHT, ["PENGU", "$PENGU"]),
+    # Everyday words only count as project names when capitalised
+    ("see you soon, the story is near", 0.0, []),
+    ("Story and Near are live", 2 * PROJECT_WEIGHT, ["Near", "Story"]),
+    # Word boundaries: no partial matches
+    ("L2s tokenized ethereal bridges", 0.0, []),
+])
+def test_keyword_weights(text, score, entities):
+    assert RelevanceFilter().score(text) == (pytest.approx(score), entities)
+
+
+@pytest.mark.parametrize("text, lang, reason", [
+    ("", None, "empty"),
+    (None, None, "empty"),
+    ("https://t.co/abc @someone", None, "empty"),
+    ("🚀🚀🚀 !!!", None, "empty"),
+    ("Monad mainnet est proche", "fr", "non_english"),
+    ("Монад скоро выйдет в мейннет", None, "non_english"),
+    ("モナドのメインネット Monad", None, "non_english"),
+    ("Good morning everyone, coffee time", None, "off_topic"),
+    ("Monad mainnet is close", "und", None),
+    ("Monad mainnet is close", "en", None),
+])
+def test_rejection_reasons(text, lang, reason):
+    result = RelevanceFilter().check(text, tweet_id=1, lang=lang)
+    assert result["reason"] == reason
+    assert result["relevant"] is (reason is None)
+
+
+def test_duplicates_are_rejected_but_retries_pass():
+    relevance = RelevanceFilter()
+    first = "Monad mainnet is close https://t.co/a"
+    assert relevance.check(first, tweet_id=1)["relevant"]
+    # Same tweet seen again (e.g. the next cycle): not a duplicate
+    assert relevance.check(first, tweet_id=1)["relevant"]
+    # Same text from another tweet, modulo links, mentions, case and spacing
+    copy = relevance.check("@bob   MONAD mainnet is close https://t.co/b", tweet_id=2)
+    assert copy == {"relevant": False, "score": 0.0, "entities": [], "reason": "duplicate"}
+
+
+def test_dedup_memory_is_bounded():
+    relevance = RelevanceFilter(dedup_size=2)
+    for i, text in enumerate(["Monad one", "Monad two", "Monad three"]):
+        relevance.check(text, tweet_id=i)
+    # The oldest text was forgotten, so its copy is let through
+    assert relevance.check("Monad one", tweet_id=10)["relevant"]
+    assert relevance.check("Monad three", tweet_id=11)["reason"] == "duplicate"
+
+
+def test_threshold_and_stats():
+    relevance = RelevanceFilter(threshold=2)
+    tweets = [Tweet(id=1, text="Some rollup news", url=""), Tweet(id=2, text="Sei rollup news", url=""),
+              Tweet(id=3, text="", url=""), Tweet(id=4, text="Sei rollup news", url="")]
+    assert [relevance.check_tweet(t)["relevant"] for t in tweets] == [False, True, False, False]
+    assert relevance.stats() == {"checked": 4, "passed": 1, "saved_calls": 3,
+                                 "rejected": {"off_topic": 1, "empty": 1, "duplicate": 1}}
+    relevance.log_and_reset()
+    assert relevance.stats()["checked"] == 0
+
+    # Threshold 0 lets any non-empty, unique English tweet through
+    assert RelevanceFilter(threshold=0).check("Good morning", tweet_id=1)["relevant"]
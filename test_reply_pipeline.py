@@ -0,0 +1,192 @@
+"""Offline tests for the discover -> generate -> post reply pipeline"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+import reply_pipeline
+from reply_pipeline import ReplyPipeline, advance_cursor
+from twitter_client import BrowseError
+from state_store import StateStore
+from tweet_record import Tweet
+
+
+def tweet(tweet_id, account="alice"):
+    return Tweet(id=tweet_id, text=f"Tweet {tweet_id} about rollups", url=f"https://x.com/{account}/status/{tweet_id}")
+
+
+class CountingStore(StateStore):
+    def __init__(self, path):
+        super().__init__(path)
+        self.marked = []
+
+    def mark_replied(self, tweet_url, replied_at=None):
+        self.marked.append(tweet_url)
+        super().mark_replied(tweet_url, replied_at)
+
+
+class FakeSession:
+    def __init__(self):
+        self.leased = 0
+
+    @asynccontextmanager
+    async def lease(self, name="main"):
+        self.leased += 1
+        try:
+            yield name
+        finally:
+            self.leased -= 1
+
+
+class FakeGovernor:
+    def __init__(self, error=None):
+        self.error = error
+
+    async def check(self):
+        if self.error:
+            raise self.error
+
+
+class AcceptAll:
+    def check_tweet(self, tweet):
+        return {"relevant": True}
+
+    def stats(self):
+        return {}
+
+    def log_and_reset(self):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = CountingStore(str(tmp_path / "state.db"))
+    session = FakeSession()
+    monkeypatch.setattr(reply_pipeline, "get_state_store", lambda: store)
+    monkeypatch.setattr(reply_pipeline, "get_browser_session", lambda: session)
+    monkeypatch.setattr(reply_pipeline, "get_resource_governor", FakeGovernor)
+    monkeypatch.setattr(reply_pipeline, "get_relevance_filter", AcceptAll)
+
+    async def no_delay(*args):
+        pass
+    monkeypatch.setattr(reply_pipeline, "human_like_delay", no_delay)
+    yield store
+    store.close()
+
+
+def stub_site(monkeypatch, timelines, failing_posts=(), posted=None):
+    """Serve ``timelines`` (account -> tweets) and record posted replies"""
+    posted = [] if posted is None else posted
+
+    async def browse(page, account, limit=1, since_id=None, raise_errors=False):
+        if isinstance(timelines[account], Exception):
+            raise timelines[account]
+        return [t for t in timelines[account] if since_id is None or t.id > since_id][:limit]
+
+    async def post(page, tweet_url, reply_text):
+        posted.append((tweet_url, reply_text))
+        return tweet_url not in failing_posts
+
+    monkeypatch.setattr(reply_pipeline, "browse_tweets_v2", browse)
+    monkeypatch.setattr(reply_pipeline, "reply_to_tweet", post)
+    return posted
+
+
+async def echo(text):
+    return f"Reply to: {text}"
+
+
+def pipeline(accounts, **kwargs):
+    kwargs.setdefault("generate", echo)
+    kwargs.setdefault("select", lambda account, tweets: tweets)
+    return ReplyPipeline(accounts, limit=10, generators=2, **kwargs)
+
+
+def test_advance_cursor_stays_below_oldest_failure(store):
+    tweets = [tweet(105), tweet(104), tweet(103), tweet(102)]
+    advance_cursor(store, "alice", tweets, failed_tweets=[tweet(104), tweet(103)])
+    assert store.get_cursor("alice") == 102
+    # Forward only: a later cycle with nothing new doesn't move it back
+    advance_cursor(store, "alice", [tweet(100)])
+    assert store.get_cursor("alice") == 102
+    advance_cursor(store, "alice", tweets)
+    assert store.get_cursor("alice") == 105
+
+
+def test_cycle_replies_once_and_retries_failed_tweet_next_cycle(store, monkeypatch):
+    timelines = {"alice": [tweet(13), tweet(12), tweet(11)], "bob": [tweet(21, "bob")]}
+    failing = {timelines["alice"][1].url}
+    posted = stub_site(monkeypatch, timelines, failing_posts=failing)
+
+    stats = asyncio.run(pipeline(["alice", "bob"]).run())
+    assert stats["post"]["items"] == 4
+    assert sorted(store.marked) == sorted(t.url for t in timelines["alice"] + timelines["bob"] if t.url not in failing)
+    assert len(set(store.marked)) == len(store.marked)
+    assert store.get_cursor("alice") == 11
+    assert store.get_cursor("bob") == 21
+
+    # Next cycle only sees tweets above the cursor: the failed one and the one after it
+    posted.clear()
+    failing.clear()
+    asyncio.run(pipeline(["alice", "bob"]).run())
+    assert [url for url, _ in posted] == [timelines["alice"][0].url, timelines["alice"][1].url]
+    assert store.get_cursor("alice") == 13
+    assert store.marked.count(timelines["alice"][1].url) == 1
+
+
+def test_failed_generation_holds_cursor(store, monkeypatch):
+    timelines = {"alice": [tweet(32), tweet(31)]}
+    posted = stub_site(monkeypatch, timelines)
+
+    async def generate(text):
+        if "31" in text:
+            raise RuntimeError("LLM down")
+        return "ok"
+
+    asyncio.run(pipeline(["alice"], generate=generate).run())
+    assert [url for url, _ in posted] == [timelines["alice"][0].url]
+    assert store.get_cursor("alice") == 30
+
+
+def test_stage_error_shuts_down_all_stages(store, monkeypatch):
+    stub_site(monkeypatch, {"alice": [tweet(41)]})
+    monkeypatch.setattr(reply_pipeline, "get_resource_governor", lambda: FakeGovernor(RuntimeError("governor broke")))
+
+    async def main():
+        with pytest.raises(RuntimeError, match="governor broke"):
+            await pipeline(["alice"]).run()
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+    assert reply_pipeline.get_browser_session().leased == 0
+
+
+def test_post_stage_error_propagates_without_leaking_tasks(store, monkeypatch):
+    stub_site(monkeypatch, {"alice": [tweet(52), tweet(51)]})
+
+    def broken_mark(tweet_url, replied_at=None):
+        raise OSError("disk full")
+    monkeypatch.setattr(store, "mark_replied", broken_mark)
+
+    async def main():
+        with pytest.raises(OSError, match="disk full"):
+            await pipeline(["alice"]).run()
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+    assert store.get_cursor("alice") is None
+
+
+def test_failed_load_is_not_observed_as_silence(store, monkeypatch):
+    timelines = {"alice": BrowseError("Timeout waiting for tweets from alice"),
+                 "bob": [tweet(21, "bob")], "carol": []}
+    posted = stub_site(monkeypatch, timelines)
+    store.set_cursor("alice", 10)
+    observed = []
+
+    asyncio.run(pipeline(["alice", "bob", "carol"],
+                         observe=lambda account, tweets: observed.append((account, len(tweets)))).run())
+    # The quiet account is reported, the one whose page failed is not
+    assert observed == [("bob", 1), ("carol", 0)]
+    assert store.get_cursor("alice") == 10
+    assert [url for url, _ in posted] == [timelines["bob"][0].url]
@@ -47,16 +47,16 @@ async def reply_to_latest_tweet(account, browser, page):
 
         latest_tweet = tweets[0]
         try:
-            logger.info(f"Navigating to latest tweet URL: {latest_tweet['url']}")
-            await page.goto(latest_tweet['url'])
+            logger.info(f"Navigating to latest tweet URL: {latest_tweet.url}")
+            await page.goto(latest_tweet.url)
             await human_like_delay(3000, 5000)
 
             # Generate reply
-            reply_text = generate_reply(latest_tweet['text'])
+            reply_text = await generate_reply(latest_tweet.text)
             logger.info(f"Generated reply: {reply_text[:50]}...")
 
             # Post reply
-            success = await reply_to_tweet(page, latest_tweet['url'], reply_text)
+            success = await reply_to_tweet(page, latest_tweet.url, reply_text)
             if success:
                 logger.info(f"Successfully replied to tweet from {account}")
             else:
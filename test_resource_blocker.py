@@ -0,0 +1,97 @@
+"""Tests for the request blocklist and allowlist applied to browser contexts"""
+import asyncio
+
+import pytest
+
+from resource_blocker import DEFAULT_ESTIMATED_BYTES, ESTIMATED_BYTES_PER_TYPE, ResourceBlocker
+
+
+@pytest.mark.parametrize("url, resource_type, blocked", [
+    # Page, API and script traffic the bot depends on
+    ("https://x.com/home", "document", False),
+    ("https://x.com/i/api/graphql/AbC/UserTweets?variables=%7B%7D", "xhr", False),
+    ("https://x.com/i/api/graphql/AbC/CreateTweet", "fetch", False),
+    ("https://api.x.com/1.1/onboarding/task.json?flow_name=login", "xhr", False),
+    ("https://api.twitter.com/graphql/AbC/TweetDetail", "fetch", False),
+    ("https://abs.twimg.com/responsive-web/client-web/main.8a1b2c3d.js", "script", False),
+    ("https://abs.twimg.com/responsive-web/client-web/main.8a1b2c3d.css", "stylesheet", False),
+    ("https://x.com/i/api/2/badge_count/badge_count.json", "xhr", False),
+    # Media, fonts and images by resource type
+    ("https://pbs.twimg.com/media/abc.jpg?name=small", "image", True),
+    ("https://abs.twimg.com/emoji/v2/svg/1f680.svg", "image", True),
+    ("https://abs.twimg.com/fonts/chirp-regular-web.woff2", "font", True),
+    ("https://video.twimg.com/ext_tw_video/1/pu/vid/avc1/720x1280/a.mp4", "media", True),
+    # Trackers and heavy assets by URL, whatever the type
+    ("https://www.google-analytics.com/collect?v=1", "xhr", True),
+    ("https://www.googletagmanager.com/gtm.js?id=GTM-1", "script", True),
+    ("https://static.ads-twitter.com/uwt.js", "script", True),
+    ("https://ads-api.x.com/12/measurement", "fetch", True),
+    ("https://x.com/i/api/1.1/jot/client_event.json", "xhr", True),
+    ("https://twitter.com/i/jot", "ping", True),
+    ("https://video.twimg.com/amplify_video/1/vid/a.m3u8", "xhr", True),
+    ("https://pbs.twimg.com/profile_images/1/avatar_normal.jpg", "fetch", True),
+    ("https://pbs.twimg.com/card_img/1/abc?format=jpg", "other", True),
+])
+def test_default_rules(url, resource_type, blocked):
+    assert ResourceBlocker().should_block(url, resource_type) is blocked
+
+
+@pytest.mark.parametrize("url, resource_type", [
+    # The login flow and captcha challenges load images and scripts that must not be cut off
+    ("https://x.com/i/flow/login", "document"),
+    ("https://x.com/i/flow/login/challenge.png", "image"),
+    ("https://api.x.com/1.1/onboarding/sso_init.json", "xhr"),
+    ("https://client-api.arkoselabs.com/fc/gc/?token=1", "image"),
+    ("https://iframe.arkoselabs.com/funcaptcha/enforcement.js", "script"),
+    ("https://www.google.com/recaptcha/api2/payload?p=1", "image"),
+    ("https://x.com/account/access", "font"),
+    ("https://x.com/i/api/graphql/AbC/CreateTweet", "image"),
+])
+def test_allowlist_wins_over_type_and_url_rules(url, resource_type):
+    assert ResourceBlocker().should_block(url, resource_type) is False
+
+
+def test_custom_rules_replace_the_defaults():
+    blocker = ResourceBlocker(resource_types=["stylesheet"], url_patterns=[r"example\.com"], allow_patterns=[])
+    assert blocker.should_block("https://x.com/a.css", "stylesheet")
+    assert not blocker.should_block("https://pbs.twimg.com/media/a.jpg", "image")
+    assert blocker.should_block("https://example.com/i/flow/x", "xhr")
+    assert not ResourceBlocker(resource_types=[], url_patterns=[]).should_block("https://x.com/a.jpg", "image")
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+
+    async def abort(self, reason):
+        self.outcome = reason
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+def test_routes_are_aborted_or_continued_and_counted():
+    blocker = ResourceBlocker()
+    routes = [FakeRoute("https://pbs.twimg.com/media/a.jpg", "image"),
+              FakeRoute("https://x.com/i/api/graphql/AbC/UserTweets", "xhr"),
+              FakeRoute("https://x.com/i/jot", "ping")]
+
+    async def handle():
+        for route in routes:
+            await blocker._handle_route(route)
+    asyncio.run(handle())
+
+    assert [r.outcome for r in routes] == ["blockedbyclient", "continued", "blockedbyclient"]
+    assert blocker.log_and_reset() == {
+        "blocked_requests": 2,
+        "blocked_bytes_estimate": ESTIMATED_BYTES_PER_TYPE["image"] + DEFAULT_ESTIMATED_BYTES,
+        "blocked_by_type": {"image": 1, "ping": 1},
+    }
+    assert blocker.stats()["blocked_requests"] == 0
@@ -0,0 +1,112 @@
+"""Tests for streaming snscrape output, using a fake snscrape process"""
+import os
+import sys
+import json
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("certifi")
+
+import scraper
+
+# Stands in for snscrape: prints the tweets of argv[1] as JSON lines, then
+# sleeps argv[3] seconds; its PID is written to argv[2]/<user>.pid
+FAKE_SNSCRAPE = r"""
+import sys, json, os, time
+user, pid_dir, linger, count, pad = sys.argv[1], sys.argv[2], float(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5])
+with open(os.path.join(pid_dir, user + ".pid"), "w") as f:
+    f.write(str(os.getpid()))
+for i in range(count):
+    tweet = {"id": 1000 + i, "url": f"https://twitter.com/{user}/status/{1000 + i}",
+             "rawContent": f"{user} tweet {i}", "date": "2026-01-01T00:00:00+00:00",
+             "quotedTweet": {"rawContent": "x" * pad}}
+    print(json.dumps(tweet), flush=True)
+time.sleep(linger)
+"""
+
+
+@pytest.fixture
+def fake_snscrape(tmp_path, monkeypatch):
+    """Point the scraper at FAKE_SNSCRAPE; returns a function setting its behaviour"""
+    monkeypatch.setattr(scraper, "_scraper_env", os.environ.copy())
+    behaviour = {"linger": 0, "count": 3, "pad": 0}
+
+    def command(username, limit=10, days=1):
+        return [sys.executable, "-c", FAKE_SNSCRAPE, username.lstrip("@"), str(tmp_path),
+                str(behaviour["linger"]), str(behaviour["count"]), str(behaviour["pad"])]
+    monkeypatch.setattr(scraper, "snscrape_command", command)
+
+    def configure(**kwargs):
+        behaviour.update(kwargs)
+    return configure
+
+
+def pids(directory):
+    return {path.stem: int(path.read_text()) for path in directory.glob("*.pid")}
+
+
+def assert_exited(pid):
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+def test_streams_tweets_including_lines_over_64kib(fake_snscrape):
+    fake_snscrape(pad=200_000)
+    tweets = asyncio.run(scraper.scrape_accounts(["@alice", "@bob"], limit=10))
+    assert [(t.author, t.id) for t in tweets] == [("alice", 1000), ("alice", 1001), ("alice", 1002),
+                                                  ("bob", 1000), ("bob", 1001), ("bob", 1002)]
+    assert tweets[0].text == "alice tweet 0"
+
+
+def test_max_results_kills_running_scrapes(fake_snscrape, tmp_path):
+    fake_snscrape(linger=30, count=2)
+    started = time.monotonic()
+    tweets = asyncio.run(scraper.scrape_accounts(["alice", "bob", "carol"], limit=10, max_results=3, concurrency=2))
+    assert time.monotonic() - started < 10
+    assert len(tweets) == 3
+    running = pids(tmp_path)
+    # The third account never needed a process
+    assert set(running) == {"alice", "bob"}
+    for pid in running.values():
+        assert_exited(pid)
+
+
+def test_per_account_limit_stops_the_process(fake_snscrape, tmp_path):
+    fake_snscrape(linger=30, count=5)
+    tweets = asyncio.run(scraper.scrape_accounts(["alice"], limit=2))
+    assert [t.id for t in tweets] == [1000, 1001]
+    assert_exited(pids(tmp_path)["alice"])
+
+
+def test_cancellation_kills_the_process(fake_snscrape, tmp_path):
+    fake_snscrape(linger=30, count=1)
+
+    async def main():
+        task = asyncio.create_task(scraper.scrape_accounts(["alice"], limit=10))
+        while "alice" not in pids(tmp_path):
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert_exited(pids(tmp_path)["alice"])
+
+
+def test_sync_generator_kills_process_when_closed_early(fake_snscrape, tmp_path):
+    fake_snscrape(linger=30, count=5)
+    tweets = scraper.iter_account_tweets("alice", limit=10)
+    assert next(tweets).id == 1000
+    tweets.close()
+    assert_exited(pids(tmp_path)["alice"])
+
+
+def test_failed_process_falls_back_to_fake_tweets(monkeypatch):
+    monkeypatch.setattr(scraper, "_scraper_env", os.environ.copy())
+    monkeypatch.setattr(scraper, "snscrape_command",
+                        lambda username, limit=10, days=1: [sys.executable, "-c", "import sys; sys.exit(1)"])
+    tweets = asyncio.run(scraper.scrape_accounts(["alice"], limit=2))
+    assert len(tweets) == 2 and all(t.author == "alice" for t in tweets)
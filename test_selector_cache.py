@@ -0,0 +1,135 @@
+"""Tests for raced selector lookups and the learned per-action selector cache"""
+import asyncio
+
+import pytest
+
+import selector_cache
+import twitter_client
+from selector_cache import SelectorCache
+from state_store import StateStore
+
+COMPOSE = ["[data-testid='SideNav_NewTweet_Button']", "[data-testid='tweetButtonInline']", "[href='/compose/tweet']"]
+
+
+class FakeElement:
+    def __init__(self, selector):
+        self.selector = selector
+        self.clicks = 0
+
+    async def click(self):
+        self.clicks += 1
+
+
+class FakePage:
+    """Resolves ':visible' selectors against a set of visible ones; ``later`` appear after a delay (s)"""
+
+    def __init__(self, visible, later=None):
+        self.visible = {s: FakeElement(s) for s in visible}
+        self.later = dict(later or {})
+        self.waits = []
+        self.queries = []
+        self.clock = 0.0
+
+    def _advance(self, seconds):
+        self.clock += seconds
+        for selector, at in list(self.later.items()):
+            if at <= self.clock:
+                self.visible[selector] = FakeElement(selector)
+                del self.later[selector]
+
+    async def wait_for_selector(self, selector, timeout=None):
+        self.waits.append(selector)
+        deadline = self.clock + (timeout or 0) / 1000
+        while True:
+            for candidate in selector.split(", "):
+                element = self.visible.get(candidate.removesuffix(":visible"))
+                if element:
+                    return element
+            if self.clock >= deadline:
+                raise TimeoutError(f"Timeout {timeout}ms exceeded")
+            self._advance(0.05)
+
+    async def query_selector(self, selector):
+        self.queries.append(selector)
+        return self.visible.get(selector.removesuffix(":visible"))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    store = StateStore(str(tmp_path / "state.db"))
+    monkeypatch.setattr(selector_cache, "_cache", SelectorCache(store))
+    yield selector_cache._cache
+    store.close()
+
+
+def test_candidates_are_raced_in_one_wait_and_priority_wins(cache):
+    page = FakePage(visible=[COMPOSE[2], COMPOSE[1]])
+    element, selector = asyncio.run(twitter_client.find_first(page, COMPOSE, timeout=100))
+    assert len(page.waits) == 1
+    assert selector == COMPOSE[1] and element.selector == COMPOSE[1]
+
+
+def test_nothing_visible_is_one_timeout(cache):
+    page = FakePage(visible=[])
+    assert asyncio.run(twitter_client.wait_for_and_click(page, COMPOSE, timeout=100, action="compose_button")) is False
+    assert len(page.waits) == 1 and page.queries == []
+    assert cache.report()["compose_button"] == {"selector": None, "hits": 0, "misses": 1, "hit_rate": 0.0}
+
+
+def test_last_working_selector_is_tried_first_and_persisted(cache, tmp_path):
+    page = FakePage(visible=[COMPOSE[2]])
+    assert asyncio.run(twitter_client.wait_for_and_click(page, COMPOSE, timeout=100, action="compose_button"))
+    assert page.visible[COMPOSE[2]].clicks == 1
+
+    page = FakePage(visible=[COMPOSE[0], COMPOSE[2]])
+    _, selector = asyncio.run(twitter_client.find_first(page, COMPOSE, timeout=100, action="compose_button"))
+    # The cached selector is checked before higher-priority candidates
+    assert selector == COMPOSE[2]
+    assert page.queries == [COMPOSE[2] + ":visible"]
+    assert page.waits[0].startswith(COMPOSE[2])
+
+    reloaded = SelectorCache(StateStore(str(tmp_path / "state.db")))
+    assert reloaded.report()["compose_button"] == {"selector": COMPOSE[2], "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_stale_cached_selector_is_replaced(cache, caplog):
+    asyncio.run(twitter_client.find_first(FakePage(visible=[COMPOSE[2]]), COMPOSE, timeout=100, action="compose_button"))
+    _, selector = asyncio.run(twitter_client.find_first(FakePage(visible=[COMPOSE[0]]), COMPOSE,
+                                                        timeout=100, action="compose_button"))
+    assert selector == COMPOSE[0]
+    assert cache.order("compose_button", COMPOSE)[0] == COMPOSE[0]
+    assert "Selector cache miss for compose_button" in caplog.text
+
+
+NEXT = ["div[role='button']:has-text('Next')", "div[data-testid='LoginForm_Forward_Button']"]
+CATCH_ALL = ["div[role='button']"]
+
+
+def test_catch_all_waits_for_specific_selectors(cache):
+    # Some other button is already on the page; the real one renders a second later
+    page = FakePage(visible=CATCH_ALL, later={NEXT[1]: 1.0})
+    element, selector = asyncio.run(twitter_client.find_first(page, NEXT, timeout=5000, action="login_next",
+                                                              fallbacks=CATCH_ALL))
+    assert selector == NEXT[1] and element.selector == NEXT[1]
+    assert len(page.waits) == 1
+
+
+def test_catch_all_is_used_but_never_cached(cache):
+    page = FakePage(visible=CATCH_ALL)
+    assert asyncio.run(twitter_client.wait_for_and_click(page, NEXT, timeout=500, action="login_next",
+                                                         fallbacks=CATCH_ALL))
+    assert page.visible[CATCH_ALL[0]].clicks == 1
+    # Specific tier first, then the fallback tier
+    assert len(page.waits) == 2 and page.waits[1] == CATCH_ALL[0] + ":visible"
+    assert cache.report()["login_next"] == {"selector": None, "hits": 0, "misses": 1, "hit_rate": 0.0}
+    assert cache.order("login_next", NEXT) == NEXT
+
+
+def test_stale_catch_all_in_cache_is_not_promoted(cache):
+    cache.record("login_next", CATCH_ALL[0])
+    page = FakePage(visible=CATCH_ALL, later={NEXT[0]: 0.5})
+    _, selector = asyncio.run(twitter_client.find_first(page, NEXT, timeout=5000, action="login_next",
+                                                        fallbacks=CATCH_ALL))
+    assert selector == NEXT[0]
+    assert page.waits[0].split(", ") == [f"{s}:visible" for s in NEXT]
+    assert cache.order("login_next", NEXT)[0] == NEXT[0]
@@ -0,0 +1,90 @@
+"""Tests for the SQLite state store: cursors, replies and the legacy JSON import"""
+import json
+import time
+
+import pytest
+
+from state_store import StateStore, tweet_key
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"), legacy_file=str(tmp_path / "replied_tweets.json"))
+    yield store
+    store.close()
+
+
+def test_cursor_only_moves_forward(store):
+    assert store.get_cursor("alice") is None
+    store.set_cursor("alice", 100, "2026-01-01T00:00:00Z")
+    store.set_cursor("alice", 90, "2025-12-31T00:00:00Z")
+    assert store.get_cursor("alice") == 100
+    store.set_cursor("Alice", 120)
+    assert store.get_cursor("ALICE") == 120
+    # Accounts are independent
+    store.set_cursor("bob", 5)
+    assert (store.get_cursor("alice"), store.get_cursor("bob")) == (120, 5)
+
+
+def test_cursor_accepts_string_ids_and_survives_reopen(tmp_path, store):
+    store.set_cursor("alice", "1800000000000000001")
+    store.set_cursor("alice", "999")
+    reopened = StateStore(str(tmp_path / "state.db"), legacy_file=str(tmp_path / "none.json"))
+    assert reopened.get_cursor("alice") == 1800000000000000001
+    reopened.close()
+
+
+def test_replies_are_keyed_by_status_id_and_expire(store):
+    store.mark_replied("https://twitter.com/alice/status/42")
+    assert store.has_replied("https://x.com/alice/status/42?s=20")
+    assert not store.has_replied("https://x.com/alice/status/43")
+
+    store.mark_replied("https://x.com/bob/status/7", replied_at=time.time() - 3600)
+    assert not store.has_replied("https://x.com/bob/status/7", ttl=60)
+    assert store.prune_replied(ttl=60) == 1
+    assert store.has_replied("https://x.com/alice/status/42")
+
+
+def test_legacy_json_is_imported_once_and_renamed(tmp_path):
+    legacy = tmp_path / "replied_tweets.json"
+    now = time.time()
+    legacy.write_text(json.dumps({
+        "https://twitter.com/alice/status/1": now - 60,
+        "https://x.com/bob/status/2": now - 120,
+    }))
+
+    store = StateStore(str(tmp_path / "state.db"), legacy_file=str(legacy))
+    assert store.has_replied("https://x.com/alice/status/1")
+    assert store.has_replied("https://x.com/bob/status/2")
+    assert not legacy.exists()
+    assert (tmp_path / "replied_tweets.json.migrated").exists()
+    store.close()
+
+    # Reopening doesn't import again: the renamed file is no longer read
+    migrated = tmp_path / "replied_tweets.json.migrated"
+    migrated.write_text(json.dumps({"https://x.com/carol/status/3": now}))
+    store = StateStore(str(tmp_path / "state.db"), legacy_file=str(legacy))
+    assert not store.has_replied("https://x.com/carol/status/3")
+    assert store.has_replied("https://x.com/alice/status/1")
+    store.close()
+
+
+def test_unreadable_legacy_file_is_left_in_place(tmp_path):
+    legacy = tmp_path / "replied_tweets.json"
+    legacy.write_text("{not json")
+    store = StateStore(str(tmp_path / "state.db"), legacy_file=str(legacy))
+    assert legacy.exists()
+    # The connection is still usable in autocommit mode
+    store.mark_replied("https://x.com/alice/status/1")
+    assert store.has_replied("https://x.com/alice/status/1")
+    store.close()
+
+
+@pytest.mark.parametrize("url, key", [
+    ("https://x.com/alice/status/123", "123"),
+    ("https://twitter.com/alice/statuses/123?s=20", "123"),
+    ("https://x.com/alice", "https://x.com/alice"),
+    (None, None),
+])
+def test_tweet_key(url, key):
+    assert tweet_key(url) == key
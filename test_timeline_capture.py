@@ -0,0 +1,101 @@
+"""Offline tests for the GraphQL timeline parser"""
+from datetime import datetime, timezone
+
+from timeline_capture import TIMELINE_URL_RE, parse_timeline, parse_tweet_result
+
+CREATED_AT = "Sun Mar 01 12:00:00 +0000 2026"
+NOON = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+def user(screen_name, legacy=True):
+    if legacy:
+        return {"user_results": {"result": {"legacy": {"screen_name": screen_name}}}}
+    return {"user_results": {"result": {"core": {"screen_name": screen_name}}}}
+
+
+def result(tweet_id, text, author="alice", **legacy):
+    return {"__typename": "Tweet", "rest_id": str(tweet_id), "core": user(author),
+            "legacy": {"id_str": str(tweet_id), "full_text": text, "created_at": CREATED_AT, "lang": "en", **legacy}}
+
+
+def item(tweet_result):
+    return {"content": {"itemContent": {"tweet_results": {"result": tweet_result}}}}
+
+
+def timeline(*instructions, key="timeline_v2"):
+    return {"data": {"user": {"result": {key: {"timeline": {"instructions": list(instructions)}}}}}}
+
+
+def add_entries(*entries):
+    return {"type": "TimelineAddEntries", "entries": list(entries)}
+
+
+def test_plain_tweets_in_timeline_order():
+    data = timeline({"type": "TimelineClearCache"}, add_entries(item(result(3, "third")), item(result(2, "second"))))
+    tweets = parse_timeline(data)
+    assert [(t.id, t.text, t.url) for t in tweets] == [(3, "third", "https://x.com/alice/status/3"),
+                                                      (2, "second", "https://x.com/alice/status/2")]
+    assert tweets[0].timestamp == NOON and tweets[0].lang == "en" and tweets[0].author == "alice"
+    assert not tweets[0].is_pinned and not tweets[0].is_retweet and not tweets[0].is_reply
+
+
+def test_pinned_entry_is_flagged():
+    data = timeline({"type": "TimelinePinEntry", "entry": item(result(1, "old pinned"))},
+                    add_entries(item(result(5, "new"))))
+    assert [(t.id, t.is_pinned) for t in parse_timeline(data)] == [(1, True), (5, False)]
+
+
+def test_retweet_takes_text_and_url_from_original():
+    original = result(100, "original text", author="bob", lang="fr")
+    data = timeline(add_entries(item(result(200, "RT @bob: original te…",
+                                            retweeted_status_result={"result": original}))))
+    [tweet] = parse_timeline(data)
+    assert tweet.id == 200 and tweet.is_retweet
+    assert tweet.text == "original text" and tweet.url == "https://x.com/bob/status/100"
+    assert tweet.author == "alice" and tweet.lang == "fr"
+
+
+def test_long_tweet_uses_note_tweet_text():
+    long_result = result(7, "truncated…")
+    long_result["note_tweet"] = {"note_tweet_results": {"result": {"text": "the full long text"}}}
+    assert parse_timeline(timeline(add_entries(item(long_result))))[0].text == "the full long text"
+
+
+def test_visibility_wrapper_and_new_user_shape():
+    inner = result(8, "limited")
+    inner["core"] = user("carol", legacy=False)
+    wrapped = {"__typename": "TweetWithVisibilityResults", "tweet": inner}
+    [tweet] = parse_timeline(timeline(add_entries(item(wrapped)), key="timeline"))
+    assert (tweet.id, tweet.author, tweet.url) == (8, "carol", "https://x.com/carol/status/8")
+
+
+def test_module_items_replies_and_junk_entries():
+    conversation = {"content": {"items": [{"item": {"itemContent": {"tweet_results": {"result": result(10, "q")}}}},
+                                          {"item": {"itemContent": {"tweet_results": {
+                                              "result": result(11, "a", in_reply_to_status_id_str="10")}}}}]}}
+    data = timeline(add_entries(
+        {"content": {"cursorType": "Bottom", "value": "abc"}},
+        item({"__typename": "TweetTombstone"}),
+        item(None),
+        item({"legacy": {"full_text": "no id"}}),
+        conversation,
+    ))
+    tweets = parse_timeline(data)
+    assert [(t.id, t.is_reply) for t in tweets] == [(10, False), (11, True)]
+
+
+def test_unexpected_shapes():
+    assert parse_timeline({}) == []
+    assert parse_timeline({"data": {"user": {"result": {}}}}) == []
+    assert parse_tweet_result("not a dict") is None
+    # A malformed entry is skipped without losing the rest
+    broken = result(12, "x")
+    broken["legacy"]["id_str"] = "not-a-number"
+    assert [t.id for t in parse_timeline(timeline(add_entries(item(broken), item(result(13, "y")))))] == [13]
+
+
+def test_timeline_url_pattern():
+    assert TIMELINE_URL_RE.search("https://x.com/i/api/graphql/AbC123/UserTweets?variables=%7B%7D")
+    assert TIMELINE_URL_RE.search("https://x.com/i/api/graphql/AbC123/UserTweetsAndReplies")
+    assert not TIMELINE_URL_RE.search("https://x.com/i/api/graphql/AbC123/UserTweetsExtra")
+    assert not TIMELINE_URL_RE.search("https://x.com/i/api/graphql/AbC123/HomeTimeline")
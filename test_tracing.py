@@ -0,0 +1,86 @@
+"""Tests for the Chrome-trace span exporter"""
+import json
+import time
+import asyncio
+
+import pytest
+
+import tracing
+from tracing import span, traced, set_track, trace_cycle
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    yield tracing.enable_tracing(str(tmp_path))
+    tracing.enable_tracing(None)
+
+
+@traced()
+async def browse(account):
+    with span("settle"):
+        await asyncio.sleep(0.01)
+    return account
+
+
+async def cycle():
+    async def post_stage():
+        set_track("post")
+        with span("post", account="b"):
+            await asyncio.sleep(0.02)
+
+    with trace_cycle("check", accounts=2):
+        poster = asyncio.create_task(post_stage())
+        for account in ("a", "b"):
+            with span("account", account=account):
+                await browse(account)
+        await poster
+
+
+def load_trace(tmp_path):
+    [path] = tmp_path.glob("check-*.json")
+    return json.loads(path.read_text())["traceEvents"]
+
+
+def test_spans_nest_per_track_and_are_written_per_cycle(tracer, tmp_path):
+    asyncio.run(cycle())
+    events = load_trace(tmp_path)
+
+    tracks = {e["args"]["name"]: e["tid"] for e in events if e["name"] == "thread_name"}
+    spans = [e for e in events if e["ph"] == "X"]
+    by_name = {}
+    for event in spans:
+        by_name.setdefault(event["name"], []).append(event)
+
+    assert set(tracks) == {"main", "post"}
+    assert [e["args"]["account"] for e in by_name["account"]] == ["a", "b"]
+    assert by_name["post"][0]["tid"] == tracks["post"]
+    assert by_name["cycle:check"][0]["args"] == {"accounts": 2}
+
+    # browse_tweets-style spans sit inside their account span on the same row
+    first_account, first_browse = by_name["account"][0], by_name["browse"][0]
+    assert first_browse["tid"] == first_account["tid"] == tracks["main"]
+    assert first_account["ts"] <= first_browse["ts"]
+    assert first_browse["ts"] + first_browse["dur"] <= first_account["ts"] + first_account["dur"]
+
+    # The next cycle starts from an empty buffer
+    assert tracer.events == []
+
+
+def test_failed_span_records_the_error(tracer):
+    with pytest.raises(ValueError):
+        with span("boom"):
+            raise ValueError("x")
+    assert tracer.events[-1]["args"] == {"error": "ValueError"}
+
+
+def test_disabled_tracing_is_a_shared_noop():
+    assert not tracing.tracing_enabled()
+    assert span("a") is span("b")
+
+    started = time.perf_counter()
+    for _ in range(100000):
+        with span("hot", account="x"):
+            pass
+    per_span = (time.perf_counter() - started) / 100000
+    assert per_span < 5e-6
+    assert asyncio.run(browse("a")) == "a"
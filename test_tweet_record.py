@@ -0,0 +1,69 @@
+"""Tests for Tweet records and timestamp parsing"""
+from datetime import datetime, timezone
+
+import pytest
+
+from tweet_record import Tweet, parse_timestamp
+
+NOON = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2026-03-01T12:00:00.000Z", NOON),
+    ("2026-03-01T12:00:00Z", NOON),
+    ("2026-03-01T12:00:00+00:00", NOON),
+    ("2026-03-01T14:00:00+02:00", NOON),
+    ("2026-03-01T12:00:00.250Z", NOON + 0.25),
+    ("Sun Mar 01 12:00:00 +0000 2026", NOON),
+    # Naive values are taken as UTC
+    ("2026-03-01T12:00:00", NOON),
+    (datetime(2026, 3, 1, 12, 0), NOON),
+    (datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc), NOON),
+    (NOON, NOON),
+    (int(NOON), NOON),
+    (None, None),
+    ("", None),
+    ("yesterday", None),
+    ("Sun Mar 01 2026", None),
+    (["2026-03-01"], None),
+])
+def test_parse_timestamp(value, expected):
+    assert parse_timestamp(value) == expected
+
+
+def test_page_and_api_timestamps_compare_correctly():
+    page = Tweet(id=1, text="", url="", timestamp=parse_timestamp("2026-03-01T12:00:01.000Z"))
+    api = Tweet(id=2, text="", url="", timestamp=parse_timestamp("Sun Mar 01 11:59:59 +0000 2026"))
+    assert page.is_newer_than(NOON) and not api.is_newer_than(NOON)
+    assert Tweet(id=3, text="", url="").is_newer_than(NOON)
+
+
+@pytest.mark.parametrize("data, expected", [
+    # DOM extraction
+    ({"url": "https://x.com/alice/status/123", "text": " gm ", "timestamp": "2026-03-01T12:00:00.000Z"},
+     Tweet(id=123, text="gm", url="https://x.com/alice/status/123", timestamp=NOON, author="alice")),
+    # snscrape JSON
+    ({"id": 456, "url": "https://twitter.com/bob/status/456", "rawContent": "hello",
+      "date": "2026-03-01T12:00:00+00:00", "user": {"username": "Bob"}, "lang": "en"},
+     Tweet(id=456, text="hello", url="https://twitter.com/bob/status/456", timestamp=NOON, author="Bob", lang="en")),
+    # Old fixtures and fake tweets: string id, content, @username
+    ({"id": "789", "url": "", "content": "old", "date": "2026-03-01T12:00:00", "username": "@carol"},
+     Tweet(id=789, text="old", url="", timestamp=NOON, author="carol")),
+    ({"url": "https://x.com/dave/status/1", "text": "pinned", "is_pinned": 1, "is_retweet": 0},
+     Tweet(id=1, text="pinned", url="https://x.com/dave/status/1", author="dave", is_pinned=True)),
+])
+def test_from_dict_legacy_shapes(data, expected):
+    assert Tweet.from_dict(data) == expected
+
+
+@pytest.mark.parametrize("data", [{}, {"url": "https://x.com/alice"}, {"id": "abc", "text": "x"}])
+def test_from_dict_without_status_id(data):
+    assert Tweet.from_dict(data) is None
+
+
+def test_from_dict_round_trips_to_dict():
+    tweet = Tweet(id=5, text="t", url="https://x.com/e/status/5", timestamp=NOON, author="e", lang="en",
+                  is_pinned=True, is_retweet=True, is_reply=True)
+    assert Tweet.from_dict(tweet.to_dict()) == tweet
+    assert tweet.iso_timestamp == "2026-03-01T12:00:00.000Z"
+    assert parse_timestamp(tweet.iso_timestamp) == tweet.timestamp
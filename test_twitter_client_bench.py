@@ -0,0 +1,236 @@
+"""Offline benchmarks of the twitter_client browser hot path.
+
+Runs extraction, selector resolution and posting flows against
+fake_twitter_server in headless Chromium, so regressions show up without
+network access or a Twitter account:
+
+    pytest -q test_twitter_client_bench.py -s
+    TWITTER_BENCH_OUTPUT=bench.json pytest -q test_twitter_client_bench.py
+
+Each flow must finish within its budget; TWITTER_BENCH_BUDGET_SCALE
+loosens or tightens all budgets at once (e.g. 2 on slow CI machines).
+"""
+import os
+import json
+import time
+import asyncio
+import statistics
+
+import pytest
+
+pytest.importorskip("playwright")
+pytest.importorskip("pytest_playwright")
+
+from playwright.async_api import async_playwright
+
+import selector_cache
+import twitter_client
+from state_store import StateStore
+from fake_twitter_server import start_fake_twitter_server, FIRST_TWEET_ID
+
+ROUNDS = int(os.getenv("TWITTER_BENCH_ROUNDS", "3"))
+BUDGET_SCALE = float(os.getenv("TWITTER_BENCH_BUDGET_SCALE", "1"))
+LARGE_TIMELINE = 5000
+
+# Median seconds allowed per flow
+BUDGETS = {
+    "browse_dom_small": 4.0,
+    "browse_dom_large": 12.0,
+    "browse_dom_large_cursor": 12.0,
+    "browse_network_large": 6.0,
+    "click_first_selector": 1.0,
+    # Candidates are raced, so a missing first choice must not cost its timeout
+    "click_fallback_selector": 1.0,
+    "reply_to_tweet": 6.0,
+    "post_thread_3": 8.0,
+}
+
+
+@pytest.fixture(scope="module")
+def fake_twitter():
+    server, base_url, config = start_fake_twitter_server(timelines={"whale": LARGE_TIMELINE})
+    yield base_url, config
+    server.shutdown()
+
+
+@pytest.fixture(scope="module")
+def bench():
+    """Collects timings per flow; prints a summary (and optionally JSON) at the end"""
+    timings = {}
+    yield timings
+    summary = {
+        name: {"runs": len(values), "median_s": round(statistics.median(values), 3), "max_s": round(max(values), 3)}
+        for name, values in timings.items()
+    }
+    print("\ntwitter_client benchmark:")
+    for name, row in summary.items():
+        print(f"  {name:<26} median {row['median_s']:>7.3f}s  max {row['max_s']:>7.3f}s  ({row['runs']} runs)")
+    output = os.getenv("TWITTER_BENCH_OUTPUT")
+    if output:
+        with open(output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+@pytest.fixture(autouse=True)
+def offline_site(fake_twitter, monkeypatch):
+    base_url, config = fake_twitter
+    monkeypatch.setattr(twitter_client, "TWITTER_BASE_URL", base_url)
+    # Fixed settle pauses would dominate every timing
+    monkeypatch.setattr(twitter_client, "TWITTER_PAUSE_SCALE", 0)
+    with config.lock:
+        config.posts.clear()
+    return config
+
+
+@pytest.fixture(autouse=True)
+def isolated_selector_cache(tmp_path, monkeypatch):
+    """Learned selectors go to a throwaway state store, not the bot's"""
+    store = StateStore(str(tmp_path / "state.db"))
+    monkeypatch.setattr(selector_cache, "_cache", selector_cache.SelectorCache(store))
+    yield selector_cache._cache
+    store.close()
+
+
+@pytest.fixture
+def run_page(browser_type_launch_args, tmp_path, monkeypatch):
+    """Run ``scenario(page)`` in a fresh Chromium page and return its result"""
+    # Error screenshots from failing flows land in the test's tmp dir
+    monkeypatch.chdir(tmp_path)
+
+    def run(scenario):
+        async def main():
+            async with async_playwright() as playwright:
+                browser = await playwright.chromium.launch(**browser_type_launch_args)
+                try:
+                    page = await browser.new_page()
+                    page.set_default_timeout(15000)
+                    return await scenario(page)
+                finally:
+                    await browser.close()
+        return asyncio.run(main())
+    return run
+
+
+async def timed(bench, name, awaitable):
+    start = time.perf_counter()
+    result = await awaitable
+    bench.setdefault(name, []).append(time.perf_counter() - start)
+    return result
+
+
+def assert_within_budget(bench, name):
+    median = statistics.median(bench[name])
+    budget = BUDGETS[name] * BUDGET_SCALE
+    assert median < budget, f"{name} took {median:.2f}s (budget {budget:.2f}s)"
+
+
+async def wait_for_posts(config, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while len(config.posts) < count and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return list(config.posts)
+
+
+def test_browse_dom_small_timeline(run_page, bench):
+    async def scenario(page):
+        for _ in range(ROUNDS):
+            tweets = await timed(bench, "browse_dom_small",
+                                 twitter_client.browse_tweets_v2(page, "alice", limit=10, mode="dom"))
+        return tweets
+
+    tweets = run_page(scenario)
+    assert len(tweets) == 10
+    assert tweets[1].id == FIRST_TWEET_ID
+    assert all(t.text and "/alice/status/" in t.url for t in tweets)
+    assert_within_budget(bench, "browse_dom_small")
+
+
+def test_browse_dom_large_timeline(run_page, bench):
+    async def scenario(page):
+        for _ in range(ROUNDS):
+            tweets = await timed(bench, "browse_dom_large",
+                                 twitter_client.browse_tweets_v2(page, "whale", limit=10, mode="dom"))
+        return tweets
+
+    assert len(run_page(scenario)) == 10
+    assert_within_budget(bench, "browse_dom_large")
+
+
+def test_browse_dom_large_timeline_with_cursor(run_page, bench):
+    since_id = FIRST_TWEET_ID - 5 * 1000
+
+    async def scenario(page):
+        for _ in range(ROUNDS):
+            tweets = await timed(bench, "browse_dom_large_cursor",
+                                 twitter_client.browse_tweets_v2(page, "whale", limit=10, since_id=since_id, mode="dom"))
+        return tweets
+
+    tweets = run_page(scenario)
+    # The older pinned tweet is skipped, extraction stops at the cursor
+    assert [t.id for t in tweets] == [FIRST_TWEET_ID - i * 1000 for i in range(5)]
+    assert_within_budget(bench, "browse_dom_large_cursor")
+
+
+def test_browse_network_large_timeline(run_page, bench):
+    since_id = FIRST_TWEET_ID - 5 * 1000
+
+    async def scenario(page):
+        for _ in range(ROUNDS):
+            tweets = await timed(bench, "browse_network_large",
+                                 twitter_client.browse_tweets_v2(page, "whale", limit=10, since_id=since_id, mode="network"))
+        return tweets
+
+    tweets = run_page(scenario)
+    assert [t.id for t in tweets] == [FIRST_TWEET_ID - i * 1000 for i in range(5)]
+    assert_within_budget(bench, "browse_network_large")
+
+
+def test_selector_resolution(run_page, bench):
+    async def scenario(page):
+        clicked = []
+        for _ in range(ROUNDS):
+            await page.goto(twitter_client.site_url("/home"))
+            clicked.append(await timed(bench, "click_first_selector", twitter_client.wait_for_and_click(
+                page, ["[data-testid='SideNav_NewTweet_Button']", "[href='/compose/tweet']"], timeout=2000)))
+            await page.goto(twitter_client.site_url("/home"))
+            # First candidate never appears, so this measures the fallback cost
+            clicked.append(await timed(bench, "click_fallback_selector", twitter_client.wait_for_and_click(
+                page, ["[data-testid='missing']", "[data-testid='SideNav_NewTweet_Button']"], timeout=2000)))
+        return clicked
+
+    assert all(run_page(scenario))
+    assert_within_budget(bench, "click_first_selector")
+    assert_within_budget(bench, "click_fallback_selector")
+
+
+def test_reply_flow(run_page, bench, offline_site):
+    tweet_url = f"https://x.com/alice/status/{FIRST_TWEET_ID}"
+
+    async def scenario(page):
+        results = []
+        for i in range(ROUNDS):
+            results.append(await timed(bench, "reply_to_tweet",
+                                       twitter_client.reply_to_tweet(page, tweet_url, f"Benchmark reply {i}")))
+        return results, await wait_for_posts(offline_site, ROUNDS)
+
+    results, posts = run_page(scenario)
+    assert all(results)
+    assert [p["text"] for p in posts] == [f"Benchmark reply {i}" for i in range(ROUNDS)]
+    assert all(p["in_reply_to"] == str(FIRST_TWEET_ID) for p in posts)
+    assert_within_budget(bench, "reply_to_tweet")
+
+
+def test_post_thread_flow(run_page, bench, offline_site):
+    thread = ["Thread part one", "Thread part two", "Thread part three"]
+
+    async def scenario(page):
+        results = []
+        for _ in range(ROUNDS):
+            await page.goto(twitter_client.site_url("/home"))
+            results.append(await timed(bench, "post_thread_3", twitter_client.post_tweet_thread_v2(page, thread)))
+        return results, await wait_for_posts(offline_site, ROUNDS * len(thread))
+
+    results, posts = run_page(scenario)
+    assert all(results)
+    assert [p["text"] for p in posts] == thread * ROUNDS
+    assert_within_budget(bench, "post_thread_3")
@@ -0,0 +1,160 @@
+import re
+import asyncio
+import logging
+
+from tweet_record import Tweet, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# GraphQL operations the web client uses to load a profile timeline
+TIMELINE_URL_RE = re.compile(r"/i/api/graphql/[^/]+/(UserTweets|UserTweetsAndReplies|UserMedia)\b")
+
+
+def _unwrap(result):
+    """Return the Tweet object inside a tweet_results.result value"""
+    if not isinstance(result, dict):
+        return None
+    if result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet") or {}
+    if "legacy" not in result:
+        return None
+    return result
+
+
+def _screen_name(tweet):
+    user = ((tweet.get("core") or {}).get("user_results") or {}).get("result") or {}
+    return (user.get("legacy") or {}).get("screen_name") or (user.get("core") or {}).get("screen_name") or ""
+
+
+def _full_text(tweet):
+    """Long tweets keep their full text in note_tweet, legacy.full_text is truncated"""
+    note = ((tweet.get("note_tweet") or {}).get("note_tweet_results") or {}).get("result") or {}
+    return note.get("text") or tweet["legacy"].get("full_text", "")
+
+
+def parse_tweet_result(result, pinned=False):
+    """Build a Tweet from a tweet_results.result object"""
+    tweet = _unwrap(result)
+    if tweet is None:
+        return None
+
+    legacy = tweet["legacy"]
+    tweet_id = legacy.get("id_str") or tweet.get("rest_id", "")
+    author = _screen_name(tweet)
+
+    # For reposts, text and URL come from the original tweet (like the DOM
+    # extractor), while the ID stays the timeline entry's so it is chronological
+    original = _unwrap((legacy.get("retweeted_status_result") or {}).get("result"))
+    source = original or tweet
+    source_id = source["legacy"].get("id_str") or source.get("rest_id", "")
+    source_author = _screen_name(source) or author
+
+    if not tweet_id:
+        return None
+    return Tweet(
+        id=int(tweet_id),
+        text=_full_text(source),
+        url=f"https://x.com/{source_author}/status/{source_id}",
+        timestamp=parse_timestamp(legacy.get("created_at")),
+        author=author,
+        lang=source["legacy"].get("lang", ""),
+        is_pinned=pinned,
+        is_retweet=original is not None,
+        is_reply=bool(legacy.get("in_reply_to_status_id_str")),
+    )
+
+
+def _entry_results(entry):
+    """Yield tweet_results.result objects from a timeline entry (items and modules)"""
+    content = entry.get("content") or {}
+    item = content.get("itemContent")
+    if item:
+        yield (item.get("tweet_results") or {}).get("result")
+    for module_item in content.get("items") or []:
+        item = (module_item.get("item") or {}).get("itemContent") or {}
+        yield (item.get("tweet_results") or {}).get("result")
+
+
+def _find_instructions(data):
+    """Locate the timeline instructions list regardless of the wrapper key"""
+    user = ((data.get("data") or {}).get("user") or {}).get("result") or {}
+    for key in ("timeline_v2", "timeline"):
+        timeline = (user.get(key) or {}).get("timeline") or {}
+        if "instructions" in timeline:
+            return timeline["instructions"]
+    return []
+
+
+def parse_timeline(data):
+    """Parse a UserTweets response into Tweets, in timeline order"""
+    tweets = []
+    for instruction in _find_instructions(data):
+        kind = instruction.get("type")
+        if kind == "TimelinePinEntry":
+            entries, pinned = [instruction.get("entry") or {}], True
+        elif kind == "TimelineAddEntries":
+            entries, pinned = instruction.get("entries") or [], False
+        else:
+            continue
+
+        for entry in entries:
+            for result in _entry_results(entry):
+                try:
+                    tweet = parse_tweet_result(result, pinned=pinned)
+                except Exception as e:
+                    logger.debug(f"Skipping unparseable timeline entry: {e}")
+                    continue
+                if tweet:
+                    tweets.append(tweet)
+    return tweets
+
+
+class TimelineCapture:
+    """Collect tweets from the timeline JSON a page downloads.
+
+    Attach before navigating; tweets become available as soon as the
+    response arrives, without waiting for the page to render.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.tweets = []
+        self._seen = set()
+        self._received = asyncio.Event()
+        self._tasks = set()
+
+    def __enter__(self):
+        self.page.on("response", self._on_response)
+        return self
+
+    def __exit__(self, *exc):
+        self.page.remove_listener("response", self._on_response)
+        for task in self._tasks:
+            task.cancel()
+
+    def _on_response(self, response):
+        if TIMELINE_URL_RE.search(response.url):
+            task = asyncio.ensure_future(self._handle(response))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, response):
+        try:
+            data = await response.json()
+            for tweet in parse_timeline(data):
+                if tweet.id not in self._seen:
+                    self._seen.add(tweet.id)
+                    self.tweets.append(tweet)
+            logger.debug(f"Captured timeline response: {response.url}")
+        except Exception as e:
+            logger.warning(f"Could not parse timeline response: {e}")
+        finally:
+            self._received.set()
+
+    async def wait(self, timeout=20):
+        """Wait for the first timeline response; return False on timeout"""
+        try:
+            await asyncio.wait_for(self._received.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
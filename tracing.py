@@ -0,0 +1,204 @@
+"""Lightweight tracing spans exported in the Chrome trace event format.
+
+Set TRACE_DIR to enable. Every ``trace_cycle()`` block (one reply cycle) is
+written to its own ``<TRACE_DIR>/<name>-<time>.json``, which opens in
+chrome://tracing, https://ui.perfetto.dev or speedscope as a flame graph:
+
+    with trace_cycle("check"):
+        with span("account", account=account):
+            ...
+
+Concurrent pipeline stages use ``set_track()``/``trace_track()`` so each
+gets its own row; spans nest by time within a row. When TRACE_DIR is unset
+``span()`` returns a shared no-op context manager and ``traced`` wrappers
+add a single check.
+"""
+import os
+import json
+import time
+import logging
+import functools
+import threading
+import contextvars
+from datetime import datetime
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Directory for per-cycle trace files (empty disables tracing)
+TRACE_DIR = os.getenv("TRACE_DIR", "")
+
+# Spans kept per cycle; later ones are dropped (and counted in the file)
+TRACE_MAX_EVENTS = int(os.getenv("TRACE_MAX_EVENTS", "200000"))
+
+# Row ("thread") the current task's spans are drawn on
+_track = contextvars.ContextVar("trace_track", default="main")
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "track", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.track = _track.get()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.complete(self.name, self.start, end, self.track, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach results to the span before it ends (e.g. tweets found)"""
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects complete ("X") events in memory and writes them as Chrome trace JSON"""
+
+    def __init__(self, directory, max_events=TRACE_MAX_EVENTS):
+        self.directory = directory
+        self.max_events = max_events
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.events = []
+        self.dropped = 0
+        self._tids = {}
+        self._lock = threading.Lock()
+
+    def _tid(self, track):
+        tid = self._tids.get(track)
+        if tid is None:
+            tid = self._tids[track] = len(self._tids) + 1
+        return tid
+
+    def complete(self, name, start, end, track, args):
+        event = {"name": name, "ph": "X", "pid": self.pid,
+                 "ts": round((start - self.origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1)}
+        if args:
+            event["args"] = {key: value if isinstance(value, (int, float, str, bool)) or value is None else str(value)
+                             for key, value in args.items()}
+        with self._lock:
+            event["tid"] = self._tid(track)
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+
+    def flush(self, name):
+        """Write the buffered spans to a new trace file and start a new buffer; returns the path"""
+        with self._lock:
+            events, self.events = self.events, []
+            dropped, self.dropped = self.dropped, 0
+            tracks = dict(self._tids)
+        if not events:
+            return None
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "twitter-bot"}}]
+        metadata += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": track}}
+                     for track, tid in tracks.items()]
+        metadata += [{"name": "thread_sort_index", "ph": "M", "pid": self.pid, "tid": tid, "args": {"sort_index": tid}}
+                     for tid in tracks.values()]
+        path = os.path.join(self.directory, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms",
+                           "otherData": {"dropped_spans": dropped}}, f)
+        except OSError as e:
+            logger.error(f"Could not write trace {path}: {e}")
+            return None
+        logger.info(f"Trace with {len(events)} spans written to {path}")
+        return path
+
+
+# Process-wide tracer; None while tracing is disabled
+_tracer = Tracer(TRACE_DIR) if TRACE_DIR else None
+
+
+def enable_tracing(directory):
+    """Start tracing into ``directory`` (None to stop); returns the Tracer"""
+    global _tracer
+    _tracer = Tracer(directory) if directory else None
+    return _tracer
+
+
+def tracing_enabled():
+    return _tracer is not None
+
+
+def span(name, **args):
+    """Context manager timing a block as a span on the current task's track"""
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP
+    return _Span(tracer, name, args)
+
+
+def set_track(name):
+    """Draw the spans of the current task (and tasks it creates) on their own row"""
+    if _tracer is not None:
+        _track.set(name)
+
+
+def traced(name=None):
+    """Decorator: run a coroutine function inside a span named after it"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return await func(*args, **kwargs)
+            with _Span(tracer, label, {}):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def trace_track(name):
+    """Draw the spans inside the block on their own row, then restore the previous one"""
+    if _tracer is None:
+        yield
+        return
+    token = _track.set(name)
+    try:
+        yield
+    finally:
+        _track.reset(token)
+
+
+@contextmanager
+def trace_cycle(name, **args):
+    """Span for one whole cycle; the cycle's trace file is written when the block exits"""
+    try:
+        with span(f"cycle:{name}", **args) as cycle_span:
+            yield cycle_span
+    finally:
+        tracer = _tracer
+        if tracer is not None:
+            tracer.flush(name)
@@ -0,0 +1,204 @@
+"""Record and replay the bot's browser traffic with Playwright HAR files.
+
+In ``record`` mode every account is browsed on its own page whose traffic
+is written to ``<TRAFFIC_HAR_DIR>/<account>.har.zip`` (on context close),
+next to a manifest and a snapshot of the state database. In ``replay``
+mode the same pages are served from those files, every other request is
+aborted and posting is stubbed, so a whole cycle runs deterministically
+without network:
+
+    python traffic_replay.py record --task check
+    python traffic_replay.py replay --task check --profile cycle.prof
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import asyncio
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# "live" (default), "record" or "replay"
+TRAFFIC_MODE = os.getenv("TRAFFIC_MODE", "live").lower()
+
+# Directory holding one HAR per account plus manifest.json and state.db
+TRAFFIC_HAR_DIR = os.getenv("TRAFFIC_HAR_DIR", os.path.join(BASE_DIR, "har"))
+
+MANIFEST_FILE = "manifest.json"
+STATE_SNAPSHOT_FILE = "state.db"
+
+# Replies "posted" while replaying, as (tweet_url, reply_text)
+stubbed_posts = []
+
+
+def recording():
+    return TRAFFIC_MODE == "record"
+
+
+def replaying():
+    return TRAFFIC_MODE == "replay"
+
+
+def har_path(account):
+    return os.path.join(TRAFFIC_HAR_DIR, f"{account}.har.zip")
+
+
+def load_manifest():
+    try:
+        with open(os.path.join(TRAFFIC_HAR_DIR, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def now():
+    """Current time, or the recording's time while replaying so time windows select the same tweets"""
+    if replaying():
+        recorded_at = load_manifest().get("recorded_at")
+        if recorded_at:
+            return datetime.fromtimestamp(recorded_at)
+    return datetime.now()
+
+
+def write_manifest(accounts, task, state_db_path):
+    """Start a recording: write the manifest and snapshot the state database it starts from"""
+    os.makedirs(TRAFFIC_HAR_DIR, exist_ok=True)
+    if os.path.exists(state_db_path):
+        source = sqlite3.connect(state_db_path)
+        target = sqlite3.connect(os.path.join(TRAFFIC_HAR_DIR, STATE_SNAPSHOT_FILE))
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+    manifest = {"recorded_at": time.time(), "accounts": list(accounts), "task": task}
+    with open(os.path.join(TRAFFIC_HAR_DIR, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+async def block_unrecorded(context):
+    """While replaying, abort every request that no HAR route answers"""
+    await context.route("**/*", lambda route: route.abort("internetdisconnected"))
+
+
+@asynccontextmanager
+async def account_page(session, account):
+    """A fresh page whose traffic is recorded to, or replayed from, the account's HAR"""
+    # Imported here: the CLI configures the environment before bot modules load
+    from twitter_client import new_bot_page
+
+    await session.ensure()
+    page = await new_bot_page(session.context)
+    try:
+        if recording():
+            os.makedirs(TRAFFIC_HAR_DIR, exist_ok=True)
+            await page.route_from_har(har_path(account), update=True, update_content="attach", update_mode="minimal")
+        elif os.path.exists(har_path(account)):
+            await page.route_from_har(har_path(account), not_found="abort")
+        else:
+            logger.warning(f"No recording for {account} in {TRAFFIC_HAR_DIR}")
+        yield page
+    finally:
+        await page.close()
+
+
+async def stub_reply(page, tweet_url, reply_text):
+    """Stand-in for twitter_client.reply_to_tweet while replaying"""
+    logger.info(f"[replay] Would reply to {tweet_url}: {reply_text}")
+    stubbed_posts.append((tweet_url, reply_text))
+    return True
+
+
+def _prepare_replay(args):
+    """Point state, cache and LLM at throwaway/offline resources for a replay run"""
+    scratch = tempfile.mkdtemp(prefix="bot_replay_")
+    snapshot = os.path.join(args.har_dir, STATE_SNAPSHOT_FILE)
+    if os.path.exists(snapshot):
+        shutil.copy(snapshot, os.path.join(scratch, "state.db"))
+    os.environ["BOT_STATE_DB"] = os.path.join(scratch, "state.db")
+    os.environ["GENERATION_CACHE_DB"] = os.path.join(scratch, "generation_cache.db")
+    os.environ.setdefault("TWITTER_PAUSE_SCALE", "0")
+
+    if not args.live_llm:
+        from fake_gemini_server import start_fake_gemini_server
+        _, base_url, _ = start_fake_gemini_server(latency=args.llm_latency, jitter=0, seed=0)
+        os.environ["GEMINI_API_BASE"] = base_url
+        os.environ["GEMINI_API_KEY"] = "replay"
+
+
+async def _run_cycle(bot, task):
+    from browser_session import get_browser_session
+    from llm_client import get_llm_client
+    from loop_monitor import monitor_event_loop
+
+    try:
+        async with monitor_event_loop():
+            await bot.initialize_browser()
+            if task == "check":
+                return await bot.check_tweets_and_reply()
+            return await bot.reply_to_latest_tweets()
+    finally:
+        # Closing the context is what writes the recorded HAR files
+        await get_browser_session().close()
+        await get_llm_client().close()
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Record or replay one reply cycle")
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("--task", choices=("check", "latest"), default="check",
+                        help="check: check_tweets_and_reply(), latest: one main_loop() iteration")
+    parser.add_argument("--har-dir", default=TRAFFIC_HAR_DIR)
+    parser.add_argument("--accounts", type=int, default=None, help="record only the first N monitored accounts")
+    parser.add_argument("--live-llm", action="store_true", help="replay with the real Gemini API instead of the fake server")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fake Gemini latency while replaying")
+    parser.add_argument("--profile", help="write cProfile stats of the cycle to this file")
+    args = parser.parse_args(argv)
+
+    # Configure before the bot modules read their settings at import
+    os.environ["TRAFFIC_MODE"] = args.mode
+    os.environ["TRAFFIC_HAR_DIR"] = os.path.abspath(args.har_dir)
+    if args.mode == "replay":
+        _prepare_replay(args)
+
+    import main as bot
+    import traffic_replay
+    # The summary below is printed to stdout, so print() stays uncaptured
+    bot.setup_logging(capture_print=False)
+    from state_store import STATE_DB_PATH
+
+    if args.mode == "record":
+        accounts = bot.MONITORED_ACCOUNTS[:args.accounts] if args.accounts else bot.MONITORED_ACCOUNTS
+        traffic_replay.write_manifest(accounts, args.task, STATE_DB_PATH)
+    else:
+        accounts = traffic_replay.load_manifest().get("accounts") or bot.MONITORED_ACCOUNTS
+    bot.MONITORED_ACCOUNTS = list(accounts)
+
+    started = time.monotonic()
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        stats = profiler.runcall(asyncio.run, _run_cycle(bot, args.task))
+        profiler.dump_stats(args.profile)
+    else:
+        stats = asyncio.run(_run_cycle(bot, args.task))
+
+    print(f"{args.mode} of {len(accounts)} accounts finished in {time.monotonic() - started:.1f}s")
+    print(json.dumps(stats, indent=2))
+    if args.mode == "replay":
+        print(f"{len(traffic_replay.stubbed_posts)} replies stubbed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
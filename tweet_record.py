@@ -0,0 +1,95 @@
+import re
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+
+_STATUS_RE = re.compile(r"/([^/?#]+)/status(?:es)?/(\d+)")
+
+# Format of the timeline API's legacy.created_at, e.g. "Wed Oct 10 20:19:24 +0000 2018"
+CREATED_AT_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+
+def parse_timestamp(value):
+    """Epoch seconds from an ISO string ("...T12:00:00.000Z", offsets or naive UTC),
+    a created_at string, a datetime or a number; None if it can't be parsed"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except (AttributeError, ValueError):
+            try:
+                dt = datetime.strptime(value, CREATED_AT_FORMAT)
+            except (TypeError, ValueError):
+                return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+@dataclass(slots=True)
+class Tweet:
+    """A tweet as extracted from the page, timeline JSON or snscrape.
+
+    Built once at extraction time; ``id`` is the integer status ID and
+    ``timestamp`` is epoch seconds (None when unknown).
+    """
+    id: int
+    text: str
+    url: str
+    timestamp: float = None
+    author: str = ""
+    lang: str = ""
+    is_pinned: bool = False
+    is_retweet: bool = False
+    is_reply: bool = False
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Tweet from a loose dict (DOM extraction, snscrape JSON, old fixtures).
+
+        Accepts ``text``/``content``/``rawContent`` and ``timestamp``/``date``;
+        returns None when no status ID can be found.
+        """
+        url = data.get("url") or ""
+        match = _STATUS_RE.search(url)
+        tweet_id = data.get("id") or (match.group(2) if match else None)
+        try:
+            tweet_id = int(tweet_id)
+        except (TypeError, ValueError):
+            return None
+
+        author = data.get("author") or data.get("username") or ""
+        if not author and isinstance(data.get("user"), dict):
+            author = data["user"].get("username", "")
+        if not author and match:
+            author = match.group(1)
+
+        return cls(
+            id=tweet_id,
+            text=(data.get("text") or data.get("rawContent") or data.get("content") or "").strip(),
+            url=url,
+            timestamp=parse_timestamp(data.get("timestamp") or data.get("date")),
+            author=author.lstrip("@"),
+            lang=data.get("lang") or "",
+            is_pinned=bool(data.get("is_pinned")),
+            is_retweet=bool(data.get("is_retweet")),
+            is_reply=bool(data.get("is_reply")),
+        )
+
+    @property
+    def iso_timestamp(self):
+        """Timestamp in the page's ISO format, or "" when unknown"""
+        if self.timestamp is None:
+            return ""
+        return datetime.fromtimestamp(self.timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def is_newer_than(self, epoch_seconds):
+        """True if posted after the given time; tweets without a timestamp count as new"""
+        return self.timestamp is None or self.timestamp > epoch_seconds
+
+    def to_dict(self):
+        return asdict(self)
@@ -3,14 +3,34 @@ import random
 import time
 import json
 import pathlib
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import re  # Import re for regular expression operations
 from email_reader import EmailReader
+from timeline_capture import TimelineCapture
+from tweet_record import Tweet
+from resource_blocker import get_resource_blocker
+from metrics import PAGE_LOAD_SECONDS
+from tracing import span, traced
+from artifact_store import get_artifact_store
+from selector_cache import get_selector_cache
 import asyncio  # Add asyncio import explicitly
 import logging
 import traceback
 import asyncio
 
+# How browse_tweets_v2 extracts tweets: "dom" (rendered page) or "network" (timeline JSON)
+TWEET_EXTRACTION_MODE = os.getenv("TWEET_EXTRACTION_MODE", "dom").lower()
+
+# Site the browser talks to (point at fake_twitter_server for offline runs)
+TWITTER_BASE_URL = os.getenv("TWITTER_BASE_URL", "https://twitter.com").rstrip("/")
+
+# Multiplier for the fixed settle pauses after navigations and clicks (0 disables them)
+TWITTER_PAUSE_SCALE = float(os.getenv("TWITTER_PAUSE_SCALE", "1"))
+
+# Catch-all selectors are only waited for this long (ms), after the specific ones time out
+FALLBACK_SELECTOR_TIMEOUT = 2000
+
+_SITE_RE = re.compile(r"^https?://(?:www\.|mobile\.)?(?:twitter|x)\.com")
+
 # Create directory to store browser session data
 USER_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "browser_profile")
 os.makedirs(USER_DATA_DIR, exist_ok=True)
@@ -20,7 +40,32 @@ logger = logging.getLogger(__name__)
 async def human_like_delay(min_ms=500, max_ms=1500):
     """Simulate human-like delay between actions"""
     delay = random.randint(min_ms, max_ms) / 1000.0
-    await asyncio.sleep(delay)
+    with span("human_like_delay", seconds=delay):
+        await asyncio.sleep(delay)
+
+def site_url(path_or_url):
+    """Absolute URL on TWITTER_BASE_URL for a path or a twitter.com/x.com URL"""
+    if path_or_url.startswith("/"):
+        return TWITTER_BASE_URL + path_or_url
+    return _SITE_RE.sub(lambda _: TWITTER_BASE_URL, path_or_url)
+
+async def goto(page, path_or_url, operation, **kwargs):
+    """page.goto on the configured site, timed into PAGE_LOAD_SECONDS by operation"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with span(f"goto:{operation}"):
+            response = await page.goto(site_url(path_or_url), **kwargs)
+        outcome = "ok"
+        return response
+    finally:
+        PAGE_LOAD_SECONDS.observe(time.perf_counter() - started, operation=operation, outcome=outcome)
+
+async def settle(seconds):
+    """Fixed pause letting the page settle, scaled by TWITTER_PAUSE_SCALE"""
+    if TWITTER_PAUSE_SCALE > 0:
+        with span("settle", seconds=seconds * TWITTER_PAUSE_SCALE):
+            await asyncio.sleep(seconds * TWITTER_PAUSE_SCALE)
 
 def type_like_human(page, selector, text):
     """Type text with human-like delays and patterns"""
@@ -113,6 +158,7 @@ async def initialize_playwright(retries=3):
     for attempt in range(retries):
         try:
             logger.info(f"Initializing Playwright (attempt {attempt + 1}/{retries})")
+            from playwright.async_api import async_playwright
             playwright = await async_playwright().start()
             
             # Log environment info
@@ -154,99 +200,121 @@ async def initialize_playwright(retries=3):
                 logger.error("All attempts to initialize Playwright failed")
                 raise
 
-async def login(headless=False):
-    """
-    Login to Twitter with optional headless mode using Async API
-    """
-    playwright = None
-    browser = None
-    page = None
-    try:
-        # Initialize Playwright properly with retry logic
-        for attempt in range(3):
-            try:
-                logger.info(f"Initializing Playwright (attempt {attempt + 1}/3)")
-                playwright = await async_playwright().start()
-                if playwright:
-                    break
-                else:
-                    logger.error("Playwright initialization returned None")
-                    await asyncio.sleep(2)
-            except Exception as init_error:
-                logger.error(f"Playwright initialization error (attempt {attempt + 1}): {init_error}")
-                await asyncio.sleep(2)
-                continue
+async def start_playwright():
+    """Start the Playwright driver with retry logic"""
+    for attempt in range(3):
+        try:
+            logger.info(f"Initializing Playwright (attempt {attempt + 1}/3)")
+            # Imported here so tools and tests that never start a browser load fast
+            from playwright.async_api import async_playwright
+            playwright = await async_playwright().start()
+            if playwright:
+                return playwright
+            logger.error("Playwright initialization returned None")
+            await asyncio.sleep(2)
+        except Exception as init_error:
+            logger.error(f"Playwright initialization error (attempt {attempt + 1}): {init_error}")
+            await asyncio.sleep(2)
 
-        if not playwright:
-            raise Exception("Failed to initialize Playwright after 3 attempts")
+    raise Exception("Failed to initialize Playwright after 3 attempts")
 
-        # Ensure browser data directory exists and is writable
-        browser_data_dir = os.path.abspath("./browser_data")
-        os.makedirs(browser_data_dir, exist_ok=True)        # Launch browser with custom arguments for better stability
-        for attempt in range(3):
-            try:
-                logger.info(f"Launching browser (attempt {attempt + 1}/3)")
-                browser = await playwright.chromium.launch_persistent_context(
-                    browser_data_dir,
-                    headless=headless,
-                    viewport={'width': 1280, 'height': 720},
-                    args=[
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-accelerated-2d-canvas',
-                        '--disable-gpu',
-                        '--disable-notifications',
-                        '--disable-background-timer-throttling',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-breakpad',
-                        '--disable-component-extensions-with-background-pages',
-                        '--disable-features=TranslateUI,BlinkGenPropertyTrees',
-                        '--disable-ipc-flooding-protection',
-                        '--disable-renderer-backgrounding',
-                        '--enable-automation',
-                        '--password-store=basic',
-                        '--no-first-run',
-                        '--no-default-browser-check'
-                    ],
-                    chromium_sandbox=False
-                )
-                if browser:
-                    break
-                else:
-                    logger.error("Browser launch returned None")
-                    await asyncio.sleep(2)
-            except Exception as browser_error:
-                logger.error(f"Browser launch error (attempt {attempt + 1}): {browser_error}")
-                await asyncio.sleep(2)
-                continue
+async def launch_browser_context(playwright, headless=False):
+    """Launch the persistent Chromium context used for the Twitter session"""
+    # Ensure browser data directory exists and is writable
+    browser_data_dir = os.path.abspath("./browser_data")
+    os.makedirs(browser_data_dir, exist_ok=True)
+
+    # Launch browser with custom arguments for better stability
+    browser = None
+    for attempt in range(3):
+        try:
+            logger.info(f"Launching browser (attempt {attempt + 1}/3)")
+            browser = await playwright.chromium.launch_persistent_context(
+                browser_data_dir,
+                headless=headless,
+                viewport={'width': 1280, 'height': 720},
+                args=[
+                    '--no-sandbox',
+                    '--disable-setuid-sandbox',
+                    '--disable-dev-shm-usage',
+                    '--disable-accelerated-2d-canvas',
+                    '--disable-gpu',
+                    '--disable-notifications',
+                    '--disable-background-timer-throttling',
+                    '--disable-backgrounding-occluded-windows',
+                    '--disable-breakpad',
+                    '--disable-component-extensions-with-background-pages',
+                    '--disable-features=TranslateUI,BlinkGenPropertyTrees',
+                    '--disable-ipc-flooding-protection',
+                    '--disable-renderer-backgrounding',
+                    '--enable-automation',
+                    '--password-store=basic',
+                    '--no-first-run',
+                    '--no-default-browser-check'
+                ],
+                chromium_sandbox=False
+            )
+            if browser:
+                break
+            logger.error("Browser launch returned None")
+            await asyncio.sleep(2)
+        except Exception as browser_error:
+            logger.error(f"Browser launch error (attempt {attempt + 1}): {browser_error}")
+            await asyncio.sleep(2)
 
-        if not browser:
-            raise Exception("Failed to launch browser after 3 attempts")
+    if not browser:
+        raise Exception("Failed to launch browser after 3 attempts")
 
-        if not browser:
-            raise Exception("Failed to launch browser")
+    # Abort media, font and tracker requests the bot never uses
+    blocker = get_resource_blocker()
+    if blocker:
+        await blocker.install(browser)
 
-        # Open a new page
-        page = await browser.new_page()
-        if not page:
-            raise Exception("Failed to create new page")
+    return browser
 
-        await page.set_default_timeout(45000)  # Increase timeout to 45 seconds
+async def new_bot_page(browser):
+    """Open a page with the bot's default timeouts"""
+    page = await browser.new_page()
+    if not page:
+        raise Exception("Failed to create new page")
+    page.set_default_timeout(45000)  # Increase timeout to 45 seconds
+    return page
 
+@traced()
+async def login(headless=False):
+    """
+    Login to Twitter with optional headless mode using Async API
+    """
+    page = None
+    try:
+        playwright = await start_playwright()
+        browser = await launch_browser_context(playwright, headless=headless)
+        page = await new_bot_page(browser)
+        await ensure_logged_in(page)
+        return browser, page
+    except Exception as e:
+        logger.error(f"Error during login: {e}")
+        if page:
+            await take_error_screenshot(page, "fatal_error.png")
+        raise e
+
+@traced()
+async def ensure_logged_in(page):
+    """Open the home timeline and run the login flow if the session has expired"""
+    try:
         logger.info("Checking login status...")
-        await page.goto("https://twitter.com/home", wait_until="networkidle")
-        await asyncio.sleep(5)
+        await goto(page, "/home", "home", wait_until="networkidle")
+        await settle(5)
 
         if "home" in page.url and not "login" in page.url:
             logger.info("Already logged in!")
-            return browser, page
+            return True
 
         # Login process
         try:
             logger.info("Navigating to login page...")
-            await page.goto("https://twitter.com/i/flow/login", timeout=45000, wait_until="networkidle")
-            await asyncio.sleep(3)
+            await goto(page, "/i/flow/login", "login", timeout=45000, wait_until="networkidle")
+            await settle(3)
 
             # First step - enter username
             logger.info("Entering username...")
@@ -257,22 +325,25 @@ async def login(headless=False):
             username = os.getenv("TWITTER_USERNAME", "chefcryptoz")
             logger.info(f"Entering username: {username}")
             await username_input.fill(username)
-            await asyncio.sleep(2)
+            await settle(2)
 
             # Click Next button
             logger.info("Looking for Next button...")
             next_button_selectors = [
                 "div[role='button']:has-text('Next')",
-                "div[data-testid='LoginForm_Forward_Button']",
-                "div[role='button']",
-                "span:has-text('Next')"
+                "div[data-testid='LoginForm_Forward_Button']"
+            ]
+            next_button_fallbacks = [
+                "span:has-text('Next')",
+                "div[role='button']"
             ]
 
-            if not await wait_for_and_click(page, next_button_selectors):
+            if not await wait_for_and_click(page, next_button_selectors, action="login_next",
+                                            fallbacks=next_button_fallbacks):
                 logger.info("Next button not found, trying enter key...")
                 await page.press("input[name='text']", "Enter")
 
-            await asyncio.sleep(5)
+            await settle(5)
 
             # Password entry
             logger.info("Entering password...")
@@ -289,11 +360,11 @@ async def login(headless=False):
                 # Click login button
                 login_button_selectors = [
                     "div[data-testid='LoginForm_Login_Button']",
-                    "div[role='button']:has-text('Log in')",
-                    "span:has-text('Log in')"
+                    "div[role='button']:has-text('Log in')"
                 ]
 
-                if not await wait_for_and_click(page, login_button_selectors):
+                if not await wait_for_and_click(page, login_button_selectors, action="login_submit",
+                                                fallbacks=["span:has-text('Log in')"]):
                     logger.info("Login button not found, trying enter key...")
                     await page.press("input[name='password']", "Enter")
 
@@ -301,7 +372,7 @@ async def login(headless=False):
                 logger.info("Waiting for homepage to load...")
                 try:
                     await page.wait_for_url(["**/home", "**/x.com/home"], timeout=45000)
-                    await asyncio.sleep(5)
+                    await settle(5)
                     logger.info("Twitter session successfully opened")
                 except Exception as e:
                     logger.warning(f"Homepage couldn't load: {e}")
@@ -311,7 +382,7 @@ async def login(headless=False):
                 await take_error_screenshot(page, "password_error.png")
                 raise e
 
-            return browser, page
+            return True
 
         except Exception as e:
             logger.error(f"Login error: {e}")
@@ -319,16 +390,17 @@ async def login(headless=False):
             raise e
 
     except Exception as e:
-        logger.error(f"Error during login: {e}")
-        if 'page' in locals():
-            await take_error_screenshot(page, "fatal_error.png")
+        logger.error(f"Login check error: {e}")
         raise e
 
-async def take_error_screenshot(page, filename):
-    """Take a screenshot with proper error handling"""
+async def take_error_screenshot(page, filename, error=None):
+    """Save a screenshot of a failure to the artifact store (rate limited, size capped).
+
+    ``filename`` names the failure; the exception being handled is recorded
+    with it unless ``error`` is given.
+    """
     try:
-        await page.screenshot(path=filename)
-        logger.info(f"Error screenshot saved: {filename}")
+        await get_artifact_store().capture(page, filename, error)
     except Exception as e:
         logger.warning(f"Could not save screenshot {filename}: {e}")
 
@@ -342,10 +414,10 @@ async def cleanup_browser(browser):
             except Exception as browser_error:
                 logger.error(f"Browser close error: {browser_error}")
 
-        # Try to clean up any lingering browser processes
+        # Try to clean up lingering browser processes started by this process only
         try:
             import psutil
-            for proc in psutil.process_iter():
+            for proc in psutil.Process().children(recursive=True):
                 try:
                     if "chrome" in proc.name().lower() or "chromium" in proc.name().lower():
                         proc.kill()
@@ -365,18 +437,56 @@ async def cleanup_browser(browser):
         except Exception as dir_error:
             logger.error(f"Directory cleanup error: {dir_error}")
 
-async def wait_for_and_click(page, selectors, timeout=5000):
-    """Try multiple selectors to find and click a button"""
-    for selector in selectors:
-        try:
-            button = await page.wait_for_selector(selector, timeout=timeout)
-            if button:
-                await button.click()
-                return True
-        except Exception:
-            continue
-    return False
+async def _race_selectors(page, selectors, timeout):
+    """One combined wait for any of ``selectors``; returns (element, selector) of the earliest visible"""
+    try:
+        element = await page.wait_for_selector(", ".join(f"{s}:visible" for s in selectors), timeout=timeout)
+    except Exception:
+        return None, None
+    if not element:
+        return None, None
+    for candidate in selectors:
+        match = await page.query_selector(f"{candidate}:visible")
+        if match:
+            return match, candidate
+    return element, None
+
+async def find_first(page, selectors, timeout=5000, action=None, fallbacks=()):
+    """Wait for any of the candidate selectors; returns (element, selector) or (None, None).
+
+    All ``selectors`` are raced in a single combined wait instead of one
+    timeout each. If several are visible the earliest in the list wins.
+    Catch-all ``fallbacks`` (e.g. any button) could match before the real
+    element renders, so they are only tried once the specific ones time out.
+    With an ``action`` name the specific selector that matched last time is
+    tried first and the outcome is recorded in the selector cache; a
+    fallback match counts as a miss and is never cached.
+    """
+    cache = get_selector_cache() if action else None
+    ordered = cache.order(action, selectors) if cache else list(selectors)
+    with span("find_first", action=action or ""):
+        element, selector = await _race_selectors(page, ordered, timeout)
+        if element is None and fallbacks:
+            element, selector = await _race_selectors(page, list(fallbacks), min(timeout, FALLBACK_SELECTOR_TIMEOUT))
+            if element is not None:
+                logger.warning(f"Using fallback selector {selector!r}{f' for {action}' if action else ''}")
+    if cache:
+        cache.record(action, selector if selector in ordered else None)
+    return element, selector
+
+async def wait_for_and_click(page, selectors, timeout=5000, action=None, fallbacks=()):
+    """Find the first of multiple selectors and click it"""
+    button, _ = await find_first(page, selectors, timeout=timeout, action=action, fallbacks=fallbacks)
+    if not button:
+        return False
+    try:
+        await button.click()
+        return True
+    except Exception as e:
+        logger.warning(f"Click failed{f' for {action}' if action else ''}: {e}")
+        return False
 
+@traced()
 async def post_tweet_thread_v2(page, content):
     """Post a tweet or thread of tweets with modern selectors"""
     try:
@@ -388,30 +498,24 @@ async def post_tweet_thread_v2(page, content):
         ]
         
         logger.info("Looking for tweet compose button...")
-        if not await wait_for_and_click(page, tweet_button_selectors, timeout=10000):
+        if not await wait_for_and_click(page, tweet_button_selectors, timeout=10000, action="compose_button"):
             logger.error("Could not find tweet compose button")
             await take_error_screenshot(page, "compose_button_error.png")
             return False
 
-        await asyncio.sleep(2)
+        await settle(2)
 
         # Wait for and click the text area
         logger.info("Looking for tweet textarea...")
         textarea_selectors = [
             "[data-testid='tweetTextarea_0']",
-            "div[role='textbox']",
-            "[contenteditable='true']"
+            "div[role='textbox']"
         ]
 
-        textarea = None
-        for selector in textarea_selectors:
-            try:
-                textarea = await page.wait_for_selector(selector, timeout=10000)
-                if textarea:
-                    logger.info(f"Found textarea with selector: {selector}")
-                    break
-            except Exception:
-                continue
+        textarea, selector = await find_first(page, textarea_selectors, timeout=10000, action="compose_textarea",
+                                              fallbacks=["[contenteditable='true']"])
+        if textarea:
+            logger.info(f"Found textarea with selector: {selector}")
 
         if not textarea:
             logger.error("Could not find tweet textarea")
@@ -431,41 +535,44 @@ async def post_tweet_thread_v2(page, content):
                 await textarea.click()
                 await page.keyboard.press("Control+A")
                 await page.keyboard.press("Backspace")
-                await asyncio.sleep(1)
+                await settle(1)
 
                 # Type tweet text
                 await textarea.fill(tweet_text)
-                await asyncio.sleep(2)
+                await settle(2)
 
                 # Look for and click the tweet/post button
-                post_button_selectors = [
-                    "[data-testid='tweetButton']",
+                # The side navigation's own "Post" button also matches the text fallbacks
+                post_button_selectors = ["[data-testid='tweetButton']"]
+                post_button_fallbacks = [
                     "div[role='button']:has-text('Post')",
                     "div[role='button']:has-text('Tweet')"
                 ]
 
-                if not await wait_for_and_click(page, post_button_selectors, timeout=10000):
+                if not await wait_for_and_click(page, post_button_selectors, timeout=10000, action="thread_post_button",
+                                                fallbacks=post_button_fallbacks):
                     logger.error("Could not find post button")
                     await take_error_screenshot(page, f"post_button_error_{i}.png")
                     return False
 
                 # Wait between tweets in a thread
-                await asyncio.sleep(3)
+                await settle(3)
 
                 # If there are more tweets, look for and click the Add button
                 if i < len(content) - 1:
-                    add_button_selectors = [
-                        "[data-testid='addButton']",
+                    add_button_selectors = ["[data-testid='addButton']"]
+                    add_button_fallbacks = [
                         "div[role='button']:has-text('Add')",
                         "span:has-text('Add')"
                     ]
 
-                    if not await wait_for_and_click(page, add_button_selectors, timeout=10000):
+                    if not await wait_for_and_click(page, add_button_selectors, timeout=10000, action="thread_add_button",
+                                                    fallbacks=add_button_fallbacks):
                         logger.error("Could not find add button for thread")
                         await take_error_screenshot(page, f"add_button_error_{i}.png")
                         return False
 
-                    await asyncio.sleep(2)
+                    await settle(2)
 
             except Exception as e:
                 logger.error(f"Error posting tweet {i+1}: {e}")
@@ -480,14 +587,128 @@ async def post_tweet_thread_v2(page, content):
         await take_error_screenshot(page, "tweet_thread_error.png")
         return False
 
-async def browse_tweets_v2(page, account, limit=1):
-    """Browse a user's profile and return their latest tweets."""
+# Serializes tweet articles in page order. Stops at the first regular
+# (not pinned, not reposted) tweet whose ID is at or below sinceId.
+EXTRACT_TWEETS_JS = """(sinceId) => {
+    const tweets = [];
+    let reachedCursor = false;
+    const cursor = sinceId ? BigInt(sinceId) : null;
+    const articles = document.querySelectorAll("article[data-testid='tweet']");
+
+    for (const article of articles) {
+        try {
+            // Get tweet URL and timestamp
+            const timeElement = article.querySelector("time");
+            const urlElement = timeElement ? timeElement.closest("a") : null;
+            const tweetUrl = urlElement ? urlElement.href : "";
+            const timestamp = timeElement ? timeElement.getAttribute("datetime") : "";
+            const idMatch = tweetUrl.match(/\\/status\\/(\\d+)/);
+            const tweetId = idMatch ? idMatch[1] : "";
+
+            // Pinned tweets and reposts are out of chronological order
+            const socialContext = article.querySelector("[data-testid='socialContext']");
+
+            if (cursor !== null && tweetId && BigInt(tweetId) <= cursor) {
+                if (socialContext) {
+                    continue;
+                }
+                reachedCursor = true;
+                break;
+            }
+
+            // Get tweet text
+            let tweetText = "";
+            let lang = "";
+            const textElement = article.querySelector("[data-testid='tweetText']") ||
+                              article.querySelector("[lang]:not([data-testid])");
+            if (textElement) {
+                tweetText = textElement.textContent.trim();
+                lang = textElement.getAttribute("lang") || "";
+            }
+
+            if (tweetText || tweetUrl) {
+                tweets.push({
+                    id: tweetId,
+                    text: tweetText,
+                    url: tweetUrl,
+                    timestamp: timestamp,
+                    lang: lang,
+                    social: socialContext ? socialContext.textContent.trim() : ""
+                });
+            }
+        } catch (error) {
+            console.error("Error processing tweet:", error);
+        }
+    }
+    return {tweets: tweets, reachedCursor: reachedCursor};
+}"""
+
+def _dom_tweet(record):
+    """Build a Tweet from an EXTRACT_TWEETS_JS record (None if it has no status URL)"""
+    tweet = Tweet.from_dict(record)
+    if tweet is not None:
+        social = record.get("social", "").lower()
+        tweet.is_pinned = "pinned" in social
+        tweet.is_retweet = "repost" in social or "retweet" in social
+    return tweet
+
+class BrowseError(Exception):
+    """Raised by browse_tweets_v2(raise_errors=True) when the profile could not be read"""
+
+@traced()
+async def browse_tweets_v2(page, account, limit=1, since_id=None, mode=None, raise_errors=False):
+    """Browse a user's profile and return their latest tweets as Tweet records.
+
+    If ``since_id`` is given, only tweets newer than it are returned and
+    scrolling is skipped once the cursor is visible on the page.
+    ``mode`` is "dom" or "network" (default: TWEET_EXTRACTION_MODE).
+    An empty list means no new tweets; a page that fails to load also
+    returns one unless ``raise_errors`` is set, in which case BrowseError
+    is raised so callers can tell a failure from a quiet account.
+    """
+    if (mode or TWEET_EXTRACTION_MODE) == "network":
+        tweets = await browse_tweets_network(page, account, limit=limit, since_id=since_id)
+        if tweets is not None:
+            return tweets
+        logger.warning(f"No timeline response captured for {account}, falling back to DOM extraction")
+    return await browse_tweets_dom(page, account, limit=limit, since_id=since_id, raise_errors=raise_errors)
+
+async def browse_tweets_network(page, account, limit=1, since_id=None):
+    """Read a user's latest tweets from the timeline JSON the page downloads.
+
+    Returns None if no timeline response arrived, so the caller can fall back.
+    """
+    try:
+        logger.info(f"Checking tweets from {account} account (network)...")
+        with TimelineCapture(page) as capture:
+            # Don't wait for the page to render, only for the timeline response
+            await goto(page, f"/{account}", "profile_network", wait_until="commit")
+            if not await capture.wait(timeout=20):
+                return None
+            captured = list(capture.tweets)
+    except Exception as e:
+        logger.error(f"Error capturing timeline for {account}: {e}")
+        return None
+
+    tweets = []
+    for tweet in captured:
+        if since_id and tweet.id <= int(since_id):
+            if tweet.is_pinned:
+                continue
+            break
+        tweets.append(tweet)
+
+    logger.info(f"Found {len(tweets)} new tweets for {account} in timeline response")
+    return tweets[:limit]
+
+async def browse_tweets_dom(page, account, limit=1, since_id=None, raise_errors=False):
+    """Read a user's latest tweets from the rendered profile page"""
     try:
         logger.info(f"Checking tweets from {account} account...")
 
         # Go to user's profile
-        await page.goto(f"https://twitter.com/{account}", wait_until="networkidle")
-        await asyncio.sleep(3)
+        await goto(page, f"/{account}", "profile", wait_until="networkidle")
+        await settle(3)
 
         # Wait for tweets to load
         logger.info("Waiting for tweets to load...")
@@ -497,99 +718,78 @@ async def browse_tweets_v2(page, account, limit=1):
         except Exception as wait_error:
             logger.error(f"Timeout waiting for tweets: {wait_error}")
             await take_error_screenshot(page, f"tweets_timeout_{account}.png")
+            if raise_errors:
+                raise BrowseError(f"Timeout waiting for tweets from {account}") from wait_error
             return []
 
-        # Add multiple small scrolls with delays
-        for _ in range(3):
-            await page.evaluate("window.scrollBy(0, 300)")
-            await asyncio.sleep(2)
+        # Extract tweet data from what is already rendered
+        since_id = str(since_id) if since_id else None
+        result = await page.evaluate(EXTRACT_TWEETS_JS, since_id)
 
-        # Extract tweet data
-        tweets = await page.evaluate("""() => {
-            const tweets = [];
-            const articles = document.querySelectorAll("article[data-testid='tweet']");
-            
-            for (const article of articles) {
-                try {
-                    // Get tweet text
-                    let tweetText = "";
-                    const textElement = article.querySelector("[data-testid='tweetText']") || 
-                                      article.querySelector("[lang]:not([data-testid])");
-                    if (textElement) {
-                        tweetText = textElement.textContent.trim();
-                    }
-
-                    // Get tweet URL and timestamp
-                    const timeElement = article.querySelector("time");
-                    const urlElement = timeElement ? timeElement.closest("a") : null;
-                    const tweetUrl = urlElement ? urlElement.href : "";
-                    const timestamp = timeElement ? timeElement.getAttribute("datetime") : "";
-
-                    if (tweetText || tweetUrl) {
-                        tweets.push({
-                            text: tweetText,
-                            url: tweetUrl,
-                            timestamp: timestamp
-                        });
-                    }
-                } catch (error) {
-                    console.error("Error processing tweet:", error);
-                }
-            }
-            return tweets;
-        }""")
+        # Only scroll when the cursor hasn't been reached and we need more tweets
+        if not result["reachedCursor"] and len(result["tweets"]) < limit:
+            # Add multiple small scrolls with delays
+            for _ in range(3):
+                await page.evaluate("window.scrollBy(0, 300)")
+                await settle(2)
+            result = await page.evaluate(EXTRACT_TWEETS_JS, since_id)
 
+        tweets = [t for t in map(_dom_tweet, result["tweets"]) if t is not None]
         logger.info(f"Found {len(tweets)} tweets for {account}")
         if not tweets:
+            if result["reachedCursor"]:
+                logger.info(f"No new tweets from {account} since {since_id}")
+                return []
             logger.warning(f"No tweets found for {account} after extraction")
             content = await page.content()
             logger.debug(f"Page content sample: {content[:200]}...")
+            if raise_errors:
+                raise BrowseError(f"No tweets found for {account}")
             return []
 
         return tweets[:limit]
 
+    except BrowseError:
+        raise
     except Exception as e:
         logger.error(f"Error browsing tweets for {account}: {e}")
         await take_error_screenshot(page, f"browse_error_{account}.png")
+        if raise_errors:
+            raise BrowseError(f"Error browsing tweets for {account}: {e}") from e
         return []
 
+@traced()
 async def reply_to_tweet(page, tweet_url, reply_text):
     """Reply to a specific tweet."""
     try:
         logger.info(f"Navigating to tweet URL: {tweet_url}")
-        await page.goto(tweet_url.replace("x.com", "twitter.com"), wait_until="networkidle")
-        await asyncio.sleep(3)
+        await goto(page, tweet_url, "tweet", wait_until="networkidle")
+        await settle(3)
 
         logger.info("Looking for reply button...")
         reply_button_selectors = [
             "div[data-testid='reply']",
-            "[aria-label='Reply']",
-            "div[role='button']:has-text('Reply')"
+            "[aria-label='Reply']"
         ]
 
-        if not await wait_for_and_click(page, reply_button_selectors, timeout=15000):
+        if not await wait_for_and_click(page, reply_button_selectors, timeout=15000, action="reply_button",
+                                        fallbacks=["div[role='button']:has-text('Reply')"]):
             logger.error("Reply button not found")
             await take_error_screenshot(page, "reply_button_error.png")
             return False
 
-        await asyncio.sleep(2)
+        await settle(2)
 
         # Wait for and fill the reply textarea
         textarea_selectors = [
             "[data-testid='tweetTextarea_0']",
-            "div[role='textbox']",
-            "[contenteditable='true']"
+            "div[role='textbox']"
         ]
 
-        textarea = None
-        for selector in textarea_selectors:
-            try:
-                textarea = await page.wait_for_selector(selector, timeout=10000)
-                if textarea:
-                    logger.info(f"Found reply textarea with selector: {selector}")
-                    break
-            except Exception:
-                continue
+        textarea, selector = await find_first(page, textarea_selectors, timeout=10000, action="reply_textarea",
+                                              fallbacks=["[contenteditable='true']"])
+        if textarea:
+            logger.info(f"Found reply textarea with selector: {selector}")
 
         if not textarea:
             logger.error("Reply textarea not found")
@@ -597,16 +797,17 @@ async def reply_to_tweet(page, tweet_url, reply_text):
             return False
 
         await textarea.fill(reply_text)
-        await asyncio.sleep(2)
+        await settle(2)
 
         # Click the reply button
-        post_button_selectors = [
-            "[data-testid='tweetButton']",
+        post_button_selectors = ["[data-testid='tweetButton']"]
+        post_button_fallbacks = [
             "div[role='button']:has-text('Reply')",
             "div[role='button']:has-text('Post')"
         ]
 
-        if not await wait_for_and_click(page, post_button_selectors, timeout=10000):
+        if not await wait_for_and_click(page, post_button_selectors, timeout=10000, action="reply_post_button",
+                                        fallbacks=post_button_fallbacks):
             logger.error("Post reply button not found")
             await take_error_screenshot(page, "post_reply_error.png")
             return False